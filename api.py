@@ -0,0 +1,370 @@
+"""
+Read-only HTTP/JSON API over the listing store.
+
+Serves the UKProperty records in listings.db, so consumers don't have to load
+rightmove_all_locations_properties.json and filter it themselves.
+
+Usage:
+    python api.py --db listings.db --port 8000
+
+Endpoints:
+    GET /listings?location=york&min_price=200000&max_price=350000&min_beds=2&type=flat
+    GET /listings?lat=53.959&lng=-1.082&radius_km=2&limit=100
+    GET /listings?...&cursor=<next_cursor of the previous page>
+    GET /listings/<source>/<property_id>
+    GET /health
+
+Filters: location, outcode, source, min_price, max_price, beds, min_beds,
+max_beds, type (substring of the property type), and lat/lng/radius_km.
+Results are ordered by price and paged with an opaque keyset cursor, so a
+page costs the same however deep into the results it is. Pages are streamed
+with chunked encoding straight from the stored JSON, without decoding it.
+
+Each query's response is kept in an LRU cache. The cache is cleared as soon as
+anything commits to the database (a crawl, a distributed worker), which is
+detected through SQLite's data_version. Radius queries use a SpatialIndex over
+the stored coordinates that is brought up to date at the same moment.
+"""
+import argparse
+import base64
+import binascii
+import json
+import sys
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from spatial import SpatialIndex
+from storage import ListingStore
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+MAX_RADIUS_KM = 50
+# Rows written per chunk of a streamed response
+CHUNK_ROWS = 64
+
+# Query parameter -> (type, ListingStore filter name)
+QUERY_PARAMS = {
+    'location': (str, 'location'),
+    'outcode': (str, 'outcode'),
+    'source': (str, 'source'),
+    'min_price': (int, 'min_price'),
+    'max_price': (int, 'max_price'),
+    'beds': (int, 'bedrooms'),
+    'min_beds': (int, 'min_bedrooms'),
+    'max_beds': (int, 'max_bedrooms'),
+    'type': (str, 'property_type'),
+    'lat': (float, None),
+    'lng': (float, None),
+    'radius_km': (float, None),
+    'limit': (int, None),
+    'cursor': (str, None),
+}
+
+
+def encode_cursor(price, source, property_id):
+    """Return the opaque cursor for the page after a row"""
+    return base64.urlsafe_b64encode(json.dumps([price, source, property_id]).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor from encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        price, source, property_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError, binascii.Error):
+        raise ValueError("Invalid cursor") from None
+    return price, source, property_id
+
+
+def parse_query(query_string):
+    """
+    Parse and validate a /listings query string.
+
+    Returns:
+        dict: Typed parameters, with only the ones given
+
+    Raises:
+        ValueError: For unknown, malformed or out-of-range parameters
+    """
+    params = {}
+    for name, value in parse_qsl(query_string, keep_blank_values=False):
+        if name not in QUERY_PARAMS:
+            raise ValueError(f"Unknown parameter {name!r}")
+        kind = QUERY_PARAMS[name][0]
+        try:
+            params[name] = kind(value.strip())
+        except ValueError:
+            raise ValueError(f"{name} must be a{'n integer' if kind is int else ' number'}") from None
+
+    limit = params.setdefault('limit', DEFAULT_LIMIT)
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+    geo = [name for name in ('lat', 'lng', 'radius_km') if name in params]
+    if geo and len(geo) != 3:
+        raise ValueError("Radius queries need lat, lng and radius_km")
+    if 'radius_km' in params and not 0 < params['radius_km'] <= MAX_RADIUS_KM:
+        raise ValueError(f"radius_km must be between 0 and {MAX_RADIUS_KM}")
+    if 'cursor' in params:
+        params['cursor'] = decode_cursor(params['cursor'])
+    return params
+
+
+class QueryCache:
+    """
+    LRU cache of response bodies, tagged with the database version they were built from.
+
+    Args:
+        max_entries (int): Number of responses kept
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            body = self.entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, body, version):
+        """Cache a body, unless the database changed while it was being built"""
+        with self._lock:
+            if version != self.version:
+                return
+            self.entries[key] = body
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, version):
+        with self._lock:
+            self.entries.clear()
+            self.version = version
+
+
+class ListingService:
+    """
+    Query logic of the API, independent of HTTP.
+
+    Each server thread gets its own SQLite connection. A separate connection
+    polls data_version to notice commits from other processes.
+
+    Args:
+        path (str): Listing store database
+        cache_size (int): Number of cached query responses
+    """
+
+    def __init__(self, path="listings.db", cache_size=1024):
+        self.path = path
+        self.cache = QueryCache(cache_size)
+        self.spatial = SpatialIndex()
+        # Newest rowid and last_seen already indexed; later rows are added on the next refresh
+        self._spatial_rowid = 0
+        self._spatial_seen = None
+        self._local = threading.local()
+        self._watch = ListingStore(path, check_same_thread=False)
+        self._watch_lock = threading.Lock()
+        self._version = None
+        self.refresh()
+
+    def store(self):
+        """Return this thread's ListingStore"""
+        store = getattr(self._local, 'store', None)
+        if store is None:
+            store = self._local.store = ListingStore(self.path)
+        return store
+
+    def refresh(self):
+        """Drop cached responses and update the spatial index if the database changed"""
+        with self._watch_lock:
+            version = self._watch.data_version()
+            if version == self._version:
+                return version
+            # Invalidate first: a response built from older data can no longer be cached
+            self.cache.invalidate(version)
+            located = self._watch.located_since(self._spatial_rowid, self._spatial_seen)
+            for rowid, lat, lng, last_seen in located:
+                self.spatial.add(rowid, lat, lng)
+                if rowid > self._spatial_rowid:
+                    self._spatial_rowid = rowid
+                if self._spatial_seen is None or last_seen > self._spatial_seen:
+                    self._spatial_seen = last_seen
+            self._version = version
+            return version
+
+    def listing(self, source, property_id):
+        """Return one UKProperty record as JSON bytes, or None"""
+        text = self.store().uk_property(source, property_id)
+        return text.encode() if text else None
+
+    def query(self, query_string):
+        """
+        Run a /listings query.
+
+        Args:
+            query_string (str): Raw URL query string
+
+        Returns:
+            tuple: (body, chunks); body is the cached bytes on a cache hit, else None and
+                   chunks is an iterator of bytes that caches the full body once exhausted
+
+        Raises:
+            ValueError: If the query is invalid
+        """
+        params = parse_query(query_string)
+        version = self.refresh()
+        key = tuple(sorted(params.items()))
+        body = self.cache.get(key)
+        if body is not None:
+            return body, None
+        return None, self._stream(params, key, version)
+
+    def _stream(self, params, key, version):
+        filters = {QUERY_PARAMS[name][1]: value for name, value in params.items() if QUERY_PARAMS[name][1]}
+        rowids = None
+        if 'radius_km' in params:
+            rowids = [rowid for _, rowid in self.spatial.radius(params['lat'], params['lng'], params['radius_km'])]
+        limit = params['limit']
+        # One extra row tells whether there is a next page
+        rows = self.store().uk_property_page(filters, params.get('cursor'), limit + 1, rowids)
+
+        body = [b'{"items":[']
+        flushed = 0
+        separator = ''
+        batch = []
+        count = 0
+        last = None
+        more = False
+        for price, source, property_id, uk_property in rows:
+            if count == limit:
+                more = True
+                break
+            batch.append(uk_property)
+            count += 1
+            last = (price, source, property_id)
+            if len(batch) == CHUNK_ROWS:
+                body.append((separator + ','.join(batch)).encode())
+                separator, batch = ',', []
+                yield b''.join(body[flushed:])
+                flushed = len(body)
+        if batch:
+            body.append((separator + ','.join(batch)).encode())
+        next_cursor = json.dumps(encode_cursor(*last) if more else None)
+        body.append(f'],"count":{count},"next_cursor":{next_cursor}}}'.encode())
+        yield b''.join(body[flushed:])
+        self.cache.put(key, b''.join(body), version)
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """HTTP front end of a ListingService (set on the server as .service)"""
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are separate writes; without TCP_NODELAY each keep-alive response waits for a delayed ACK
+    disable_nagle_algorithm = True
+    server_version = 'ListingsAPI/1.0'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def send_json(self, status, body, cache_status=None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if cache_status:
+            self.send_header('X-Cache', cache_status)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_error_json(self, status, message):
+        self.send_json(status, json.dumps({'error': message}).encode())
+
+    def send_stream(self, chunks):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.send_header('X-Cache', 'MISS')
+        self.end_headers()
+        for chunk in chunks:
+            if chunk:
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+        self.wfile.write(b'0\r\n\r\n')
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        parts = [unquote(part) for part in url.path.split('/') if part]
+        service = self.server.service
+        try:
+            if parts == ['listings']:
+                body, chunks = service.query(url.query)
+                if body is not None:
+                    self.send_json(200, body, 'HIT')
+                else:
+                    self.send_stream(chunks)
+            elif len(parts) == 3 and parts[0] == 'listings':
+                body = service.listing(parts[1], parts[2])
+                if body is None:
+                    self.send_error_json(404, "Listing not found")
+                else:
+                    self.send_json(200, body)
+            elif parts == ['health']:
+                cache = service.cache
+                self.send_json(200, json.dumps({'status': 'ok', 'located_listings': len(service.spatial),
+                                                'cache_entries': len(cache.entries), 'cache_hits': cache.hits,
+                                                'cache_misses': cache.misses}).encode())
+            else:
+                self.send_error_json(404, "Not found")
+        except ValueError as e:
+            self.send_error_json(400, str(e))
+
+
+def create_server(path="listings.db", host='127.0.0.1', port=8000, cache_size=1024, verbose=False):
+    """Return a threaded HTTP server for the API (port 0 picks a free port)"""
+    server = ThreadingHTTPServer((host, port), ApiHandler)
+    server.daemon_threads = True
+    server.service = ListingService(path, cache_size)
+    server.verbose = verbose
+    return server
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP/JSON API over the listing store")
+    parser.add_argument('--db', default='listings.db', help="Listing store database")
+    parser.add_argument('--host', default='127.0.0.1', help="Address to listen on")
+    parser.add_argument('--port', type=int, default=8000, help="Port to listen on")
+    parser.add_argument('--cache-size', type=int, default=1024, help="Number of cached query responses")
+    parser.add_argument('--verbose', action='store_true', help="Log every request")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    server = create_server(args.db, args.host, args.port, args.cache_size, args.verbose)
+    host, port = server.server_address[:2]
+    print(f"Serving {args.db} ({len(server.service.spatial)} located listings) on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,268 @@
+"""
+Per-outcode market statistics, maintained incrementally from scraped listings.
+
+Detail pages used to be searched for "average price", "properties sold" and
+"average rent" text, which was slow (a full-document string scan per field)
+and broke whenever the wording changed. AreaStats instead aggregates every
+listing ingested by the crawler, per outcode:
+
+- number of listings for sale
+- median asking price
+- median price per square foot (listings with a size)
+- median monthly rent and the gross rent yield (when lettings are ingested)
+
+Medians come from QuantileSketch, a log-bucketed histogram with 1% relative
+accuracy: an update is one dict increment, a few hundred buckets cover every
+UK price, and a listing can be taken out again when it is re-scraped at a new
+price or removed. Summaries are cached per outcode until it changes, so
+transform_batch looks up a listing's area figures in O(1).
+"""
+import json
+import math
+import os
+
+from dedup import extract_postcode
+from transform import normalize_prices, normalize_square_feet
+
+RELATIVE_ACCURACY = 0.01
+_GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+
+# More listings than this in an outcode counts as high demand
+HIGH_DEMAND_COUNT = 10
+
+
+class QuantileSketch:
+    """
+    Streaming quantiles of positive values, within RELATIVE_ACCURACY.
+
+    Values are counted in buckets whose bounds grow geometrically, so any
+    quantile is returned with a small relative error however many values were
+    added. Values can also be removed.
+    """
+
+    __slots__ = ('counts', 'count')
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def add(self, value, weight=1):
+        """Add (or, with a negative weight, remove) a value; non-positive values are ignored"""
+        if not value or value <= 0:
+            return
+        bucket = math.ceil(math.log(value) / _LOG_GAMMA)
+        remaining = self.counts.get(bucket, 0) + weight
+        if remaining > 0:
+            self.counts[bucket] = remaining
+        else:
+            self.counts.pop(bucket, None)
+        self.count += weight
+
+    def quantile(self, q):
+        """Return the q-quantile (0 <= q <= 1), or None when the sketch is empty"""
+        if self.count <= 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen > rank:
+                break
+        # Midpoint of the bucket, within RELATIVE_ACCURACY of every value in it
+        return 2 * _GAMMA ** bucket / (_GAMMA + 1)
+
+    def median(self):
+        return self.quantile(0.5)
+
+
+class _Area:
+    __slots__ = ('prices', 'per_sqft', 'rents')
+
+    def __init__(self):
+        self.prices = QuantileSketch()
+        self.per_sqft = QuantileSketch()
+        self.rents = QuantileSketch()
+
+
+def listing_outcode(listing):
+    """Return a listing's outcode from its postcode or address, or None"""
+    outcode, _ = extract_postcode(listing.get('postcode'))
+    if outcode is None:
+        outcode, _ = extract_postcode(listing.get('address'))
+    return outcode
+
+
+class AreaStats:
+    """
+    Incrementally updated per-outcode aggregates.
+
+    Listings are keyed by (source, property_id), so ingesting a listing again
+    replaces its earlier figures instead of counting it twice.
+
+    Args:
+        min_count (int): Listings an outcode needs before its figures are used
+    """
+
+    def __init__(self, min_count=5):
+        self.min_count = min_count
+        self.areas = {}
+        # (source, property_id) -> (outcode, channel, price, price per sq ft)
+        self.listings = {}
+        self._summaries = {}
+
+    def __len__(self):
+        return len(self.listings)
+
+    def _apply(self, entry, weight):
+        outcode, channel, price, per_sqft = entry
+        area = self.areas.get(outcode)
+        if area is None:
+            area = self.areas[outcode] = _Area()
+        if channel == 'rent':
+            area.rents.add(price, weight)
+        else:
+            area.prices.add(price, weight)
+            area.per_sqft.add(per_sqft, weight)
+        self._summaries.pop(outcode, None)
+
+    def _record(self, key, entry):
+        previous = self.listings.get(key)
+        if previous == entry:
+            return
+        if previous is not None:
+            self._apply(previous, -1)
+        self.listings[key] = entry
+        self._apply(entry, 1)
+
+    def add_all(self, source, listings, channel='sale'):
+        """
+        Ingest a batch of scraped listings.
+
+        Args:
+            source (str): Portal name, e.g. 'rightmove'
+            listings (list): Scraped listings with property_id, price and a postcode or address
+            channel (str): 'sale', or 'rent' for lettings (price is the monthly rent)
+
+        Returns:
+            int: Number of listings counted
+        """
+        prices = normalize_prices([listing.get('price') for listing in listings])
+        sizes = normalize_square_feet([listing.get('property_size') for listing in listings])
+        added = 0
+        for listing, price, sq_ft in zip(listings, prices, sizes):
+            property_id = listing.get('property_id')
+            outcode = listing_outcode(listing)
+            if not property_id or price is None or outcode is None:
+                continue
+            per_sqft = round(price / sq_ft) if sq_ft and channel != 'rent' else None
+            self._record((source, str(property_id)), (outcode, channel, price, per_sqft))
+            added += 1
+        return added
+
+    def add(self, source, listing, channel='sale'):
+        """Ingest one listing; returns False if it has no price, id or outcode"""
+        return self.add_all(source, [listing], channel) == 1
+
+    def remove(self, source, property_id):
+        """Take a listing out of the aggregates (e.g. once it is sold or withdrawn)"""
+        entry = self.listings.pop((source, str(property_id)), None)
+        if entry is None:
+            return False
+        self._apply(entry, -1)
+        return True
+
+    def outcodes(self):
+        return sorted(self.areas)
+
+    def summary(self, outcode):
+        """
+        Return the aggregates of one outcode.
+
+        Returns:
+            dict: count, median_price, median_price_per_sqft, rent_count,
+                  median_rent and rent_yield (percent); None if nothing is known
+        """
+        if not outcode:
+            return None
+        outcode = outcode.upper()
+        summary = self._summaries.get(outcode)
+        if summary is not None:
+            return summary
+        area = self.areas.get(outcode)
+        if area is None:
+            return None
+
+        median_price = area.prices.median()
+        median_rent = area.rents.median()
+        summary = {
+            'outcode': outcode,
+            'count': area.prices.count,
+            'median_price': round(median_price) if median_price else None,
+            'median_price_per_sqft': round(area.per_sqft.median()) if area.per_sqft.count else None,
+            'rent_count': area.rents.count,
+            'median_rent': round(median_rent) if median_rent else None,
+            'rent_yield': round(median_rent * 12 / median_price * 100, 1) if median_rent and median_price else None,
+        }
+        self._summaries[outcode] = summary
+        return summary
+
+    def market_fields(self, listing, price):
+        """
+        Return the market_demand and area_growth fields for a listing.
+
+        Args:
+            listing (dict): Scraped listing with a postcode or address
+            price (int): The listing's price
+
+        Returns:
+            dict: Fields for UKProperty property_details; empty when its outcode
+                  has fewer than min_count listings
+        """
+        summary = self.summary(listing_outcode(listing))
+        if summary is None or summary['count'] < self.min_count:
+            return {}
+        count = summary['count']
+        fields = {
+            'market_demand': f"{'High' if count > HIGH_DEMAND_COUNT else 'Low'} "
+                             f"({count} listings in {summary['outcode']})",
+        }
+        median_price = summary['median_price']
+        if median_price and price:
+            percentage = (price - median_price) / median_price * 100
+            fields['area_growth'] = f"{percentage:.1f}% {'above' if percentage > 0 else 'below'} average"
+        return fields
+
+    def save(self, path):
+        """Persist the ingested listings to a JSON file"""
+        rows = [[source, property_id, *entry] for (source, property_id), entry in self.listings.items()]
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'min_count': self.min_count, 'listings': rows}, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Load stats from a JSON file, or return empty stats if it doesn't exist"""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        stats = cls(data.get('min_count', 5))
+        for source, property_id, *entry in data['listings']:
+            stats._record((source, property_id), tuple(entry))
+        return stats
+
+    @classmethod
+    def from_store(cls, store, source=None, min_count=5):
+        """Build stats from every for-sale listing in a ListingStore"""
+        by_source = {}
+        for row_source, listing in store.area_rows(source):
+            by_source.setdefault(row_source, []).append(listing)
+        stats = cls(min_count)
+        for row_source, listings in by_source.items():
+            stats.add_all(row_source, listings)
+        return stats
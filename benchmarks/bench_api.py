@@ -0,0 +1,195 @@
+"""
+Benchmark: api.py queries per second and latency over a large listing store.
+
+Builds (once, then reuses, in the temp directory) a listings.db with synthetic UKProperty rows spread
+around the UK cities of bench_spatial, starts `api.py` in a subprocess and
+drives it from client threads over keep-alive connections:
+
+- cold: every query is distinct, so each one runs against SQLite
+- warm: queries drawn from a pool of popular searches, mostly cache hits
+- ingest: a batch is upserted while the warm run continues, invalidating the cache
+
+Usage:
+    python benchmarks/bench_api.py [num_listings] [db_path]
+"""
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from bench_spatial import CITIES, make_points
+from storage import UPSERT, ListingStore
+
+LOCATIONS = ['london', 'manchester', 'birmingham', 'leeds', 'edinburgh', 'york']
+TYPES = ['flat', 'terraced house', 'semi-detached house', 'detached house', 'bungalow']
+
+
+def build_store(path, num_listings):
+    store = ListingStore(path)
+    existing = store.conn.execute("SELECT COUNT(*) FROM listings").fetchone()[0]
+    if existing >= num_listings:
+        store.close()
+        return existing
+    rng = random.Random(1)
+    seen_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    points = make_points(num_listings)
+    start = time.perf_counter()
+    for offset in range(existing, num_listings, 10_000):
+        rows = []
+        for i in range(offset, min(offset + 10_000, num_listings)):
+            lat, lng = points[i]
+            location = min(range(len(CITIES)), key=lambda c: abs(CITIES[c][0] - lat) + abs(CITIES[c][1] - lng))
+            price = int(rng.lognormvariate(12.5, 0.5))
+            beds = rng.randrange(1, 6)
+            property_type = rng.choice(TYPES)
+            uk_property = {
+                'id': str(140_000_000 + i), 'address': f'{i % 300} High Street, {LOCATIONS[location].title()}',
+                'price': price, 'listing_type': 'for-sale', 'bedrooms': beds, 'bathrooms': rng.randrange(1, 4),
+                'property_type': property_type, 'latitude': lat, 'longitude': lng,
+                'image_url': f'https://media.rightmove.co.uk/{i}/img_00.jpeg',
+                'agent': {'name': 'Acme Estates', 'phone': '01904 000000'},
+                'created_at': 'Added on 12/03/2024', 'updated_at': 'Added on 12/03/2024',
+            }
+            rows.append(('rightmove', str(140_000_000 + i), LOCATIONS[location], uk_property['address'], None, price,
+                         beds, uk_property['bathrooms'], property_type, lat, lng, None, None, seen_at, seen_at,
+                         '{}', json.dumps(uk_property)))
+        with store.conn:
+            store.conn.executemany(UPSERT, rows)
+    print(f"Built {num_listings:,} listings in {time.perf_counter() - start:.0f} s")
+    store.close()
+    return num_listings
+
+
+def random_query(rng):
+    params = {}
+    if rng.random() < 0.3:
+        lat, lng, spread, _ = rng.choice(CITIES)
+        params.update(lat=f"{lat + rng.gauss(0, spread / 2):.4f}", lng=f"{lng + rng.gauss(0, spread):.4f}",
+                      radius_km=rng.choice((0.5, 1, 2)))
+    else:
+        params['location'] = rng.choice(LOCATIONS)
+    if rng.random() < 0.7:
+        low = rng.randrange(100_000, 600_000, 25_000)
+        params.update(min_price=low, max_price=low + rng.choice((50_000, 100_000, 250_000)))
+    if rng.random() < 0.5:
+        params['min_beds'] = rng.randrange(1, 5)
+    if rng.random() < 0.4:
+        params['type'] = rng.choice(('flat', 'detached', 'terraced'))
+    params['limit'] = rng.choice((20, 50, 100))
+    return '/listings?' + '&'.join(f"{name}={value}" for name, value in params.items())
+
+
+def run_clients(port, paths, threads):
+    latencies = []
+    lock = threading.Lock()
+    cache_hits = [0]
+
+    def client(chunk):
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        local = []
+        hits = 0
+        for path in chunk:
+            start = time.perf_counter()
+            conn.request('GET', path)
+            response = conn.getresponse()
+            response.read()
+            local.append(time.perf_counter() - start)
+            assert response.status == 200, (path, response.status)
+            hits += response.getheader('X-Cache') == 'HIT'
+        conn.close()
+        with lock:
+            latencies.extend(local)
+            cache_hits[0] += hits
+
+    workers = [threading.Thread(target=client, args=(paths[i::threads],)) for i in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return len(paths) / elapsed, latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)], cache_hits[0]
+
+
+def report(name, result, total):
+    qps, p50, p99, hits = result
+    print(f"{name:<8} {qps:8,.0f} queries/s   p50 {p50 * 1e3:7.2f} ms   p99 {p99 * 1e3:7.2f} ms   "
+          f"cache hits {hits / total:.0%}")
+
+
+def main():
+    num_listings = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(tempfile.gettempdir(), f'bench_api_{num_listings}.db')
+    build_store(path, num_listings)
+
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    start = time.perf_counter()
+    server = subprocess.Popen([sys.executable, os.path.join(ROOT, 'api.py'), '--db', path, '--port', str(port)],
+                              stdout=subprocess.DEVNULL)
+    try:
+        while True:
+            try:
+                conn = http.client.HTTPConnection('127.0.0.1', port)
+                conn.request('GET', '/health')
+                located = json.loads(conn.getresponse().read())['located_listings']
+                break
+            except OSError:
+                time.sleep(0.2)
+        print(f"Server up with {located:,} located listings after {time.perf_counter() - start:.1f} s")
+
+        # Paging through a query with the cursor returns every match exactly once
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        seen, cursor = [], None
+        while True:
+            conn.request('GET', '/listings?location=york&min_price=200000&max_price=210000&limit=100'
+                         + (f'&cursor={cursor}' if cursor else ''))
+            page = json.loads(conn.getresponse().read())
+            seen += [item['id'] for item in page['items']]
+            cursor = page['next_cursor']
+            if not cursor:
+                break
+        store = ListingStore(path)
+        expected = store.conn.execute("SELECT COUNT(*) FROM listings WHERE location = 'york' "
+                                      "AND price BETWEEN 200000 AND 210000").fetchone()[0]
+        assert len(seen) == len(set(seen)) == expected, (len(seen), expected)
+        print(f"Cursor paging: {len(seen)} listings over {-(-len(seen) // 100)} pages, no gaps or repeats")
+
+        rng = random.Random(5)
+        cold = [random_query(rng) for _ in range(2_000)]
+        report("cold", run_clients(port, cold, 4), len(cold))
+
+        popular = [random_query(rng) for _ in range(200)]
+        warm = [rng.choice(popular) for _ in range(10_000)]
+        report("warm", run_clients(port, warm, 4), len(warm))
+
+        # Ingest while querying: the cache empties and refills
+        store.close()
+
+        def ingest():
+            time.sleep(0.5)
+            with ListingStore(path) as writer_store, writer_store.conn:
+                writer_store.conn.execute("UPDATE listings SET price = price + 1 WHERE rowid % 1000 = 0")
+        writer = threading.Thread(target=ingest)
+        writer.start()
+        report("ingest", run_clients(port, warm, 4), len(warm))
+        writer.join()
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
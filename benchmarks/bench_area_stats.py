@@ -0,0 +1,84 @@
+"""
+Benchmark: incremental per-outcode statistics.
+
+Ingests synthetic listings spread over ~1,600 outcodes in scrape-sized
+batches, then re-ingests a share of them at new prices (as a daily crawl
+would). Reports ingest throughput, the cost of the per-listing market field
+lookup used by transform_batch, and the error of the sketch medians against
+exact medians of the same data.
+
+Usage:
+    python benchmarks/bench_area_stats.py [num_listings]
+"""
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from areastats import RELATIVE_ACCURACY, AreaStats, listing_outcode
+
+AREAS = ['B', 'E', 'LS', 'M', 'N', 'SE', 'SW', 'YO', 'EH', 'BS', 'CF', 'NG', 'L', 'S', 'W', 'NW']
+
+
+def make_listings(n, rng):
+    listings = []
+    for i in range(n):
+        area = rng.choice(AREAS)
+        district = int(rng.paretovariate(1.2)) % 100
+        base = 150_000 + 90_000 * (AREAS.index(area) % 7) + 1_500 * district
+        listings.append({
+            'property_id': str(140_000_000 + i),
+            'address': f'{i % 300} High Street, {area}{district} {i % 9}AB',
+            'price': str(int(base * rng.lognormvariate(0, 0.35))),
+            'property_size': f'{rng.randrange(450, 2400)}sq. ft' if rng.random() < 0.6 else None,
+        })
+    return listings
+
+
+def main():
+    num_listings = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = random.Random(1)
+    listings = make_listings(num_listings, rng)
+
+    stats = AreaStats()
+    start = time.perf_counter()
+    for offset in range(0, num_listings, 500):
+        stats.add_all('rightmove', listings[offset:offset + 500])
+    elapsed = time.perf_counter() - start
+    print(f"{len(stats):,} listings in {len(stats.areas):,} outcodes ingested in {elapsed:.2f} s "
+          f"({num_listings / elapsed:,.0f} listings/s)")
+
+    # A later crawl sees 10% of the listings again, half of them at a new price
+    changed = [dict(listing, price=str(int(int(listing['price']) * rng.choice((0.95, 1.0)))))
+               for listing in rng.sample(listings, num_listings // 10)]
+    start = time.perf_counter()
+    stats.add_all('rightmove', changed)
+    elapsed = time.perf_counter() - start
+    print(f"{len(changed):,} re-scraped listings merged in {elapsed:.2f} s ({len(changed) / elapsed:,.0f} listings/s)")
+    latest = {listing['property_id']: listing for listing in listings}
+    latest.update((listing['property_id'], listing) for listing in changed)
+
+    sample = rng.sample(list(latest.values()), 100_000)
+    start = time.perf_counter()
+    for listing in sample:
+        stats.market_fields(listing, int(listing['price']))
+    elapsed = time.perf_counter() - start
+    print(f"market_fields lookup: {elapsed / len(sample) * 1e6:.2f} us/listing")
+
+    # Sketch medians against exact medians of the current prices
+    by_outcode = {}
+    for listing in latest.values():
+        by_outcode.setdefault(listing_outcode(listing), []).append(int(listing['price']))
+    errors = []
+    for outcode, prices in by_outcode.items():
+        exact = statistics.median_low(prices)
+        errors.append(abs(stats.summary(outcode)['median_price'] - exact) / exact)
+    print(f"Median error over {len(errors):,} outcodes: mean {statistics.mean(errors):.3%}, "
+          f"max {max(errors):.3%} (sketch accuracy {RELATIVE_ACCURACY:.0%})")
+
+
+if __name__ == "__main__":
+    main()
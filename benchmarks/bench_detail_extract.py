@@ -0,0 +1,142 @@
+"""
+Benchmark: Rightmove detail extraction from the DOM vs the embedded page model.
+
+Runs scrape_property_details against a fake session serving a synthetic detail
+page of realistic size (~350 KB of header, scripts, SVG and footer around the
+property sections). The "dom" variant serves the page without its PAGE_MODEL
+script, so the DOM extractor runs; the "page_model" variant serves it with
+the script and takes the JSON path. Both variants write their debug HTML
+dump into a temporary directory.
+
+Usage:
+    python benchmarks/bench_detail_extract.py [num_pages]
+"""
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from portals import rightmove
+
+PROPERTY_ID = 141234567
+URL = f'https://www.rightmove.co.uk/properties/{PROPERTY_ID}#/'
+
+
+def make_model():
+    return {
+        'propertyData': {
+            'id': str(PROPERTY_ID),
+            'text': {
+                'propertyPhrase': '3 bedroom semi-detached house for sale',
+                'description': 'A lovely family home.<br /><br />Two reception rooms and 2 bathrooms.<br />'
+                               + 'Lorem ipsum dolor sit amet. ' * 60,
+            },
+            'prices': {'primaryPrice': '£425,000', 'pricePerSqFt': '£354 per sq ft'},
+            'address': {'displayAddress': '12 High Street, York, YO1 7AB', 'countryCode': 'GB',
+                        'outcode': 'YO1', 'incode': '7AB'},
+            'location': {'latitude': 53.9591, 'longitude': -1.0815},
+            'bedrooms': 3,
+            'bathrooms': 2,
+            'propertySubType': 'Semi-Detached',
+            'keyFeatures': ['Three bedrooms', 'Two reception rooms', 'South facing garden', 'Garage'],
+            'sizings': [{'unit': 'sqft', 'minimumSize': 1200, 'maximumSize': 1200},
+                        {'unit': 'sqm', 'minimumSize': 111, 'maximumSize': 111}],
+            'tenure': {'tenureType': 'LEASEHOLD', 'yearsRemainingOnLease': 112},
+            'livingCosts': {'councilTaxBand': 'D', 'annualServiceCharge': 1200, 'annualGroundRent': 250},
+            'images': [{'url': f'https://media.rightmove.co.uk/123k/x/{PROPERTY_ID}/IMG_{i:02d}_0000.jpeg'}
+                       for i in range(20)],
+            'floorplans': [{'url': f'https://media.rightmove.co.uk/123k/x/{PROPERTY_ID}/FLP_00_0000.jpeg'}],
+            'customer': {'branchDisplayName': 'Acme Estates, York', 'logoPath': '/company/clogo_1.jpeg'},
+            'contactInfo': {'telephoneNumbers': {'localNumber': '01904 000000'}},
+            'nearestStations': [{'name': 'York Station', 'distance': 0.4, 'unit': 'miles'}],
+            'listingHistory': {'listingUpdateReason': 'Added on 12/03/2024'},
+        },
+        'metadata': {'analytics': 'x' * 20000},
+    }
+
+
+def make_page(with_model):
+    icon = '<svg viewBox="0 0 24 24"><path d="' + 'M12 2L2 7l10 5 10-5-10-5z' * 20 + '"/></svg>'
+    header = '<header><nav>' + ''.join(f'<a href="/nav/{i}">Link {i}</a>{icon}' for i in range(80)) + '</nav></header>'
+    scripts = ''.join(f'<script>var chunk{i} = "{"x" * 8000}";</script>' for i in range(20))
+    if with_model:
+        scripts += f'<script>window.PAGE_MODEL = {json.dumps(make_model())}</script>'
+    body = '''
+<div class="property-header"><h1 class="property-header-title">3 bedroom semi-detached house for sale</h1>
+<address class="property-header-address">12 High Street, York, YO1 7AB</address></div>
+<div id="propertyMap"></div><script>var map = {"latitude": 53.9591, "longitude": -1.0815};</script>
+<div id="property-description"><p>A lovely family home.</p><p>Two reception rooms and 2 bathrooms.</p></div>
+<ul id="key-features"><li>Three bedrooms</li><li>Two reception rooms</li><li>South facing garden</li></ul>
+<div>Floor area 1,200 sq ft</div><div>Council Tax Band D</div><div>Leasehold, 112 years remaining</div>
+<div class="gallery-thumbs">''' + ''.join(
+        f'<img src="https://media.rightmove.co.uk/123k/x/{PROPERTY_ID}/IMG_{i:02d}_0000_max_135x100.jpeg">'
+        for i in range(20)) + '</div>'
+    footer = '<footer>' + ''.join(f'<div class="footer-col"><a href="/f/{i}">Footer {i}</a>{icon}</div>'
+                                  for i in range(120)) + '</footer>'
+    return (f'<html><head><style>{".a{color:red}" * 3000}</style>{scripts}</head><body>{header}{body}'
+            f'{footer}</body></html>')
+
+
+class FakeResponse:
+    status_code = 200
+    url = URL
+
+    def __init__(self, text):
+        self.text = text
+        self.content = text.encode('utf-8')
+
+    def raise_for_status(self):
+        pass
+
+
+class NoWait:
+    def wait(self, url):
+        pass
+
+
+class FakeSession:
+    rate_limiter = NoWait()
+
+    def __init__(self, page):
+        self.response = FakeResponse(page)
+
+    def get(self, url, timeout=None):
+        return self.response
+
+
+def bench(name, page, num_pages):
+    session = FakeSession(page)
+    # The scraper prints a line per page; keep the timings readable
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        for _ in range(num_pages):
+            details = rightmove.scrape_property_details(session, URL)
+        elapsed = time.perf_counter() - start
+    print(f"{name:<11} {elapsed / num_pages * 1e3:7.2f} ms/page  fields={len(details)}")
+    return details
+
+
+def main():
+    num_pages = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    dom_page = make_page(False)
+    model_page = make_page(True)
+    print(f"Page size: {len(model_page) / 1e3:.0f} KB, {num_pages} pages")
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # scrape_property_details writes a debug copy of each page to the working directory
+        os.chdir(tmp)
+        try:
+            dom = bench('dom', dom_page, num_pages)
+            model = bench('page_model', model_page, num_pages)
+        finally:
+            os.chdir(cwd)
+    for key in ('latitude', 'longitude', 'tenure', 'council_tax_band', 'property_size', 'features'):
+        print(f"  {key:<17} dom={dom.get(key)!r:<45} page_model={model.get(key)!r}")
+
+
+if __name__ == "__main__":
+    main()
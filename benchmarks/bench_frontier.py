@@ -0,0 +1,145 @@
+"""
+Benchmark: what a budget of discovered detail fetches buys.
+
+A synthetic market of listings in outcodes of very different sizes. Each
+listing's detail page links to 4 similar listings (mostly in its own outcode)
+and 3 recently sold ones nearby. The crawl starts from search results in the
+largest outcodes and fetches the detail pages of 100 of them, then spends a
+fixed number of detail requests following links. Compared:
+
+    naive    follow links breadth-first, re-fetching listings already seen
+    fifo     breadth-first, skipping known listings
+    frontier CrawlFrontier (link count, depth and outcode density ranked, 3 hops)
+
+It reports new listings per request, wasted requests, and the listings and
+outcodes reached outside the searched ones, then the discover/pop throughput
+of the frontier.
+
+Usage:
+    python benchmarks/bench_frontier.py [listings] [budget]
+"""
+import collections
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from frontier import CrawlFrontier
+
+
+def make_market(num_listings, num_areas=200, seed=1):
+    rng = random.Random(seed)
+    # Zipf-like outcode sizes: a few big outcodes, a long tail of small ones
+    weights = [1 / (rank + 1) for rank in range(num_areas)]
+    areas = rng.choices(range(num_areas), weights, k=num_listings)
+    by_area = collections.defaultdict(list)
+    for property_id, area in enumerate(areas):
+        by_area[area].append(property_id)
+
+    def card(property_id):
+        return {
+            'link': f'/properties/{property_id}#/',
+            'address': f'{property_id} High Street, Town AB{areas[property_id]} 1AA',
+            'price': '£250,000',
+        }
+
+    pages = {}
+    for property_id, area in enumerate(areas):
+        similar = []
+        for _ in range(4):
+            # Similar listings are mostly in the same outcode, sometimes in a nearby one
+            if rng.random() < 0.8:
+                similar.append(rng.choice(by_area[area]))
+            else:
+                nearby = (area + rng.randint(-5, 5)) % num_areas
+                similar.append(rng.choice(by_area[nearby] or [property_id]))
+        sold = [rng.choice(by_area[area]) for _ in range(3)]
+        pages[property_id] = {
+            'property_id': str(property_id),
+            'address': card(property_id)['address'],
+            'similar_properties': [card(i) for i in similar if i != property_id],
+            'market_stats_recent_sales_nearby': [card(i) for i in sold if i != property_id],
+        }
+    # Search results: 5 pages of 24 in each of the 10 biggest outcodes
+    seeds = [i for area in range(10) for i in by_area[area][:120]]
+    return areas, pages, seeds
+
+
+def linked_ids(page):
+    for field in ('similar_properties', 'market_stats_recent_sales_nearby'):
+        for item in page[field]:
+            yield int(item['link'].split('/')[2].split('#')[0])
+
+
+def crawl_bfs(pages, seeds, budget, skip_known):
+    known = set(seeds)
+    queue = collections.deque(i for seed in seeds[:100] for i in linked_ids(pages[seed]))
+    fetched = []
+    while queue and len(fetched) < budget:
+        property_id = queue.popleft()
+        if skip_known and property_id in known:
+            continue
+        fetched.append(property_id)
+        known.add(property_id)
+        queue.extend(linked_ids(pages[property_id]))
+    return fetched
+
+
+def crawl_frontier(pages, seeds, budget):
+    frontier = CrawlFrontier(max_depth=3)
+    frontier.add_known(pages[seed] for seed in seeds)
+    for seed in seeds[:100]:
+        frontier.discover(pages[seed])
+    fetched = []
+    while len(fetched) < budget:
+        entry = frontier.pop()
+        if entry is None:
+            break
+        property_id = int(entry['property_id'])
+        fetched.append(property_id)
+        frontier.discover(pages[property_id], entry['depth'])
+    return fetched
+
+
+def report(name, fetched, seeds, areas):
+    seen = set(seeds)
+    new = 0
+    for property_id in fetched:
+        if property_id not in seen:
+            new += 1
+            seen.add(property_id)
+    searched = {areas[i] for i in seeds}
+    outside = [i for i in set(fetched) if areas[i] not in searched]
+    reached = {areas[i] for i in outside}
+    print(f"{name:<10} {len(fetched):>8} {new:>8} {new / max(len(fetched), 1):>8.0%} "
+          f"{len(fetched) - new:>8} {len(outside):>8} {len(reached):>8}")
+
+
+def main():
+    num_listings = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    budget = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+    areas, pages, seeds = make_market(num_listings)
+    print(f"{num_listings} listings in {len(set(areas))} outcodes, {len(seeds)} search results, "
+          f"budget {budget} detail requests")
+    print(f"{'':<10} {'requests':>8} {'new':>8} {'yield':>8} {'wasted':>8} {'outside':>8} {'outcodes':>8}")
+    report('naive', crawl_bfs(pages, seeds, budget, skip_known=False), seeds, areas)
+    report('fifo', crawl_bfs(pages, seeds, budget, skip_known=True), seeds, areas)
+    report('frontier', crawl_frontier(pages, seeds, budget), seeds, areas)
+
+    frontier = CrawlFrontier(max_depth=10, max_pending=num_listings)
+    start = time.perf_counter()
+    for page in pages.values():
+        frontier.discover(page, 1)
+    discover_time = time.perf_counter() - start
+    start = time.perf_counter()
+    popped = 0
+    while frontier.pop() is not None:
+        popped += 1
+    pop_time = time.perf_counter() - start
+    print(f"discover: {len(pages) / discover_time:,.0f} pages/s, pop: {popped / pop_time:,.0f} entries/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark: memory use of search-page parsing over thousands of pages.
+
+Each mode parses the same synthetic Rightmove search pages (24 cards wrapped
+in a realistic amount of header, script, SVG and footer markup) in its own
+subprocess, and samples the process RSS as it goes:
+
+    retained  - notebook style: every soup is appended to a list (soup_list)
+    full      - old scraper: full html.parser tree per page, dropped each iteration
+    bounded   - parse_search_page: SoupStrainer to the cards, tree decomposed
+
+A flat RSS column means memory does not grow with the number of pages.
+
+Usage:
+    python benchmarks/bench_parse_memory.py [num_pages] [sample_every]
+"""
+import gc
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+MODES = ['retained', 'full', 'bounded']
+
+
+def make_page(page, cards=24):
+    """Build a synthetic search results page of roughly the size of a real one"""
+    icon = '<svg viewBox="0 0 24 24"><path d="' + 'M12 2L2 7l10 5 10-5-10-5z' * 20 + '"/></svg>'
+    header = ('<header><nav>' + ''.join(f'<a href="/nav/{i}">Link {i}</a>{icon}' for i in range(60))
+              + '</nav></header>')
+    script = '<script>window.jsonModel = {"properties": [' + ','.join(
+        f'{{"id": {page * cards + i}, "summary": "{"x" * 400}"}}' for i in range(cards)) + ']};</script>'
+    body = []
+    for i in range(cards):
+        property_id = 140000000 + page * cards + i
+        body.append(f'''
+<div class="l-searchResult is-list">
+  <div class="propertyCard">
+    <a class="propertyCard-link" href="/properties/{property_id}#/">
+      <h2 class="propertyCard-title">{i % 5 + 1} bedroom semi-detached house for sale</h2>
+    </a>
+    {icon}
+    <address class="propertyCard-address">{i} High Street, York YO1 {i % 9}AB</address>
+    <div class="propertyCard-priceValue">£{250000 + i * 1000:,}</div>
+    <span class="propertyCard-description">A lovely home with {i % 3 + 1} bathrooms. {"Lorem ipsum " * 30}</span>
+    <div class="propertyCard-branchSummary">Agent {i}</div>
+    <div class="propertyCard-contactsAddedOrReduced">Added on 12/03/2024</div>
+  </div>
+</div>''')
+    footer = '<footer>' + ''.join(f'<div class="footer-col"><a href="/f/{i}">Footer {i}</a>{icon}</div>'
+                                  for i in range(80)) + '</footer>'
+    return (f'<html><head><title>Search</title><style>{".a{color:red}" * 2000}</style>{script}</head><body>'
+            f'{header}<div class="searchHeader-resultCount">1,234</div><div id="l-searchResults">'
+            + ''.join(body) + f'</div>{footer}</body></html>')
+
+
+def rss_mb():
+    """Current resident set size in MB (Linux), falling back to peak RSS elsewhere"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1e6
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+
+def run_mode(mode, num_pages, sample_every):
+    from bs4 import BeautifulSoup
+    from portals import rightmove
+
+    pages = [make_page(i) for i in range(20)]
+    gc.collect()
+    soup_list = []
+    listings = 0
+    samples = []
+    start = time.perf_counter()
+    for i in range(num_pages):
+        html = pages[i % len(pages)]
+        if mode == 'bounded':
+            listings += len(rightmove.parse_search_page(html))
+        else:
+            soup = BeautifulSoup(html, 'html.parser')
+            cards, _ = rightmove.find_listing_cards(soup)
+            for card in cards:
+                url, property_id = rightmove.extract_card_link(card)
+                rightmove.parse_listing_card(card, url, property_id)
+                listings += 1
+            if mode == 'retained':
+                soup_list.append(soup)
+        if (i + 1) % sample_every == 0:
+            samples.append(f"{rss_mb():.0f}")
+    elapsed = time.perf_counter() - start
+    print(f"{mode:<9} {num_pages / elapsed:8.1f} pages/s  listings={listings:,}  RSS MB: {' '.join(samples)}")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--mode':
+        run_mode(sys.argv[2], int(sys.argv[3]), int(sys.argv[4]))
+        return
+    num_pages = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    sample_every = int(sys.argv[2]) if len(sys.argv) > 2 else max(1, num_pages // 10)
+    print(f"Page size: {len(make_page(0)) / 1e3:.0f} KB, {num_pages:,} pages, RSS sampled every {sample_every}")
+    for mode in MODES:
+        # Separate processes so one mode's heap doesn't inflate the next one's RSS
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--mode', mode, str(num_pages), str(sample_every)],
+                       check=True)
+
+
+if __name__ == "__main__":
+    main()
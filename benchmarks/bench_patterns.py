@@ -0,0 +1,118 @@
+"""
+Benchmark: inline regexes vs the shared precompiled patterns in patterns.py.
+
+Simulates the per-listing text work of the search-card extractors on a large
+synthetic page (many cards, several text nodes per card). The "inline" variant
+mirrors the old code: ``re.compile`` inside ``find(string=...)`` followed by
+``re.search`` with the same pattern string and flags.
+
+Usage:
+    python benchmarks/bench_patterns.py [num_listings]
+"""
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import patterns
+
+
+def make_listings(n):
+    """Build synthetic card text nodes resembling Rightmove/Zoopla search cards"""
+    listings = []
+    for i in range(n):
+        listings.append({
+            'nodes': ['Offers in excess of', f'{(i % 5) + 1} bed', f'{(i % 3) + 1} bath', 'Added on 12/03/2024'],
+            'title': f'{(i % 5) + 1} bedroom semi-detached house for sale',
+            'description': f'A lovely home with {(i % 3) + 1} bathrooms and a large garden.',
+            'price': f'£{250000 + i * 17:,}',
+            'link': f'https://www.rightmove.co.uk/properties/{140000000 + i}#/',
+        })
+    return listings
+
+
+def find_string(nodes, pattern):
+    """Minimal stand-in for BeautifulSoup's find(string=pattern)"""
+    for node in nodes:
+        if pattern.search(node):
+            return node
+    return None
+
+
+def extract_inline(listing):
+    data = {}
+    beds_elem = find_string(listing['nodes'], re.compile(r'\d+\s*bed'))
+    if beds_elem:
+        m = re.search(r'(\d+)\s*bed', beds_elem, re.IGNORECASE)
+        if m:
+            data['beds'] = m.group(1)
+    baths_elem = find_string(listing['nodes'], re.compile(r'\d+\s*bath'))
+    if baths_elem:
+        m = re.search(r'(\d+)\s*bath', baths_elem, re.IGNORECASE)
+        if m:
+            data['baths'] = m.group(1)
+    m = re.search(r'(\d+)\s*bedroom', listing['title'], re.IGNORECASE)
+    data['bedrooms'] = m.group(1) if m else '0'
+    m = re.search(r'bedroom\s+([^for]+)', listing['title'], re.IGNORECASE)
+    data['type'] = m.group(1).strip() if m else 'Not specified'
+    m = re.search(r'(\d+)\s*bathroom', listing['description'], re.IGNORECASE)
+    data['bathrooms'] = m.group(1) if m else '0'
+    m = re.search(r'/properties/(\d+)', listing['link'])
+    data['property_id'] = m.group(1) if m else None
+    m = re.search(r'£?([\d,]+)', listing['price'])
+    data['price'] = m.group(1).replace(',', '') if m else None
+    return data
+
+
+def extract_precompiled(listing):
+    data = {}
+    beds_elem = find_string(listing['nodes'], patterns.BEDS)
+    if beds_elem:
+        m = patterns.BEDS.search(beds_elem)
+        if m:
+            data['beds'] = m.group(1)
+    baths_elem = find_string(listing['nodes'], patterns.BATHS)
+    if baths_elem:
+        m = patterns.BATHS.search(baths_elem)
+        if m:
+            data['baths'] = m.group(1)
+    m = patterns.BEDROOMS.search(listing['title'])
+    data['bedrooms'] = m.group(1) if m else '0'
+    m = patterns.PROPERTY_TYPE.search(listing['title'])
+    data['type'] = m.group(1).strip() if m else 'Not specified'
+    m = patterns.BATHROOMS.search(listing['description'])
+    data['bathrooms'] = m.group(1) if m else '0'
+    m = patterns.PROPERTY_ID.search(listing['link'])
+    data['property_id'] = m.group(1) if m else None
+    m = patterns.PRICE.search(listing['price'])
+    data['price'] = m.group(1).replace(',', '') if m else None
+    return data
+
+
+def run(extract, listings, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for listing in listings:
+            extract(listing)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    num_listings = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    listings = make_listings(num_listings)
+
+    # Both variants must produce identical output
+    for listing in listings[:1000]:
+        assert extract_inline(listing) == extract_precompiled(listing)
+
+    inline = run(extract_inline, listings)
+    precompiled = run(extract_precompiled, listings)
+
+    print(f"Listings:     {num_listings}")
+    print(f"Inline:       {inline:.3f}s ({inline / num_listings * 1e6:.2f} us/listing)")
+    print(f"Precompiled:  {precompiled:.3f}s ({precompiled / num_listings * 1e6:.2f} us/listing)")
+    print(f"Speedup:      {inline / precompiled:.2f}x")
@@ -0,0 +1,121 @@
+"""
+Benchmark: listing memory and serialization, plain dicts vs records.Property.
+
+Synthetic listings carry the search card fields plus about 30 detail fields.
+Each listing is decoded from its own JSON string, so like scraped data no two
+listings share string objects until Property interns the categorical ones.
+
+Measures:
+- memory held by the listings (tracemalloc)
+- encoding with json.dump(indent=2) (the old sinks), records.dumps and records.pack
+- decoding with json.loads and records.unpack
+
+Usage:
+    python benchmarks/bench_records.py [num_listings]
+"""
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import records
+from records import Property
+
+AGENTS = [f'{name} Estates, York' for name in ('Acme', 'Ouse', 'Minster', 'Walmgate', 'Bootham', 'Clifton')]
+TYPES = ['Semi-Detached', 'Flat', 'Terraced', 'Detached', 'Bungalow']
+
+
+def make_listing_json(i, rng):
+    listing = {
+        'property_id': str(140000000 + i),
+        'link': f'https://www.rightmove.co.uk/properties/{140000000 + i}',
+        'price': f'£{rng.randrange(80, 900)},000',
+        'address': f'{i % 300} High Street, York YO{i % 30} {i % 9}AB',
+        'postcode': f'YO{i % 30} {i % 9}AB',
+        'beds': str(rng.randrange(1, 6)),
+        'baths': str(rng.randrange(1, 4)),
+        'type': rng.choice(TYPES),
+        'description': 'A lovely home close to schools and the station.',
+        'agent': rng.choice(AGENTS),
+        'date_added': f'Added on {rng.randrange(1, 29):02d}/03/2024',
+        'property_title': f'{rng.randrange(1, 6)} bedroom house for sale',
+        'property_type': rng.choice(TYPES),
+        'bedrooms': str(rng.randrange(1, 6)),
+        'bathrooms': str(rng.randrange(1, 4)),
+        'receptions': str(rng.randrange(1, 3)),
+        'currency': 'GBP',
+        'country_code': 'GB',
+        'latitude': 53.9 + rng.random() / 10,
+        'longitude': -1.1 + rng.random() / 10,
+        'google_map_location': 'https://www.google.com/maps?q=53.95,-1.08',
+        'features': ['Garden', 'Garage', 'Freehold'],
+        'tags': ['Garden', 'Garage'],
+        'property_size': f'{rng.randrange(500, 2000)} sq ft',
+        'tenure': rng.choice(['Freehold', 'Leasehold']),
+        'council_tax_band': rng.choice('ABCDEFG'),
+        'ecp_rating': rng.choice('ABCDEFG'),
+        'agent_details': {'agent_name': rng.choice(AGENTS), 'agent_phone': '01904 000000'},
+        'property_images': [f'https://media.rightmove.co.uk/{i}/img_{n:02d}.jpeg' for n in range(8)],
+        'floor_plans': [f'https://media.rightmove.co.uk/{i}/flp_00.jpeg'],
+        'points_ofInterest': [{'point': 'York', 'distance': '0.8 miles'},
+                              {'point': 'St Mary\'s Primary School', 'distance': '0.3 miles'}],
+        'listing_history': 'Added on 12/03/2024',
+        'availability': 'Available',
+        'uprn': str(100050000000 + i),
+        'virtual_tour': 'No',
+    }
+    return json.dumps(listing)
+
+
+def measure(build, sources):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    listings = [build(json.loads(text)) for text in sources]
+    elapsed = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return listings, size, elapsed
+
+
+def timed(name, fn, count):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    size = f"  {len(result) / 1e6:7.1f} MB" if isinstance(result, (str, bytes)) else ""
+    print(f"{name:<32} {elapsed:6.2f} s  {count / elapsed:>10,.0f} listings/s{size}")
+    return result
+
+
+def main():
+    num_listings = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = random.Random(1)
+    sources = [make_listing_json(i, rng) for i in range(num_listings)]
+
+    dicts, dict_bytes, _ = measure(dict, sources)
+    del dicts
+    props, prop_bytes, _ = measure(Property, sources)
+    print(f"{num_listings:,} listings held in memory:")
+    print(f"  dict      {dict_bytes / 1e6:8.1f} MB  ({dict_bytes / num_listings:,.0f} bytes/listing)")
+    print(f"  Property  {prop_bytes / 1e6:8.1f} MB  ({prop_bytes / num_listings:,.0f} bytes/listing)"
+          f"  {1 - prop_bytes / dict_bytes:.0%} smaller")
+
+    dicts = [json.loads(text) for text in sources]
+    print()
+    timed("json.dumps(dicts, indent=2)", lambda: json.dumps(dicts, indent=2), num_listings)
+    encoded = timed("records.dumps(Property)", lambda: records.dumps(props), num_listings)
+    packed = timed("records.pack(Property)", lambda: records.pack(props), num_listings)
+    decoded = timed("json.loads", lambda: json.loads(encoded), num_listings)
+    unpacked = timed("records.unpack", lambda: records.unpack(packed), num_listings)
+
+    assert decoded == dicts and unpacked == props, "round trip changed the listings"
+    print("Round trips: identical")
+
+
+if __name__ == "__main__":
+    main()
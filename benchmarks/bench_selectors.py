@@ -0,0 +1,76 @@
+"""
+Benchmark: comma-joined selectors vs self-ordering selector cascades.
+
+Parses synthetic Rightmove search pages (see bench_parse_memory) and extracts
+every card field twice: with the old comma-joined select_one() calls, and
+with parse_listing_card, which uses the compiled cascades in cascades.py.
+Both must produce the same listings.
+
+Usage:
+    python benchmarks/bench_selectors.py [num_pages]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bench_parse_memory import make_page
+from cascades import REGISTRY
+from parsing import parse_html
+from portals import rightmove
+
+# The card selectors as they were before the cascades
+COMMA_SELECTORS = {
+    'price': '.propertyCard-priceValue, .property-card-price, [data-test="property-price"]',
+    'address': 'address.propertyCard-address, .property-card-address, [data-test="address-title"]',
+    'title': 'h2.propertyCard-title, .property-card-title, [data-test="property-title"]',
+    'description': '.propertyCard-description, .property-card-description, [data-test="property-description"]',
+    'agent': '.propertyCard-branchSummary, .property-card-agent, [data-test="agent-name"]',
+    'date_added': '.propertyCard-contactsAddedOrReduced, .property-card-date, [data-test="date-added"]',
+    'link': 'a.propertyCard-link, a.property-card-link, [data-test="property-details-link"]',
+}
+
+
+def extract_comma(card):
+    fields = {}
+    for field, selector in COMMA_SELECTORS.items():
+        element = card.select_one(selector)
+        if element is not None:
+            fields[field] = element['href'] if field == 'link' else element.text.strip()
+    return fields
+
+
+def extract_cascade(card):
+    url, _ = rightmove.extract_card_link(card)
+    listing = rightmove.parse_listing_card(card, url)
+    return listing
+
+
+def main():
+    num_pages = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    soups = [parse_html(make_page(i), rightmove.SEARCH_STRAINER) for i in range(num_pages)]
+    cards = [card for soup in soups for card in rightmove.find_listing_cards(soup)[0]]
+    print(f"{len(cards):,} cards on {num_pages} pages")
+
+    start = time.perf_counter()
+    comma = [extract_comma(card) for card in cards]
+    comma_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    cascaded = [extract_cascade(card) for card in cards]
+    cascade_elapsed = time.perf_counter() - start
+
+    for old, new in zip(comma, cascaded):
+        assert old['price'] == new['price'] and old['address'] == new['address'], (old, new)
+        assert old['agent'] == new['agent'] and old['date_added'] == new['date_added'], (old, new)
+        assert new['link'].endswith(old['link']), (old, new)
+
+    print(f"comma-joined select_one  {comma_elapsed / len(cards) * 1e6:8.1f} us/card")
+    print(f"cascades                 {cascade_elapsed / len(cards) * 1e6:8.1f} us/card "
+          f"(includes the card's regex work; fields identical)")
+    REGISTRY.report(min_calls=1)
+
+
+if __name__ == "__main__":
+    main()
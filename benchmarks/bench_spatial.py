@@ -0,0 +1,99 @@
+"""
+Benchmark: SpatialIndex queries vs a linear scan over the same points.
+
+Points are drawn around a handful of UK cities (most listings cluster in
+towns) plus a uniform rural background. Each query type is timed on random
+city-centre query points and checked against a brute-force scan.
+
+Usage:
+    python benchmarks/bench_spatial.py [num_points] [num_queries]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from spatial import SpatialIndex, haversine_km
+
+CITIES = [
+    (51.5074, -0.1278, 0.20, 0.30),   # London
+    (53.4808, -2.2426, 0.08, 0.10),   # Manchester
+    (52.4862, -1.8904, 0.08, 0.10),   # Birmingham
+    (53.8008, -1.5491, 0.06, 0.08),   # Leeds
+    (55.9533, -3.1883, 0.05, 0.06),   # Edinburgh
+    (53.9591, -1.0815, 0.03, 0.03),   # York
+]
+
+
+def make_points(n, seed=1):
+    rng = random.Random(seed)
+    points = []
+    for i in range(n):
+        if rng.random() < 0.85:
+            lat, lng, spread, weight = rng.choices(CITIES, weights=[c[3] for c in CITIES])[0]
+            points.append((lat + rng.gauss(0, spread), lng + rng.gauss(0, spread * 1.6)))
+        else:
+            points.append((rng.uniform(50.0, 58.5), rng.uniform(-5.5, 1.7)))
+    return points
+
+
+def timed(name, fn, queries, brute=None):
+    start = time.perf_counter()
+    results = [fn(*q) for q in queries]
+    elapsed = (time.perf_counter() - start) / len(queries)
+    hits = sum(len(r) for r in results) / len(queries)
+    line = f"{name:<22} {elapsed * 1e3:8.3f} ms/query  avg hits={hits:,.0f}"
+    if brute:
+        start = time.perf_counter()
+        expected = [brute(*q) for q in queries[:5]]
+        brute_elapsed = (time.perf_counter() - start) / min(5, len(queries))
+        assert all(e == r for e, r in zip(expected, results)), f"{name}: results differ from linear scan"
+        line += f"   linear scan {brute_elapsed * 1e3:8.1f} ms/query (results identical)"
+    print(line)
+
+
+def main():
+    num_points = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    num_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    points = make_points(num_points)
+
+    start = time.perf_counter()
+    index = SpatialIndex()
+    for i, (lat, lng) in enumerate(points):
+        index.add(i, lat, lng)
+    build = time.perf_counter() - start
+    print(f"{num_points:,} points indexed in {build:.2f} s ({build / num_points * 1e6:.2f} us/insert), "
+          f"{len(index.cells):,} cells")
+
+    rng = random.Random(2)
+    centres = []
+    for _ in range(num_queries):
+        lat, lng, spread, _ = rng.choice(CITIES)
+        centres.append((lat + rng.gauss(0, spread / 2), lng + rng.gauss(0, spread)))
+
+    def brute_bbox(min_lat, min_lng, max_lat, max_lng):
+        return sorted(i for i, (lat, lng) in enumerate(points)
+                      if min_lat <= lat <= max_lat and min_lng <= lng <= max_lng)
+
+    def brute_nearest(lat, lng, k):
+        return sorted(range(len(points)), key=lambda i: haversine_km(lat, lng, *points[i]))[:k]
+
+    boxes = [(lat - 0.005, lng - 0.008, lat + 0.005, lng + 0.008) for lat, lng in centres]
+    timed("bbox ~1.1 x 1.1 km", lambda *q: sorted(index.bbox(*q)), boxes, brute_bbox)
+    for km in (0.5, 1.0, 2.0):
+        timed(f"radius {km} km", lambda lat, lng, km=km: index.radius(lat, lng, km), centres)
+    timed("nearest k=10", lambda lat, lng, k: [key for _, key in index.nearest(lat, lng, k)],
+          [(lat, lng, 10) for lat, lng in centres], brute_nearest)
+
+    # Incremental inserts after the initial build, as new scrape batches arrive
+    batch = make_points(10_000, seed=3)
+    start = time.perf_counter()
+    for i, (lat, lng) in enumerate(batch):
+        index.add(('new', i), lat, lng)
+    print(f"10,000 incremental inserts: {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark: interpreter startup cost of the scraper entry points.
+
+Each target is run in a fresh interpreter several times, and the median wall
+time above a bare `python -c pass` is reported. This is what a cron job or a
+queue worker pays before doing any work. Each target also reports which of the
+heavy dependencies ended up imported.
+
+The "eager" rows import what the old top-level scripts and the Zillow
+notebook imported up front, for comparison.
+
+Usage:
+    python benchmarks/bench_startup.py [runs]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+HEAVY = ('requests', 'urllib3', 'bs4', 'soupsieve', 'lxml', 'numpy', 'pandas')
+
+TARGETS = [
+    ('eager rightmove deps', 'import requests, bs4, urllib3.util.retry'),
+    ('eager zillow deps', 'import requests, bs4, numpy, pandas'),
+    ('import portals', 'import portals'),
+    ('import portals.rightmove', 'from portals import rightmove'),
+    ('import portals.zoopla', 'from portals import zoopla'),
+    ('import portals.zillow', 'from portals import zillow'),
+    ('import Rightmove_Web_Scraper', 'import Rightmove_Web_Scraper'),
+    ('import crawl', 'import crawl'),
+    ('import distributed', 'import distributed'),
+    ('rightmove + first session', 'from portals import rightmove; rightmove.create_session()'),
+]
+
+
+def run(code):
+    report = f"import sys; print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', f"{code}\n{report}"], cwd=ROOT, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode:
+        return None, result.stderr.strip().splitlines()[-1]
+    return elapsed, result.stdout.strip()
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+    bare = statistics.median(run('pass')[0] for _ in range(runs))
+    print(f"Bare interpreter: {bare * 1e3:.0f} ms (subtracted below), median of {runs} runs")
+    for name, code in TARGETS:
+        times = []
+        for _ in range(runs):
+            elapsed, loaded = run(code)
+            if elapsed is None:
+                break
+            times.append(elapsed)
+        if not times:
+            print(f"{name:<30} skipped ({loaded})")
+            continue
+        print(f"{name:<30} {(statistics.median(times) - bare) * 1e3:7.0f} ms   loaded: {loaded or '-'}")
+
+
+if __name__ == "__main__":
+    main()
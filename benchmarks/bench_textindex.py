@@ -0,0 +1,106 @@
+"""
+Benchmark: TextIndex queries vs a linear substring scan.
+
+Synthetic listings get descriptions and key features drawn from typical
+listing vocabulary and addresses in a set of towns. The index is built in
+scrape-sized batches, then a set of queries is timed against the index and
+against a scan that lower-cases and substring-checks every listing (what the
+scraper's __main__ did to pick listings by location).
+
+Usage:
+    python benchmarks/bench_textindex.py [num_listings]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from textindex import TextIndex
+
+TOWNS = ['York', 'Leeds', 'Derby', 'Southampton', 'Portsmouth', 'Bournemouth', 'Newport', 'Milton Keynes',
+         'Harrogate', 'Selby', 'Malton', 'Pickering', 'Thirsk', 'Ripon', 'Beverley', 'Whitby']
+FEATURES = ['Garden', 'Garage', 'Driveway', 'Off street parking', 'Conservatory', 'En-suite', 'Utility room',
+            'Gas central heating', 'Double glazing', 'Chain free', 'Cellar', 'Open plan kitchen', 'Log burner',
+            'Balcony', 'Lift', 'Communal gardens', 'Allocated parking', 'Freehold', 'Leasehold', 'Loft conversion']
+WORDS = ('spacious bright modern family home close to local schools shops and amenities with excellent transport '
+         'links a well presented property offering generous accommodation throughout including a fitted kitchen '
+         'separate dining room cosy lounge with feature fireplace downstairs cloakroom master bedroom with '
+         'fitted wardrobes family bathroom landscaped rear garden patio lawn detached garage ample parking '
+         'viewing highly recommended quiet cul de sac popular residential area village centre countryside '
+         'views period features sash windows high ceilings refurbished recently extended south facing').split()
+
+
+def make_listings(start, count, rng):
+    listings = []
+    for i in range(start, start + count):
+        description = [' '.join(rng.choices(WORDS, k=rng.randrange(30, 80))).capitalize() + '.'
+                       for _ in range(rng.randrange(1, 4))]
+        listings.append({
+            'property_id': str(140_000_000 + i),
+            'address': f'{i % 300} {rng.choice(["High Street", "Church Lane", "Station Road", "Mill Close"])}, '
+                       f'{rng.choice(TOWNS)}',
+            'description': description,
+            'features': rng.sample(FEATURES, rng.randrange(2, 7)),
+            'type': rng.choice(['Detached', 'Semi-Detached', 'Terraced', 'Flat', 'Bungalow']),
+        })
+    return listings
+
+
+def linear_scan(listings, words, town):
+    found = []
+    for listing in listings:
+        if town.lower() not in listing.get('address', '').lower():
+            continue
+        text = (' '.join(listing['description']) + ' ' + ' '.join(listing['features'])).lower()
+        if all(word in text for word in words):
+            found.append(listing)
+    return found
+
+
+def main():
+    num_listings = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    rng = random.Random(1)
+    listings = make_listings(0, num_listings, rng)
+
+    index = TextIndex()
+    start = time.perf_counter()
+    for offset in range(0, num_listings, 1_000):
+        index.add_listings('rightmove', listings[offset:offset + 1_000])
+    elapsed = time.perf_counter() - start
+    print(f"{num_listings:,} listings indexed in {elapsed:.1f} s ({num_listings / elapsed:,.0f} listings/s), "
+          f"{len(index.postings):,} terms")
+
+    batch = make_listings(num_listings, 1_000, rng)
+    start = time.perf_counter()
+    index.add_listings('rightmove', batch)
+    print(f"Incremental batch of 1,000: {(time.perf_counter() - start) * 1e3:.0f} ms")
+    listings += batch
+
+    queries = [
+        ('garden AND garage near York', ['garden', 'garage'], 'York'),
+        ('conservatory cellar near Harrogate', ['conservatory', 'cellar'], 'Harrogate'),
+        ('log burner sash windows near Whitby', ['log', 'burner', 'sash', 'window'], 'Whitby'),
+        ('balcony lift near Milton Keynes', ['balcony', 'lift'], 'Milton Keynes'),
+    ]
+    by_id = {listing['property_id']: listing for listing in listings}
+    for query, words, town in queries:
+        runs = 20
+        start = time.perf_counter()
+        for _ in range(runs):
+            results = index.search(query, limit=20)
+        indexed = (time.perf_counter() - start) / runs
+        start = time.perf_counter()
+        expected = linear_scan(listings, words, town)
+        scanned = time.perf_counter() - start
+        # Every ranked result is a listing the scan also finds
+        expected_ids = {listing['property_id'] for listing in expected}
+        assert all(property_id in expected_ids for _, (_, property_id) in results), query
+        top = by_id[results[0][1][1]]['address'] if results else '-'
+        print(f"{query:<40} index {indexed * 1e3:7.2f} ms   scan {scanned * 1e3:8.1f} ms   "
+              f"({len(expected):,} matches, top: {top})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark: UKProperty transform on synthetic records.
+
+Compares the old pipeline, where scrape_property_details json.dumps-ed nested
+fields and the transform json.loads-ed them back per row, against native nested
+objects passed straight into transform.transform_batch.
+
+Records are generated and transformed in chunks so 1M records fit in memory.
+
+Usage:
+    python benchmarks/bench_transform.py [num_records] [chunk_size]
+"""
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from transform import transform_batch
+
+NESTED_FIELDS = ['property_images', 'agent_details', 'points_ofInterest', 'market_stats_last_12_months']
+
+
+def make_records(start, count, rng):
+    """Build synthetic scraped records with native nested fields"""
+    records = []
+    for i in range(start, start + count):
+        records.append({
+            'property_id': str(140000000 + i),
+            'link': f'https://www.rightmove.co.uk/properties/{140000000 + i}',
+            'address': f'{i % 300} High Street, York, YO{i % 30} {i % 9}AB',
+            'price': str(rng.randrange(80000, 900000)),
+            'beds': str(rng.randrange(1, 6)),
+            'baths': str(rng.randrange(1, 4)),
+            'type': rng.choice(['semi-detached house', 'flat', 'terraced house', 'detached house']),
+            'date_added': 'Added on 12/03/2024',
+            'description': ['A lovely home.', 'Close to schools and the station.'],
+            'features': ['Garden', 'Garage', 'Freehold'],
+            'latitude': str(53.9 + rng.random() / 10),
+            'longitude': str(-1.1 + rng.random() / 10),
+            'property_size': f'{rng.randrange(400, 3000)}sq. ft',
+            'tenure': 'Freehold',
+            'ecp_rating': 'C',
+            'council_tax_band': 'D',
+            'property_images': [f'https://media.rightmove.co.uk/{i}/img_{n}_max_1800x1800.jpeg' for n in range(8)],
+            'agent_details': {'agent_name': 'Acme Estates', 'agent_phone': '01904 000000'},
+            'points_ofInterest': [{'point': 'York Primary School', 'distance': '0.3 miles'},
+                                  {'point': 'York Station', 'distance': '1.1 miles'}],
+            'market_stats_last_12_months': {'average_estimated': '£310,000', 'properties_sold': '14'},
+        })
+    return records
+
+
+def encode_nested(records):
+    """Reproduce the old scrape-side json.dumps of nested fields"""
+    for record in records:
+        for field in NESTED_FIELDS:
+            record[field] = json.dumps(record[field])
+    return records
+
+
+def run(num_records, chunk_size, round_trip):
+    rng = random.Random(42)
+    elapsed = 0.0
+    produced = 0
+    for start in range(0, num_records, chunk_size):
+        records = make_records(start, min(chunk_size, num_records - start), rng)
+        t0 = time.perf_counter()
+        if round_trip:
+            encode_nested(records)
+        produced += len(transform_batch(records, verbose=False))
+        elapsed += time.perf_counter() - t0
+    return elapsed, produced
+
+
+if __name__ == "__main__":
+    num_records = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+
+    legacy, legacy_count = run(num_records, chunk_size, round_trip=True)
+    native, native_count = run(num_records, chunk_size, round_trip=False)
+    assert legacy_count == native_count
+
+    print(f"Records:                 {num_records}")
+    print(f"dumps/loads round trip:  {legacy:.2f}s ({num_records / legacy:,.0f} records/s)")
+    print(f"Native batch:            {native:.2f}s ({num_records / native:,.0f} records/s)")
+    print(f"Speedup:                 {legacy / native:.2f}x")
@@ -0,0 +1,93 @@
+"""
+Benchmark: URL generation, validation and request de-duplication.
+
+Builds search URLs for every portal x location x page combination with the
+builders in urls.py, validates and canonicalises each one, and pushes them
+through a RequestDeduper twice (the second pass simulates overlapping jobs).
+For comparison the old Zoopla page-2+ builder is run on the same inputs to
+count how many malformed URLs it produced.
+
+Usage:
+    python benchmarks/bench_urls.py [num_locations] [pages]
+"""
+import os
+import sys
+import time
+from urllib.parse import quote
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import urls
+
+TOWNS = ['London', 'Milton Keynes', 'Brighton & Hove', 'Stoke-on-Trent', 'York', "King's Lynn",
+         'Newcastle upon Tyne', 'Derby', 'St Albans', 'Bath']
+
+
+def old_zoopla_search_url(location, page):
+    """The Zoopla builder before urls.py (formats the bound method for page > 1)"""
+    if page == 1:
+        return f"https://www.zoopla.co.uk/for-sale/property/{location.lower()}/?q={quote(location)}&search_source=home"
+    return f"https://www.zoopla.co.uk/for-sale/property/{location.lower}/?q={quote(location)}&search_source=home&pn={page}"
+
+
+def make_locations(n):
+    return [f"{TOWNS[i % len(TOWNS)]} {i // len(TOWNS)}" if i >= len(TOWNS) else TOWNS[i] for i in range(n)]
+
+
+def build_all(locations, pages):
+    built = []
+    for i, location in enumerate(locations):
+        for page in range(pages):
+            built.append(urls.rightmove_search_url(f"REGION%5E{1000 + i}", page))
+            built.append(urls.zoopla_search_url(location, page + 1))
+            built.append(urls.zillow_search_url(location, page + 1))
+    return built
+
+
+def count_invalid(candidates):
+    invalid = 0
+    for url in candidates:
+        try:
+            urls.validate_url(url)
+        except ValueError:
+            invalid += 1
+    return invalid
+
+
+def main():
+    num_locations = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    pages = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    locations = make_locations(num_locations)
+
+    start = time.perf_counter()
+    built = build_all(locations, pages)
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    invalid = count_invalid(built)
+    validate_time = time.perf_counter() - start
+
+    deduper = urls.RequestDeduper()
+    start = time.perf_counter()
+    claimed = sum(deduper.claim(url) for url in built)
+    # Overlapping jobs re-request the same pages, in a different parameter order
+    reordered = [url.replace('search_source=home&', '') + '&search_source=home' if 'zoopla' in url else url
+                 for url in built]
+    claimed += sum(deduper.claim(url) for url in reordered)
+    dedup_time = time.perf_counter() - start
+
+    old = [old_zoopla_search_url(location, page + 1) for location in locations for page in range(pages)]
+    old_invalid = count_invalid(old)
+
+    total = len(built)
+    print(f"URLs built:           {total:,} ({num_locations:,} locations x {pages} pages x 3 portals)")
+    print(f"Build:                {build_time * 1e6 / total:.2f} us/URL")
+    print(f"Validate+canonical:   {validate_time * 1e6 / total:.2f} us/URL")
+    print(f"Dedup (2 passes):     {dedup_time * 1e6 / (2 * total):.2f} us/URL")
+    print(f"Invalid URLs:         {invalid}")
+    print(f"Claimed / duplicates: {claimed:,} / {deduper.duplicates:,}")
+    print(f"Old Zoopla builder:   {old_invalid:,} of {len(old):,} URLs malformed")
+
+
+if __name__ == "__main__":
+    main()
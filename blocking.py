@@ -0,0 +1,267 @@
+"""
+Block and CAPTCHA detection with session rotation.
+
+classify_response looks only at the status code, the body size and, for
+small bodies, a few byte-string markers. A block page is recognised in
+microseconds, before any HTML parsing, and a normal page costs a length check.
+Block and challenge pages are always small, so markers are never searched in
+full-size pages, where words like "captcha" appear legitimately (reCAPTCHA on
+enquiry forms, CDN scripts). Without it, a block page was parsed,
+reported as "No listings found ... structure might have changed", and the
+same burned session kept being used.
+
+RotatingSession wraps a pool of sessions (one per proxy when a proxy list is
+given). When a response is classified as blocked, the current session is
+quarantined, a warm one (homepage visited, cookies set) takes its place, and
+the request is retried on it. A 429 only means "slow down": the request is
+retried on the same session after a back-off, and the proxy is not
+quarantined. Callers use it like a requests.Session.
+"""
+import threading
+import time
+
+# Bodies at least this large are real pages; smaller ones are checked for markers
+_SMALL_PAGE = 50 * 1024
+
+# Lower-case markers of CAPTCHA / challenge pages (PerimeterX, Cloudflare, Distil, ...)
+_CAPTCHA_MARKERS = (b'captcha', b'cf-chl', b'cf_chl')
+# Lower-case markers of plain block pages (Incapsula, Akamai, ...)
+_BLOCK_MARKERS = (b'_incapsula_resource', b'pardon our interruption', b'access denied',
+                  b'request unsuccessful', b'unusual traffic', b'are you a robot', b'attention required')
+
+OK = 'ok'
+BLOCKED = 'blocked'
+CAPTCHA = 'captcha'
+RATE_LIMITED = 'rate_limited'
+
+
+class BlockedError(Exception):
+    """Raised when a portal serves a block or CAPTCHA page instead of content"""
+
+    def __init__(self, url, kind):
+        super().__init__(f"{kind} response for {url}")
+        self.url = url
+        self.kind = kind
+
+
+def classify_response(response):
+    """
+    Classify a response without parsing it.
+
+    Returns:
+        str: OK, BLOCKED, CAPTCHA or RATE_LIMITED
+    """
+    status = response.status_code
+    if status == 429:
+        return RATE_LIMITED
+    content = response.content
+    if len(content) < _SMALL_PAGE:
+        body = content.lower()
+        if any(marker in body for marker in _CAPTCHA_MARKERS):
+            return CAPTCHA
+        if status in (403, 503) or any(marker in body for marker in _BLOCK_MARKERS):
+            return BLOCKED
+    elif status in (403, 503):
+        return BLOCKED
+    return OK
+
+
+def check_response(response):
+    """
+    Raise BlockedError if the response is a block page.
+
+    Returns:
+        requests.Response: The response, for chaining
+    """
+    kind = classify_response(response)
+    if kind != OK:
+        raise BlockedError(response.url, kind)
+    return response
+
+
+class RotatingSession:
+    """
+    A pool of sessions presented as one, rotating away from blocked sessions.
+
+    Args:
+        factory (callable): factory(proxy) -> new requests.Session
+        proxies (list): Proxy URLs, one session each; [None] for a direct connection
+        warm_url (str): Page visited on each new session to collect cookies before use
+        quarantine_seconds (float): How long a blocked session's proxy is rested
+        max_rotations (int): Block retries per request before BlockedError is raised
+        rate_limiter: Optional RateLimiter shared by every session in the pool
+        backoff_seconds (float): First wait after a 429 without Retry-After; doubled on each retry
+    """
+
+    # Attributes of the pool itself; any other attribute is read from and written to the current session
+    _OWN_ATTRIBUTES = {'factory', 'proxy_pool', 'warm_url', 'quarantine_seconds', 'max_rotations',
+                       'rate_limiter', 'backoff_seconds', 'quarantined', 'blocks', 'rate_limits'}
+
+    # Longest wait honoured from a Retry-After header
+    MAX_BACKOFF = 120
+
+    def __init__(self, factory, proxies=None, warm_url=None, quarantine_seconds=900, max_rotations=3,
+                 rate_limiter=None, backoff_seconds=5.0):
+        self.factory = factory
+        self.proxy_pool = list(proxies or [None])
+        self.warm_url = warm_url
+        self.quarantine_seconds = quarantine_seconds
+        self.max_rotations = max_rotations
+        self.rate_limiter = rate_limiter
+        self.backoff_seconds = backoff_seconds
+        # proxy -> time its quarantine ends
+        self.quarantined = {}
+        self.blocks = 0
+        self.rate_limits = 0
+        self._lock = threading.Lock()
+        self._next = 0
+        # Rotation in progress: an Event set once the new session is in place
+        self._replacing = None
+        # session -> number of requests in flight on it; retired sessions are closed once idle
+        self._in_use = {}
+        self._retired = set()
+        self._session = self._open_session(self._next_proxy())
+
+    def _next_proxy(self):
+        """Pick the next proxy that isn't quarantined (call with the lock held, or before sharing the pool)"""
+        now = time.time()
+        for _ in range(len(self.proxy_pool)):
+            proxy = self.proxy_pool[self._next % len(self.proxy_pool)]
+            self._next += 1
+            if self.quarantined.get(proxy, 0) <= now:
+                return proxy
+        # Every proxy is resting; use the one whose quarantine ends first
+        return min(self.proxy_pool, key=lambda p: self.quarantined.get(p, 0))
+
+    def _open_session(self, proxy):
+        """Create and warm a session on a proxy"""
+        session = self.factory(proxy)
+        session.pool_proxy = proxy
+        session.rate_limiter = self.rate_limiter
+        if self.warm_url:
+            try:
+                if session.rate_limiter is not None:
+                    session.rate_limiter.wait(self.warm_url)
+                session.get(self.warm_url, timeout=10)
+            except Exception as e:
+                print(f"Error warming session: {e}")
+        return session
+
+    def _rotate(self, blocked_session, kind):
+        """Quarantine a blocked session and swap in a fresh one (once, if several threads see the block)"""
+        with self._lock:
+            if self._session is not blocked_session:
+                return self._session
+            replacing = self._replacing
+            if replacing is None:
+                self.blocks += 1
+                proxy = getattr(blocked_session, 'pool_proxy', None)
+                self.quarantined[proxy] = time.time() + self.quarantine_seconds
+                print(f"{kind} response via {proxy or 'direct connection'}; quarantining session and rotating")
+                next_proxy = self._next_proxy()
+                self._replacing = threading.Event()
+        if replacing is not None:
+            # Another thread is warming the replacement
+            replacing.wait()
+            return self._session
+
+        # Warm the new session without holding the lock; other threads keep using the pool meanwhile
+        try:
+            session = self._open_session(next_proxy)
+        except Exception:
+            with self._lock:
+                replacing, self._replacing = self._replacing, None
+            replacing.set()
+            raise
+        with self._lock:
+            self._session = session
+            self._retire(blocked_session)
+            replacing, self._replacing = self._replacing, None
+        replacing.set()
+        return session
+
+    def _retire(self, session):
+        """Close a replaced session now if no request is using it, else when the last one finishes (lock held)"""
+        if self._in_use.get(session):
+            self._retired.add(session)
+        else:
+            session.close()
+
+    def _acquire(self):
+        with self._lock:
+            session = self._session
+            self._in_use[session] = self._in_use.get(session, 0) + 1
+            return session
+
+    def _release(self, session):
+        with self._lock:
+            count = self._in_use.pop(session) - 1
+            if count:
+                self._in_use[session] = count
+            elif session in self._retired:
+                self._retired.discard(session)
+                session.close()
+
+    def _backoff(self, response, attempt):
+        """Seconds to wait after a 429: the Retry-After header, or an exponential back-off"""
+        retry_after = (getattr(response, 'headers', None) or {}).get('Retry-After')
+        try:
+            return min(float(retry_after), self.MAX_BACKOFF)
+        except (TypeError, ValueError):
+            return self.backoff_seconds * 2 ** attempt
+
+    def get(self, url, **kwargs):
+        """
+        GET url, rotating to a fresh session and retrying if the response is a block page.
+
+        A 429 response is retried on the same session after a back-off, without quarantining it.
+        """
+        for attempt in range(self.max_rotations + 1):
+            session = self._acquire()
+            try:
+                response = session.get(url, **kwargs)
+            finally:
+                self._release(session)
+            kind = classify_response(response)
+            if kind == OK:
+                return response
+            if kind == RATE_LIMITED:
+                with self._lock:
+                    self.rate_limits += 1
+                delay = self._backoff(response, attempt)
+                print(f"Rate limited on {url}; backing off {delay:.0f}s")
+                time.sleep(delay)
+                continue
+            self._rotate(session, kind)
+            if self.rate_limiter is not None:
+                self.rate_limiter.wait(url)
+        raise BlockedError(url, kind)
+
+    def __setattr__(self, name, value):
+        if name.startswith('_') or name in self._OWN_ATTRIBUTES:
+            super().__setattr__(name, value)
+            if name == 'rate_limiter' and '_session' in self.__dict__:
+                self._session.rate_limiter = value
+        else:
+            # e.g. make_request switching session.proxies
+            setattr(self._session, name, value)
+
+    def __getattr__(self, name):
+        # cookies, proxies, headers, mount, ... of the current session
+        session = self.__dict__.get('_session')
+        if session is None:
+            raise AttributeError(name)
+        return getattr(session, name)
+
+    def close(self):
+        with self._lock:
+            sessions = {self._session} | self._retired
+            self._retired = set()
+        for session in sessions:
+            session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,190 @@
+"""
+Self-ordering selector cascades with hit statistics.
+
+A field like the card price used to be found with a comma-joined selector,
+'.propertyCard-priceValue, .property-card-price, [data-test="property-price"]'.
+soupsieve matches every alternative against every element of the card on
+each call, although on any one layout only one of them ever matches.
+
+A SelectorCascade compiles each alternative once and tries them one at a
+time, currently most successful first, stopping at the first match. Each
+alternative counts its hits, so after a few cards the live selector is tried
+first and the others cost nothing. The counts also make layout drift
+visible: report() lists the alternatives that never match and the fields
+that stopped matching altogether.
+
+Cascades are registered by name in a SelectorRegistry (REGISTRY by default)
+so a crawl can print or save the statistics of every field at the end.
+"""
+import json
+import os
+import threading
+
+
+class SelectorCascade:
+    """
+    Ordered CSS selector alternatives for one field.
+
+    Args:
+        name (str): Field name used in reports, e.g. 'rightmove.card.price'
+        alternatives (list): Selectors, one per alternative. A comma-joined string
+            is not split, since commas also appear inside :is(), :not() and
+            attribute values.
+
+    Raises:
+        TypeError: If alternatives is a string
+    """
+
+    def __init__(self, name, alternatives):
+        if isinstance(alternatives, str):
+            raise TypeError(f"Selector cascade {name} needs a list of alternatives, not a string")
+        self.name = name
+        self.alternatives = list(alternatives)
+        # Compiled on first use, so importing a scraper doesn't load soupsieve (and bs4)
+        self.compiled = None
+        self.hits = [0] * len(self.alternatives)
+        self.calls = 0
+        self.misses = 0
+        # Positions of the alternatives in the order they are tried; replaced, never mutated
+        self.order = tuple(range(len(self.alternatives)))
+        self._lock = threading.Lock()
+
+    def _compile(self):
+        import soupsieve
+        self.compiled = [soupsieve.compile(alternative) for alternative in self.alternatives]
+        return self.compiled
+
+    def _hit(self, position, rank):
+        self.hits[position] += 1
+        # Promote an alternative once it has more hits than the one tried before it
+        if rank and self.hits[position] > self.hits[self.order[rank - 1]]:
+            with self._lock:
+                self.order = tuple(sorted(self.order, key=lambda i: -self.hits[i]))
+
+    def select_one(self, tag):
+        """Return the first element matched by the best alternative that matches, or None"""
+        self.calls += 1
+        compiled = self.compiled or self._compile()
+        for rank, position in enumerate(self.order):
+            element = compiled[position].select_one(tag)
+            if element is not None:
+                self._hit(position, rank)
+                return element
+        self.misses += 1
+        return None
+
+    def select_matched(self, tag, limit=0):
+        """
+        Select with the best alternative that matches anything.
+
+        Returns:
+            tuple: (list of elements, selector that matched or None)
+        """
+        self.calls += 1
+        compiled = self.compiled or self._compile()
+        for rank, position in enumerate(self.order):
+            elements = compiled[position].select(tag, limit=limit)
+            if elements:
+                self._hit(position, rank)
+                return elements, self.alternatives[position]
+        self.misses += 1
+        return [], None
+
+    def select(self, tag, limit=0):
+        """Return the elements matched by the best alternative that matches anything, or []"""
+        return self.select_matched(tag, limit)[0]
+
+    def stats(self):
+        """
+        Return the hit statistics of this cascade.
+
+        Returns:
+            dict: calls, misses and per-alternative hits/hit_rate, in current order
+        """
+        return {
+            'calls': self.calls,
+            'misses': self.misses,
+            'alternatives': [{
+                'selector': self.alternatives[position],
+                'hits': self.hits[position],
+                'hit_rate': round(self.hits[position] / self.calls, 4) if self.calls else 0.0,
+            } for position in self.order],
+        }
+
+
+class SelectorRegistry:
+    """Named selector cascades and their statistics"""
+
+    def __init__(self):
+        self.cascades = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, alternatives):
+        """
+        Return the cascade for a name, creating it on first use.
+
+        Raises:
+            ValueError: If the name is already registered with other alternatives
+        """
+        with self._lock:
+            cascade = self.cascades.get(name)
+            if cascade is None:
+                cascade = self.cascades[name] = SelectorCascade(name, alternatives)
+            elif cascade.alternatives != list(alternatives):
+                raise ValueError(f"Selector cascade {name} is already registered with other alternatives")
+            return cascade
+
+    def stats(self):
+        """Return {name: cascade stats} for every cascade that has been used"""
+        return {name: cascade.stats() for name, cascade in sorted(self.cascades.items()) if cascade.calls}
+
+    def dead(self, min_calls=50):
+        """
+        Find alternatives that never matched.
+
+        Args:
+            min_calls (int): Only report cascades used at least this often
+
+        Returns:
+            list: (cascade name, selector) tuples
+        """
+        found = []
+        for name, cascade in sorted(self.cascades.items()):
+            if cascade.calls >= min_calls:
+                found.extend((name, alternative) for alternative, hits in zip(cascade.alternatives, cascade.hits)
+                             if not hits)
+        return found
+
+    def report(self, min_calls=50):
+        """Print hit rates, fields that never match, and dead alternatives"""
+        stats = self.stats()
+        if not stats:
+            return
+        print("\nSelector hit rates:")
+        for name, stat in stats.items():
+            best = stat['alternatives'][0]
+            print(f"  {name:<36} {stat['calls']:>7} calls  {1 - stat['misses'] / stat['calls']:6.1%} matched"
+                  f"  best: {best['selector']} ({best['hit_rate']:.1%})")
+        broken = [name for name, stat in stats.items() if stat['calls'] >= min_calls and stat['misses'] == stat['calls']]
+        if broken:
+            print(f"Fields that no longer match (layout changed?): {', '.join(broken)}")
+        dead = self.dead(min_calls)
+        if dead:
+            print(f"{len(dead)} selector alternatives never matched:")
+            for name, selector in dead:
+                print(f"  {name}: {selector}")
+
+    def save(self, path):
+        """Write the statistics to a JSON file"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.stats(), f, indent=2)
+        os.replace(tmp_path, path)
+
+
+REGISTRY = SelectorRegistry()
+
+
+def cascade(name, alternatives):
+    """Register a cascade in the default registry"""
+    return REGISTRY.register(name, alternatives)
@@ -0,0 +1,197 @@
+"""
+Change detection between scrape runs.
+
+Each run writes a compact snapshot (property_id, price, date_added, link) as
+JSON Lines sorted by property_id. The next run diffs its own sorted snapshot
+against the previous one with a streaming sorted merge, so memory use does
+not depend on the size of the previous snapshot, and emits only new, removed
+and price-changed events for downstream consumers.
+
+Note that "removed" means "not seen in this run": if a run scraped fewer
+pages than the previous one, listings beyond its last page are reported as
+removed. Delta runs only see listings added since the previous run, so their
+results are merged into the previous snapshot (partial=True) and they report
+new and price-changed listings only.
+"""
+import glob
+import json
+import os
+from datetime import datetime, timezone
+
+from transform import normalize_prices
+
+SNAPSHOT_FIELDS = ('property_id', 'price', 'date_added', 'link')
+
+
+def _snapshot_records(properties):
+    """Reduce scraped properties to sorted, de-duplicated snapshot records"""
+    prices = normalize_prices([prop.get('price') for prop in properties])
+    records = {}
+    for prop, price in zip(properties, prices):
+        if not prop.get('property_id'):
+            continue
+        record = {field: prop.get(field) for field in SNAPSHOT_FIELDS}
+        record['property_id'] = str(record['property_id'])
+        record['price'] = price
+        records[record['property_id']] = record
+    return [records[key] for key in sorted(records)]
+
+
+def write_snapshot(path, properties=None, records=None):
+    """
+    Write a sorted JSON Lines snapshot of a run.
+
+    Args:
+        path (str): Snapshot file path
+        properties (list): Scraped property dicts
+        records (list): Snapshot records sorted by property_id, instead of properties
+
+    Returns:
+        list: The snapshot records that were written
+    """
+    if records is None:
+        records = _snapshot_records(properties)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record) + '\n')
+    os.replace(tmp_path, path)
+    return records
+
+
+def iter_snapshot(path):
+    """Stream snapshot records from a JSON Lines file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+# Run timestamp in snapshot file names, and a glob matching exactly that
+TIMESTAMP_FORMAT = '%Y%m%dT%H%M%S'
+TIMESTAMP_GLOB = '[0-9]' * 8 + 'T' + '[0-9]' * 6
+SNAPSHOT_SUFFIX = '.snapshot.jsonl'
+
+
+def snapshot_path(directory, source, location, run_at=None):
+    """Build the snapshot file path for a source/location run"""
+    run_at = run_at or datetime.now(timezone.utc)
+    slug = location.lower().replace(' ', '_')
+    return os.path.join(directory, f"{source}_{slug}_{run_at.strftime(TIMESTAMP_FORMAT)}{SNAPSHOT_SUFFIX}")
+
+
+def latest_snapshot(directory, source, location):
+    """Return the most recent snapshot path for a source/location, or None"""
+    slug = location.lower().replace(' ', '_')
+    # Only timestamped snapshots: not the _changes.jsonl event log, nor another location sharing the prefix.
+    # Snapshots written before the .snapshot.jsonl suffix are still picked up.
+    paths = []
+    for suffix in (SNAPSHOT_SUFFIX, '.jsonl'):
+        paths += glob.glob(os.path.join(directory, f"{source}_{slug}_{TIMESTAMP_GLOB}{suffix}"))
+    paths.sort(key=os.path.basename)
+    return paths[-1] if paths else None
+
+
+def merge_snapshots(previous, current):
+    """
+    Merge two snapshots with a sorted merge on property_id; current records replace previous ones.
+
+    Yields:
+        dict: Snapshot records sorted by property_id
+    """
+    previous = iter(previous)
+    current = iter(current)
+    prev = next(previous, None)
+    curr = next(current, None)
+
+    while prev is not None or curr is not None:
+        if curr is None or (prev is not None and prev['property_id'] < curr['property_id']):
+            yield prev
+            prev = next(previous, None)
+        else:
+            if prev is not None and prev['property_id'] == curr['property_id']:
+                prev = next(previous, None)
+            yield curr
+            curr = next(current, None)
+
+
+def diff_snapshots(previous, current):
+    """
+    Diff two snapshots with a sorted merge on property_id.
+
+    Args:
+        previous (iterable): Previous snapshot records, sorted by property_id
+        current (iterable): Current snapshot records, sorted by property_id
+
+    Yields:
+        dict: Events with 'event' set to 'new', 'removed' or 'price_changed'
+    """
+    previous = iter(previous)
+    current = iter(current)
+    prev = next(previous, None)
+    curr = next(current, None)
+
+    while prev is not None or curr is not None:
+        if curr is None or (prev is not None and prev['property_id'] < curr['property_id']):
+            yield {'event': 'removed', 'property_id': prev['property_id'], 'price': None,
+                   'previous_price': prev.get('price'), 'link': prev.get('link')}
+            prev = next(previous, None)
+        elif prev is None or curr['property_id'] < prev['property_id']:
+            yield {'event': 'new', 'property_id': curr['property_id'], 'price': curr.get('price'),
+                   'previous_price': None, 'link': curr.get('link')}
+            curr = next(current, None)
+        else:
+            if prev.get('price') != curr.get('price'):
+                yield {'event': 'price_changed', 'property_id': curr['property_id'], 'price': curr.get('price'),
+                       'previous_price': prev.get('price'), 'link': curr.get('link')}
+            prev = next(previous, None)
+            curr = next(current, None)
+
+
+def detect_changes(source, location, properties, directory="snapshots", run_at=None, partial=False):
+    """
+    Snapshot this run's properties and diff them against the previous run.
+
+    The events are also appended to <directory>/<source>_<location>_changes.jsonl.
+
+    Args:
+        source (str): Portal name, e.g. 'rightmove' or 'zoopla'
+        location (str): Search location
+        properties (list): Scraped property dicts
+        directory (str): Directory holding snapshots and change logs
+        run_at (datetime): Time of the run (default: now, UTC)
+        partial (bool): The run only fetched some listings (a delta run); they are merged into
+            the previous snapshot, and nothing is reported as removed
+
+    Returns:
+        list: Change events for this run (every listing is 'new' on the first run)
+    """
+    os.makedirs(directory, exist_ok=True)
+    previous_path = latest_snapshot(directory, source, location)
+    run_at = run_at or datetime.now(timezone.utc)
+    current_path = snapshot_path(directory, source, location, run_at)
+    has_previous = previous_path is not None and previous_path != current_path
+    current = _snapshot_records(properties)
+    if partial and has_previous:
+        current = list(merge_snapshots(iter_snapshot(previous_path), current))
+    write_snapshot(current_path, records=current)
+
+    previous = iter_snapshot(previous_path) if has_previous else ()
+    detected_at = run_at.isoformat(timespec='seconds')
+    events = []
+    for event in diff_snapshots(previous, current):
+        event['source'] = source
+        event['detected_at'] = detected_at
+        events.append(event)
+
+    slug = location.lower().replace(' ', '_')
+    with open(os.path.join(directory, f"{source}_{slug}_changes.jsonl"), 'a', encoding='utf-8') as f:
+        for event in events:
+            f.write(json.dumps(event) + '\n')
+
+    counts = {}
+    for event in events:
+        counts[event['event']] = counts.get(event['event'], 0) + 1
+    print(f"Changes since last run: {counts.get('new', 0)} new, {counts.get('removed', 0)} removed, "
+          f"{counts.get('price_changed', 0)} price changes")
+    return events
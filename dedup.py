@@ -0,0 +1,333 @@
+"""
+Cross-portal deduplication index for Rightmove and Zoopla listings.
+
+Listings are grouped into blocks by town and bedroom count, so candidates are
+only ever compared within a small block. The town is used rather than the
+outcode because one portal often shows a postcode where the other doesn't.
+Inside a block, fuzzy address matches are found with MinHash signatures over
+character shingles of the normalised address, split into LSH bands. A
+candidate that shares at least one band and has a price within the configured
+tolerance is treated as the same property; listings without a price never
+match.
+
+Each insert costs O(shingles x permutations) plus the size of the colliding
+buckets, so building the index stays near-linear in the number of listings.
+The index is persisted to a JSON file so it can be reused across runs and
+across scrapers.
+"""
+import json
+import os
+import threading
+import zlib
+
+import patterns
+
+# Bumped when block or band keys change; older index files are not reused
+_FORMAT_VERSION = 2
+
+# Mersenne prime used for the MinHash permutations
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+_ABBREVIATIONS = {
+    'rd': 'road',
+    'st': 'street',
+    'ave': 'avenue',
+    'ln': 'lane',
+    'dr': 'drive',
+    'ct': 'court',
+    'cres': 'crescent',
+    'gdns': 'gardens',
+    'pl': 'place',
+    'sq': 'square',
+    'cl': 'close',
+    'flat': 'apartment',
+    'apt': 'apartment',
+}
+
+
+def extract_postcode(address):
+    """
+    Extract the UK postcode from an address.
+
+    Returns:
+        tuple: (outcode, full_postcode) in upper case; either may be None
+    """
+    if not address:
+        return None, None
+    matches = patterns.POSTCODE.findall(address)
+    if not matches:
+        return None, None
+    # The postcode is normally the last thing in the address
+    outcode, incode = matches[-1]
+    outcode = outcode.upper()
+    return outcode, f"{outcode} {incode.upper()}" if incode else None
+
+
+def normalize_address(address):
+    """Lower-case an address, strip punctuation and postcode, and expand abbreviations"""
+    if not address:
+        return ''
+    text = patterns.POSTCODE.sub(' ', address).lower()
+    text = patterns.NON_ALPHANUMERIC.sub(' ', text)
+    tokens = [_ABBREVIATIONS.get(token, token) for token in text.split()]
+    return ' '.join(tokens)
+
+
+def _town(address):
+    """Return the last address component that isn't just a postcode, normalised"""
+    for part in reversed((address or '').split(',')):
+        town = normalize_address(part)
+        if town:
+            return town
+    return ''
+
+
+def _beds(listing):
+    beds = listing.get('beds', listing.get('bedrooms'))
+    try:
+        return int(beds)
+    except (ValueError, TypeError):
+        return None
+
+
+def _price(listing):
+    price = listing.get('price')
+    if isinstance(price, int):
+        return price
+    match = patterns.PRICE.search(price) if isinstance(price, str) else None
+    if match:
+        try:
+            return int(match.group(1).replace(',', ''))
+        except ValueError:
+            return None
+    return None
+
+
+def _property_id(listing):
+    """Return the portal's own listing id, falling back to one parsed from the link"""
+    if listing.get('property_id'):
+        return str(listing['property_id'])
+    link = listing.get('link') or listing.get('url') or ''
+    match = patterns.PROPERTY_ID.search(link) or patterns.ZOOPLA_LISTING_ID.search(link)
+    return match.group(1) if match else None
+
+
+class DedupIndex:
+    """
+    Persistent MinHash/LSH index matching the same property across portals.
+
+    Args:
+        num_perm (int): Number of MinHash permutations per signature
+        bands (int): Number of LSH bands (num_perm must be divisible by bands)
+        shingle_size (int): Character shingle length for addresses
+        price_tolerance (float): Maximum relative price difference for a match
+    """
+
+    def __init__(self, num_perm=32, bands=8, shingle_size=3, price_tolerance=0.05):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.price_tolerance = price_tolerance
+
+        # Fixed permutation coefficients so signatures are stable across runs
+        self._perms = [(2 * i + 1) * 0x9E3779B1 % _PRIME for i in range(num_perm)]
+        self._offsets = [(i + 1) * 0x85EBCA77 % _PRIME for i in range(num_perm)]
+
+        # "source:property_id" -> [cluster_id, price, enriched]
+        self.records = {}
+        # "block|band|hash" -> ["source:property_id", ...]
+        self.buckets = {}
+        # cluster_id -> ["source:property_id", ...]
+        self.clusters = {}
+        self._next_cluster = 0
+        # Guards the index when scraper threads share it
+        self._lock = threading.RLock()
+
+    def _block_key(self, listing):
+        return f"{_town(listing.get('address'))}|{_beds(listing)}"
+
+    def _shingles(self, text):
+        size = self.shingle_size
+        if len(text) <= size:
+            return {text}
+        return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+    def signature(self, address):
+        """Compute the MinHash signature of a normalised address"""
+        hashes = [zlib.crc32(shingle.encode('utf-8')) for shingle in self._shingles(normalize_address(address))]
+        if not hashes:
+            return [_MAX_HASH] * self.num_perm
+        return [
+            min((a * h + b) % _PRIME for h in hashes) & _MAX_HASH
+            for a, b in zip(self._perms, self._offsets)
+        ]
+
+    def _band_keys(self, listing):
+        block = self._block_key(listing)
+        signature = self.signature(listing.get('address'))
+        rows = self.rows
+        keys = []
+        for band in range(self.bands):
+            chunk = ','.join(str(value) for value in signature[band * rows:(band + 1) * rows])
+            keys.append(f"{block}|{band}|{zlib.crc32(chunk.encode('ascii'))}")
+        return keys
+
+    def _price_matches(self, a, b):
+        if a is None or b is None:
+            return False
+        return abs(a - b) <= self.price_tolerance * max(a, b)
+
+    def _candidates(self, band_keys, price, exclude_source=None):
+        """Return record keys sharing a band with the listing and matching on price"""
+        seen = set()
+        matches = []
+        for key in band_keys:
+            for record_key in self.buckets.get(key, ()):
+                if record_key in seen:
+                    continue
+                seen.add(record_key)
+                if exclude_source and record_key.startswith(exclude_source + ':'):
+                    continue
+                if self._price_matches(price, self.records[record_key][1]):
+                    matches.append(record_key)
+        return matches
+
+    def find_matches(self, listing, exclude_source=None):
+        """
+        Find indexed listings that are the same property.
+
+        Args:
+            listing (dict): Scraped listing with at least an address
+            exclude_source (str): Ignore matches from this portal
+
+        Returns:
+            list: Matching "source:property_id" keys
+        """
+        band_keys = self._band_keys(listing)
+        with self._lock:
+            return self._candidates(band_keys, _price(listing), exclude_source)
+
+    def add(self, source, listing):
+        """
+        Add a listing to the index, joining an existing cluster if it matches one.
+
+        Args:
+            source (str): Portal name, e.g. 'rightmove' or 'zoopla'
+            listing (dict): Scraped listing
+
+        Returns:
+            int: Cluster id shared by all listings of the same property, or None
+                 if the listing has no usable id
+        """
+        property_id = _property_id(listing)
+        if not property_id:
+            return None
+        record_key = f"{source}:{property_id}"
+        price = _price(listing)
+        band_keys = self._band_keys(listing)
+
+        with self._lock:
+            return self._add(record_key, price, band_keys)
+
+    def _add(self, record_key, price, band_keys):
+        if record_key in self.records:
+            # Already indexed; keep the latest price
+            self.records[record_key][1] = price
+            return self.records[record_key][0]
+
+        matches = self._candidates(band_keys, price)
+        if matches:
+            cluster_id = self.records[matches[0]][0]
+        else:
+            cluster_id = self._next_cluster
+            self._next_cluster += 1
+
+        self.records[record_key] = [cluster_id, price, False]
+        self.clusters.setdefault(cluster_id, []).append(record_key)
+        for key in band_keys:
+            self.buckets.setdefault(key, []).append(record_key)
+        return cluster_id
+
+    def add_all(self, source, listings):
+        """Add a batch of listings from one portal. Returns the number of cross-portal matches."""
+        matched = 0
+        for listing in listings:
+            cluster_id = self.add(source, listing)
+            if cluster_id is None:
+                continue
+            with self._lock:
+                if any(not key.startswith(source + ':') for key in self.clusters.get(cluster_id, ())):
+                    matched += 1
+        return matched
+
+    def mark_enriched(self, source, listing):
+        """Record that detail-page data has been fetched for this listing"""
+        property_id = _property_id(listing)
+        with self._lock:
+            record = self.records.get(f"{source}:{property_id}")
+            if record:
+                record[2] = True
+
+    def enriched_elsewhere(self, source, listing):
+        """
+        Check whether the same property was already enriched under another listing.
+
+        Only Rightmove details are fetched, so the other listing is usually a
+        Rightmove one too: the same property relisted, or listed by two agents.
+
+        Returns:
+            str: The "source:property_id" key of the enriched listing, or None
+        """
+        record_key = f"{source}:{_property_id(listing)}"
+        with self._lock:
+            record = self.records.get(record_key)
+            if record:
+                others = self.clusters.get(record[0], ())
+            else:
+                others = self.find_matches(listing)
+            for key in others:
+                if key != record_key and self.records[key][2]:
+                    return key
+            return None
+
+    def save(self, path):
+        """Persist the index to a JSON file"""
+        data = {
+            'version': _FORMAT_VERSION,
+            'config': {
+                'num_perm': self.num_perm,
+                'bands': self.bands,
+                'shingle_size': self.shingle_size,
+                'price_tolerance': self.price_tolerance,
+            },
+            'next_cluster': self._next_cluster,
+            'records': self.records,
+            'buckets': self.buckets,
+        }
+        tmp_path = f"{path}.tmp"
+        with self._lock:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Load an index from a JSON file, or return an empty one if it doesn't exist"""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        index = cls(**data['config'])
+        if data.get('version') != _FORMAT_VERSION:
+            print(f"Ignoring {path}: it was written by an older version of the dedup index")
+            return index
+        index._next_cluster = data['next_cluster']
+        index.records = data['records']
+        index.buckets = data['buckets']
+        for record_key, record in index.records.items():
+            index.clusters.setdefault(record[0], []).append(record_key)
+        return index
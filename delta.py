@@ -0,0 +1,179 @@
+"""
+High-water marks for "added since last run" delta crawls.
+
+A delta crawl sorts the search by newest listed and walks pages from the top.
+Each listing is checked against the mark left by the previous run: the ids of
+the newest listings seen and the newest "Added on" date. As soon as a page
+reaches listings at or below the mark, paging stops, so a daily crawl costs
+roughly one page per 24 new listings instead of one page per 24 listings on
+the market.
+
+Featured cards are pinned above the sort order, so a single seen listing does
+not end the crawl; paging stops once a page holds stop_after_seen of them.
+
+The mark only advances when the crawl reached the old mark, ran out of
+results, or had no mark yet. A crawl cut short by an error or the page limit
+keeps the old mark, so the listings it missed are picked up next time.
+"""
+import json
+import os
+import threading
+import time
+from datetime import date, timedelta
+
+import patterns
+
+
+def parse_added_date(text, today=None):
+    """
+    Parse a card's 'Added on 12/03/2024' / 'Added today' text.
+
+    Returns:
+        datetime.date: Date added, or None for other text (e.g. 'Reduced on ...')
+    """
+    if not text:
+        return None
+    match = patterns.ADDED_ON_DATE.search(text)
+    if match:
+        day, month, year = (int(group) for group in match.groups())
+        try:
+            return date(year, month, day)
+        except ValueError:
+            return None
+    match = patterns.ADDED_RELATIVE.search(text)
+    if match:
+        today = today or date.today()
+        return today if match.group(1).lower() == 'today' else today - timedelta(days=1)
+    return None
+
+
+def mark_key(source, location, filters=None):
+    """Key of the mark for one search; different filters are different searches"""
+    key = f"{source}:{location.lower().strip()}"
+    if filters:
+        key += ':' + json.dumps(filters.to_dict(), sort_keys=True)
+    return key
+
+
+class HighWaterMarks:
+    """
+    Persistent high-water marks per (source, location, filters) search.
+
+    Args:
+        max_ids (int): Number of newest listing ids remembered per search
+    """
+
+    def __init__(self, max_ids=500):
+        self.max_ids = max_ids
+        # key -> {'newest_added': 'YYYY-MM-DD' or None, 'recent_ids': [...], 'updated_at': epoch}
+        self.marks = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            return self.marks.get(key)
+
+    def tracker(self, source, location, filters=None, stop_after_seen=2):
+        """Start a delta crawl of one search"""
+        return DeltaTracker(self, mark_key(source, location, filters), stop_after_seen)
+
+    def advance(self, key, listings):
+        """
+        Move the mark of a search past the given listings.
+
+        Args:
+            key (str): Key from mark_key
+            listings (list): Listings found by this run, newest first
+        """
+        new_ids = [str(listing['property_id']) for listing in listings if listing.get('property_id')]
+        dates = [parse_added_date(listing.get('date_added')) for listing in listings]
+        newest = max((d for d in dates if d), default=None)
+        with self._lock:
+            old = self.marks.get(key) or {'newest_added': None, 'recent_ids': []}
+            recent_ids = list(dict.fromkeys(new_ids + old['recent_ids']))[:self.max_ids]
+            old_newest = old['newest_added']
+            if newest is None or (old_newest and old_newest > newest.isoformat()):
+                newest_added = old_newest
+            else:
+                newest_added = newest.isoformat()
+            self.marks[key] = {'newest_added': newest_added, 'recent_ids': recent_ids, 'updated_at': time.time()}
+
+    def save(self, path):
+        """Persist the marks to a JSON file"""
+        tmp_path = f"{path}.tmp"
+        with self._lock:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'max_ids': self.max_ids, 'marks': self.marks}, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Load marks from a JSON file, or return empty marks if it doesn't exist"""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        marks = cls(data.get('max_ids', 500))
+        marks.marks = data['marks']
+        return marks
+
+
+class DeltaTracker:
+    """
+    Tracks one delta crawl of a search against its high-water mark.
+
+    Feed each page to filter_page in order; stop paging when it reports the
+    mark was reached, then call finish.
+    """
+
+    def __init__(self, marks, key, stop_after_seen=2):
+        self.marks = marks
+        self.key = key
+        self.stop_after_seen = stop_after_seen
+        mark = marks.get(key)
+        self.has_mark = mark is not None
+        self.seen_ids = set(mark['recent_ids']) if mark else set()
+        newest = mark and mark['newest_added']
+        self.newest_added = date.fromisoformat(newest) if newest else None
+        self.new_listings = []
+        self.reached_mark = False
+
+    def is_seen(self, listing):
+        """True if the listing is at or below the mark"""
+        property_id = listing.get('property_id')
+        if property_id and str(property_id) in self.seen_ids:
+            return True
+        added = parse_added_date(listing.get('date_added'))
+        # Same-day listings may still be new, so only strictly older ones count
+        return bool(added and self.newest_added and added < self.newest_added)
+
+    def filter_page(self, listings):
+        """
+        Split a page into new listings and ones already seen.
+
+        Returns:
+            tuple: (new listings, True if the crawl has reached the mark and should stop)
+        """
+        new = [listing for listing in listings if not self.is_seen(listing)]
+        self.new_listings.extend(new)
+        if len(listings) - len(new) >= min(self.stop_after_seen, len(listings)) and listings:
+            self.reached_mark = True
+        return new, self.reached_mark
+
+    def finish(self, exhausted=False):
+        """
+        Advance the mark if this crawl covered everything new.
+
+        Args:
+            exhausted (bool): True if paging ended because there were no more results
+
+        Returns:
+            bool: True if the mark was advanced
+        """
+        if self.reached_mark or exhausted or not self.has_mark:
+            self.marks.advance(self.key, self.new_listings)
+            print(f"Delta crawl found {len(self.new_listings)} new listings")
+            return True
+        print("Delta crawl stopped before reaching the last run's listings; "
+              "keeping the old mark (raise the page limit to catch up)")
+        return False
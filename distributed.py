@@ -0,0 +1,275 @@
+"""
+Distributed crawl mode: workers on several nodes share one work queue.
+
+`enqueue` puts one location item per (source, location) on the queue. Workers
+lease items and expand them:
+
+    location -> one page item per result page
+    page     -> listings upserted into the store, plus detail items (Rightmove)
+    detail   -> detail page merged into the listing and upserted
+
+Every item has a dedup key scoped to a crawl id (the date by default), so a
+page or detail URL is fetched once per crawl no matter how many nodes run.
+All workers reserve request slots from the same per-host rate limiter in the
+queue database. Throughput therefore grows with the number of nodes until
+the global per-host limit is reached.
+
+Usage:
+    python distributed.py enqueue --queue crawl_queue.db --source rightmove --locations "York, Derby" --pages 3
+    python distributed.py worker --queue crawl_queue.db --db listings.db --rate 0.2
+    python distributed.py status --queue crawl_queue.db
+"""
+import argparse
+import os
+import socket
+import sys
+import time
+import traceback
+from datetime import date
+
+from crawl import SOURCES, add_filter_arguments, create_portal_session, filters_from_args, import_source
+from filters import SearchFilters
+from blocking import check_response
+from ratelimit import throttle
+from storage import ListingStore
+from urls import RIGHTMOVE_PAGE_SIZE, canonicalize_url
+from work_queue import SharedRateLimiter, WorkQueue
+
+# Lower priority values are leased first, so started locations finish before new ones
+PRIORITY = {'detail': 0, 'page': 1, 'location': 2}
+
+
+def enqueue_crawl(queue, source, locations, pages=5, fetch_details=True, max_details=10, crawl_id=None,
+                  filters=None):
+    """
+    Queue location items for a crawl.
+
+    Args:
+        queue (WorkQueue): Shared work queue
+        source (str): Portal name
+        locations (list): Locations to search
+        pages (int): Result pages per location
+        fetch_details (bool): Queue detail pages (Rightmove only)
+        max_details (int): Maximum detail pages per location
+        crawl_id (str): Scope of the dedup keys; defaults to today's date
+        filters (dict): Optional search filters (see filters.SearchFilters)
+
+    Returns:
+        int: Number of items newly queued
+    """
+    crawl_id = crawl_id or date.today().isoformat()
+    filters = SearchFilters.from_dict(filters)
+    items = []
+    for location in locations:
+        payload = {
+            'crawl_id': crawl_id,
+            'location': location,
+            'pages': pages,
+            'fetch_details': fetch_details,
+            'max_details': max_details if fetch_details else 0,
+            'filters': filters.to_dict() if filters else None,
+        }
+        dedup_key = f"{crawl_id}:{source}:location:{location.lower().strip()}"
+        if filters:
+            # The same location with different filters is a different search
+            dedup_key += f":{sorted(filters.to_dict().items())}"
+        items.append(('location', source, payload, dedup_key, PRIORITY['location']))
+    return queue.put_many(items)
+
+
+class CrawlWorker:
+    """
+    Leases and processes work items until the queue is drained.
+
+    Args:
+        queue (WorkQueue): Shared work queue
+        store (ListingStore): Listing store the results are upserted into
+        rate (float): Global requests per second per host, shared by all workers
+        proxy (str): Optional proxy URL
+        worker_id (str): Identifier used for leases; defaults to host:pid
+        lease_seconds (float): Lease length per item
+    """
+
+    def __init__(self, queue, store, rate=0.1, proxy=None, worker_id=None, lease_seconds=300):
+        self.queue = queue
+        self.store = store
+        self.rate_limiter = SharedRateLimiter(queue, rate, jitter=1.0)
+        self.proxy = proxy
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.sessions = {}
+
+    def session(self, source):
+        if source not in self.sessions:
+            self.sessions[source] = create_portal_session(source, self.proxy, self.rate_limiter)
+        return self.sessions[source]
+
+    def fetch(self, source, url):
+        """Fetch a search page through the global rate limiter"""
+        module = import_source(source)
+        session = self.session(source)
+        if source == 'rightmove':
+            response = module.make_request(session, url)
+            if response is None:
+                # Failed items are nacked and retried later, by which time the session has rotated
+                raise RuntimeError(f"Failed to fetch {url}")
+            return response
+        throttle(session, url)
+        response = check_response(session.get(url, timeout=15))
+        response.raise_for_status()
+        return response
+
+    def handle_location(self, item):
+        payload = item['payload']
+        source = item['source']
+        module = import_source(source)
+        crawl_id = payload['crawl_id']
+        filters = SearchFilters.from_dict(payload.get('filters'))
+
+        if source == 'rightmove':
+            location_id = module.resolve_location_identifier(self.session(source), payload['location'])
+            pages = range(payload['pages'])
+            urls = [module.build_search_url(location_id, page, filters) for page in pages]
+        else:
+            pages = range(1, payload['pages'] + 1)
+            urls = [module.build_search_url(payload['location'], page, filters) for page in pages]
+
+        items = []
+        for page, url in zip(pages, urls):
+            page_payload = dict(payload, page=page, url=url)
+            dedup_key = f"{crawl_id}:{source}:page:{canonicalize_url(url)}"
+            items.append(('page', source, page_payload, dedup_key, PRIORITY['page']))
+        queued = self.queue.put_many(items)
+        print(f"[{self.worker_id}] Queued {queued} pages for {source} {payload['location']}")
+
+    def handle_page(self, item):
+        payload = item['payload']
+        source = item['source']
+        module = import_source(source)
+
+        response = self.fetch(source, payload['url'])
+        properties = module.parse_search_page(response.content)
+        filters = SearchFilters.from_dict(payload.get('filters'))
+        if properties and filters:
+            properties = filters.apply(properties)
+        if not properties:
+            print(f"[{self.worker_id}] No listings found on {payload['url']}")
+            return
+
+        self.store.upsert_many(source, properties, payload['location'])
+        print(f"[{self.worker_id}] Stored {len(properties)} {source} properties from page {payload['page']} of {payload['location']}")
+
+        if source != 'rightmove' or not payload['fetch_details']:
+            return
+        # Detail budget is per location, counted from the start of the results
+        items = []
+        for position, prop in enumerate(properties, start=payload['page'] * RIGHTMOVE_PAGE_SIZE):
+            if position >= payload['max_details']:
+                break
+            if not prop.get('property_id'):
+                continue
+            detail_payload = {'location': payload['location'], 'property': dict(prop)}
+            dedup_key = f"{payload['crawl_id']}:{source}:detail:{prop['property_id']}"
+            items.append(('detail', source, detail_payload, dedup_key, PRIORITY['detail']))
+        if items:
+            self.queue.put_many(items)
+
+    def handle_detail(self, item):
+        payload = item['payload']
+        source = item['source']
+        module = import_source(source)
+        prop = payload['property']
+        prop.update(module.scrape_property_details(self.session(source), prop['link']))
+        self.store.upsert_many(source, [prop], payload['location'])
+
+    def process(self, item):
+        handler = {
+            'location': self.handle_location,
+            'page': self.handle_page,
+            'detail': self.handle_detail,
+        }[item['kind']]
+        handler(item)
+
+    def run(self, exit_when_empty=True, poll_interval=5.0):
+        """
+        Process items until the queue is drained (or forever if exit_when_empty is False).
+
+        Returns:
+            int: Number of items processed successfully
+        """
+        processed = 0
+        while True:
+            item = self.queue.lease(self.worker_id, self.lease_seconds)
+            if item is None:
+                if exit_when_empty and self.queue.pending_count() == 0:
+                    break
+                time.sleep(poll_interval)
+                continue
+            try:
+                self.process(item)
+            except Exception as e:
+                print(f"[{self.worker_id}] {item['kind']} item {item['id']} failed (attempt {item['attempts']}): {e}")
+                traceback.print_exc()
+                self.queue.nack(item['id'], self.worker_id, error=str(e), delay=30 * item['attempts'])
+                continue
+            if self.queue.ack(item['id'], self.worker_id):
+                processed += 1
+        print(f"[{self.worker_id}] Processed {processed} items")
+        return processed
+
+    def close(self):
+        for session in self.sessions.values():
+            session.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Distributed Rightmove/Zoopla crawl over a shared work queue")
+    parser.add_argument('--queue', default='crawl_queue.db', help="Shared queue database")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    enqueue = commands.add_parser('enqueue', help="Queue location jobs")
+    enqueue.add_argument('--source', choices=sorted(SOURCES), default='rightmove')
+    enqueue.add_argument('--locations', required=True, help="Comma-separated locations")
+    enqueue.add_argument('--pages', type=int, default=5)
+    enqueue.add_argument('--no-details', action='store_true')
+    enqueue.add_argument('--max-details', type=int, default=10)
+    enqueue.add_argument('--crawl-id', help="Dedup scope; defaults to today's date")
+    add_filter_arguments(enqueue)
+
+    worker = commands.add_parser('worker', help="Process queued items")
+    worker.add_argument('--db', default='listings.db', help="Listing store database")
+    worker.add_argument('--rate', type=float, default=0.1, help="Requests per second per host, across all workers")
+    worker.add_argument('--proxy', help="Proxy URL")
+    worker.add_argument('--worker-id', help="Lease owner id; defaults to host:pid")
+    worker.add_argument('--forever', action='store_true', help="Keep polling when the queue is empty")
+
+    commands.add_parser('status', help="Show queue counts")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    queue = WorkQueue(args.queue)
+    try:
+        if args.command == 'enqueue':
+            locations = [loc.strip() for loc in args.locations.split(',') if loc.strip()]
+            queued = enqueue_crawl(queue, args.source, locations, args.pages, not args.no_details,
+                                   args.max_details, args.crawl_id, filters_from_args(args))
+            print(f"Queued {queued} location items")
+        elif args.command == 'worker':
+            with ListingStore(args.db) as store:
+                worker = CrawlWorker(queue, store, args.rate, args.proxy, args.worker_id)
+                try:
+                    worker.run(exit_when_empty=not args.forever)
+                finally:
+                    worker.close()
+        else:
+            for status, kinds in sorted(queue.stats().items()):
+                print(f"{status}: " + ', '.join(f"{kind}={count}" for kind, count in sorted(kinds.items())))
+    finally:
+        queue.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+"""
+Typed search filters mapped onto each portal's query parameters.
+
+Filtering on the portal means only matching listings are downloaded, so a
+crawl for 2-3 bed houses under £300k fetches a handful of pages instead of
+every listing in the area and throwing most of them away afterwards (as the
+notebook does with "Land for sale"). SearchFilters.matches re-checks parsed
+cards, because featured/promoted cards can ignore the search filters.
+"""
+import patterns
+
+# Portal-neutral property types -> (Rightmove propertyTypes value, Zoopla property_sub_type value)
+PROPERTY_TYPES = {
+    'detached': ('detached', 'detached'),
+    'semi-detached': ('semi-detached', 'semi_detached'),
+    'terraced': ('terraced', 'terraced'),
+    'flat': ('flat', 'flats'),
+    'bungalow': ('bungalow', 'bungalow'),
+    'land': ('land', 'land'),
+    'park-home': ('park-home', 'park_home'),
+}
+
+# Search radius in miles; both portals only accept these values
+RADIUS_MILES = (0.0, 0.25, 0.5, 1.0, 3.0, 5.0, 10.0, 15.0, 20.0, 30.0, 40.0)
+
+# Added-since windows in days -> Zoopla 'added' value (Rightmove takes the day count)
+ADDED_SINCE_DAYS = {1: '24_hours', 3: '3_days', 7: '7_days', 14: '14_days'}
+
+# Card description/title text that marks a plot rather than a dwelling
+_LAND_MARKERS = ('land for sale', 'plot for sale')
+
+
+class SearchFilters:
+    """
+    Search filters shared by the Rightmove and Zoopla scrapers.
+
+    Args:
+        min_price (int): Minimum asking price in pounds
+        max_price (int): Maximum asking price in pounds
+        min_beds (int): Minimum bedrooms
+        max_beds (int): Maximum bedrooms
+        property_types (list): Types to include, from PROPERTY_TYPES; all types if empty
+        radius (float): Search radius in miles around the location, from RADIUS_MILES
+        added_since (int): Only listings added in the last 1, 3, 7 or 14 days
+        include_sold (bool): Include sold subject to contract / under offer listings
+
+    Raises:
+        ValueError: If a value is out of range or not supported by the portals
+    """
+
+    FIELDS = ('min_price', 'max_price', 'min_beds', 'max_beds', 'property_types',
+              'radius', 'added_since', 'include_sold')
+
+    def __init__(self, min_price=None, max_price=None, min_beds=None, max_beds=None,
+                 property_types=None, radius=None, added_since=None, include_sold=False):
+        self.min_price = _optional_int('min_price', min_price)
+        self.max_price = _optional_int('max_price', max_price)
+        self.min_beds = _optional_int('min_beds', min_beds)
+        self.max_beds = _optional_int('max_beds', max_beds)
+        if isinstance(property_types, str):
+            property_types = property_types.split(',')
+        self.property_types = [t.strip().lower() for t in property_types or () if t.strip()]
+        self.radius = float(radius) if radius is not None else None
+        self.added_since = _optional_int('added_since', added_since)
+        self.include_sold = bool(include_sold)
+        self.validate()
+
+    def validate(self):
+        if self.min_price is not None and self.max_price is not None and self.min_price > self.max_price:
+            raise ValueError("min_price is greater than max_price")
+        if self.min_beds is not None and self.max_beds is not None and self.min_beds > self.max_beds:
+            raise ValueError("min_beds is greater than max_beds")
+        unknown = set(self.property_types) - set(PROPERTY_TYPES)
+        if unknown:
+            raise ValueError(f"Unknown property types: {', '.join(sorted(unknown))}; "
+                             f"expected {', '.join(PROPERTY_TYPES)}")
+        if self.radius is not None and self.radius not in RADIUS_MILES:
+            raise ValueError(f"radius must be one of {', '.join(str(r) for r in RADIUS_MILES)} miles")
+        if self.added_since is not None and self.added_since not in ADDED_SINCE_DAYS:
+            raise ValueError(f"added_since must be one of {', '.join(str(d) for d in ADDED_SINCE_DAYS)} days")
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build filters from a job spec mapping; None or {} gives no filters"""
+        if data is None:
+            return None
+        if isinstance(data, cls):
+            return data
+        unknown = set(data) - set(cls.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown search filters: {', '.join(sorted(unknown))}")
+        return cls(**data)
+
+    def to_dict(self):
+        """Return the filters as a JSON-serialisable dict, omitting unset values"""
+        data = {}
+        for field in self.FIELDS:
+            value = getattr(self, field)
+            if value not in (None, [], False):
+                data[field] = value
+        return data
+
+    def rightmove_params(self):
+        """Query parameters for a Rightmove find.html search"""
+        params = {}
+        if self.min_price is not None:
+            params['minPrice'] = self.min_price
+        if self.max_price is not None:
+            params['maxPrice'] = self.max_price
+        if self.min_beds is not None:
+            params['minBedrooms'] = self.min_beds
+        if self.max_beds is not None:
+            params['maxBedrooms'] = self.max_beds
+        if self.property_types:
+            params['propertyTypes'] = ','.join(PROPERTY_TYPES[t][0] for t in self.property_types)
+        if self.radius is not None:
+            params['radius'] = self.radius
+        if self.added_since is not None:
+            params['maxDaysSinceAdded'] = self.added_since
+        params['includeSSTC'] = 'true' if self.include_sold else 'false'
+        return params
+
+    def zoopla_params(self):
+        """
+        Query parameters for a Zoopla for-sale search.
+
+        property_sub_type is a list and is repeated in the query string.
+        include_sold has no Zoopla equivalent and is not sent.
+        """
+        params = {}
+        if self.min_price is not None:
+            params['price_min'] = self.min_price
+        if self.max_price is not None:
+            params['price_max'] = self.max_price
+        if self.min_beds is not None:
+            params['beds_min'] = self.min_beds
+        if self.max_beds is not None:
+            params['beds_max'] = self.max_beds
+        if self.property_types:
+            params['property_sub_type'] = [PROPERTY_TYPES[t][1] for t in self.property_types]
+        if self.radius is not None:
+            params['radius'] = self.radius
+        if self.added_since is not None:
+            params['added'] = ADDED_SINCE_DAYS[self.added_since]
+        return params
+
+    def matches(self, listing):
+        """
+        Check a parsed search card against the filters.
+
+        Values missing from the card are treated as matching, so only cards
+        that clearly fall outside the filters are dropped.
+        """
+        price = _listing_price(listing)
+        if price is not None:
+            if self.min_price is not None and price < self.min_price:
+                return False
+            if self.max_price is not None and price > self.max_price:
+                return False
+        beds = _listing_beds(listing)
+        if beds is not None:
+            if self.min_beds is not None and beds < self.min_beds:
+                return False
+            if self.max_beds is not None and beds > self.max_beds:
+                return False
+        if self.property_types and 'land' not in self.property_types and _is_land(listing):
+            return False
+        return True
+
+    def apply(self, listings):
+        """Return the listings that match, printing how many were dropped"""
+        kept = [listing for listing in listings if self.matches(listing)]
+        if len(kept) < len(listings):
+            print(f"Dropped {len(listings) - len(kept)} listings outside the search filters")
+        return kept
+
+    def __bool__(self):
+        return bool(self.to_dict())
+
+    def __repr__(self):
+        return f"SearchFilters({', '.join(f'{k}={v!r}' for k, v in self.to_dict().items())})"
+
+
+def _optional_int(name, value):
+    if value is None or value == '':
+        return None
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be an integer, got {value!r}")
+    if value < 0:
+        raise ValueError(f"{name} must not be negative")
+    return value
+
+
+def _listing_price(listing):
+    price = listing.get('price')
+    if isinstance(price, int):
+        return price
+    match = patterns.PRICE.search(price) if isinstance(price, str) else None
+    digits = match.group(1).replace(',', '') if match else ''
+    return int(digits) if digits else None
+
+
+def _listing_beds(listing):
+    beds = listing.get('bedrooms', listing.get('beds'))
+    if isinstance(beds, str):
+        beds = beds.strip()
+        match = patterns.BEDS.search(beds)
+        beds = int(match.group(1)) if match else int(beds) if beds.isdigit() else None
+    # 0 is a studio; only a missing count is unknown
+    return beds if isinstance(beds, int) else None
+
+
+def _is_land(listing):
+    """Whether a card is a plot of land: by its type ('Land', 'Plot'), or its title or description text"""
+    if patterns.LAND_TYPE.search(listing.get('type') or ''):
+        return True
+    text = f"{listing.get('title') or ''} {listing.get('description') or ''}".lower()
+    return any(marker in text for marker in _LAND_MARKERS)
@@ -0,0 +1,312 @@
+"""
+Crawl frontier fed by the listing links on Rightmove detail pages.
+
+A detail page links to similar properties and to recently sold properties
+nearby. Those links used to be kept only as text in similar_properties and
+market_stats_recent_sales_nearby. The frontier turns them into a queue of
+detail fetches, so one detail request can lead to several listings that no
+search page has shown yet.
+
+Only listings that are not already known are queued: listings from search
+pages, from earlier fetches, from the listing store, or already waiting in
+the queue. A listing waiting in the queue scores higher the more pages link
+to it. It also scores higher the fewer listings are known in its area
+(outcode, or town when the address has no postcode), and lower the more
+hops it is from a search result:
+
+    score = sum of link weights * DEPTH_DECAY ** (depth - 1) / (1 + known listings in its area)
+
+pop() returns the highest-scoring listing. Every listing in an area is divided
+by the same count, so listings are kept in one heap per area, and the areas in
+a heap by the score of their best listing. Fetching a listing changes the
+score of one area entry instead of every listing queued in that area.
+"""
+import heapq
+import json
+import os
+import threading
+
+import patterns
+import urls
+from dedup import extract_postcode
+
+# Weight of one link to a listing, by the section it was found in
+LINK_WEIGHTS = {
+    'similar': 1.0,
+    # Sold listings are off the market; their pages still add price history and coverage
+    'sold': 0.5,
+}
+
+# Detail-page fields holding listing links, and the kind of link each holds
+LINK_FIELDS = {
+    'similar_properties': 'similar',
+    'market_stats_recent_sales_nearby': 'sold',
+}
+
+# Score factor per hop away from a search result
+DEPTH_DECAY = 0.5
+
+
+def listing_area(listing):
+    """Return a listing's outcode, or the last part of its address, as the area it counts towards"""
+    address = listing.get('address')
+    outcode, _ = extract_postcode(listing.get('postcode'))
+    if outcode is None:
+        outcode, _ = extract_postcode(address)
+    if outcode is not None:
+        return outcode
+    if address:
+        town = address.rsplit(',', 1)[-1].strip().lower()
+        return town or None
+    return None
+
+
+def discovered_links(listing):
+    """
+    Yield the listing links found on a detail page.
+
+    Args:
+        listing (dict): Property with detail fields (similar_properties, market_stats_recent_sales_nearby)
+
+    Yields:
+        tuple: (kind, property_id, url, hint) where hint holds the card's address (and price, for similar listings)
+    """
+    for field, kind in LINK_FIELDS.items():
+        items = listing.get(field) or ()
+        if isinstance(items, str):
+            # Records that went through the UKProperty transform hold these as JSON text
+            try:
+                items = json.loads(items)
+            except ValueError:
+                continue
+        for item in items:
+            if not isinstance(item, dict) or not item.get('link'):
+                continue
+            match = patterns.PROPERTY_ID.search(item['link'])
+            if not match:
+                continue
+            hint = {'address': item['address']} if item.get('address') else {}
+            # A sold price isn't an asking price
+            if kind == 'similar' and item.get('price'):
+                hint['price'] = item['price']
+            yield kind, match.group(1), urls.rightmove_property_url(match.group(1)), hint
+
+
+class CrawlFrontier:
+    """
+    Priority queue of discovered listings, deduplicated against known ids.
+
+    Thread-safe, so location jobs running in parallel can share one frontier.
+
+    Args:
+        max_depth (int): Links followed from a search result; listings further away are not queued
+        max_pending (int): Maximum number of queued listings; further discoveries are dropped
+    """
+
+    def __init__(self, max_depth=2, max_pending=100_000):
+        self.max_depth = max_depth
+        self.max_pending = max_pending
+        self.known = set()
+        # area -> number of known listings in it
+        self.area_counts = {}
+        # property_id -> {'url', 'depth', 'kind', 'weight', 'referrers', 'area', 'hint'}
+        self.pending = {}
+        # area -> heap of its queued listings by link weight and depth; the area count divides them all alike
+        self._areas = {}
+        # Heap of areas by the score of their best queued listing, and the sequence number of each area's live entry
+        self._heap = []
+        self._area_entries = {}
+        self._sequence = 0
+        self.discovered = 0
+        self.duplicates = 0
+        self.dropped = 0
+        self.popped = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.pending)
+
+    def _mark_known(self, property_id, area):
+        if property_id in self.known:
+            return False
+        self.known.add(property_id)
+        # A queued listing that turns up elsewhere (e.g. on a search page) no longer needs fetching
+        self.pending.pop(property_id, None)
+        if area:
+            self.area_counts[area] = self.area_counts.get(area, 0) + 1
+        return True
+
+    def add_known(self, listings):
+        """
+        Register listings that are already scraped (search results, store rows).
+
+        Args:
+            listings (iterable): Property dicts with property_id (or id) and address
+
+        Returns:
+            int: Number of listings that were not known yet
+        """
+        added = 0
+        with self._lock:
+            for listing in listings:
+                property_id = listing.get('property_id') or listing.get('id')
+                if property_id:
+                    added += self._mark_known(str(property_id), listing_area(listing))
+        return added
+
+    def add_known_ids(self, property_ids):
+        """Register listing ids that are already scraped, without an area (e.g. from the listing store)"""
+        with self._lock:
+            for property_id in property_ids:
+                self._mark_known(str(property_id), None)
+
+    def _base(self, entry):
+        return entry['weight'] * DEPTH_DECAY ** (entry['depth'] - 1)
+
+    def _push(self, heap, score, key):
+        self._sequence += 1
+        heapq.heappush(heap, (-score, self._sequence, key))
+        return self._sequence
+
+    def _area_best(self, area):
+        """Return (base score, property_id) of an area's best queued listing, dropping outdated heap entries"""
+        heap = self._areas.get(area)
+        while heap:
+            negative_base, _, property_id = heap[0]
+            entry = self.pending.get(property_id)
+            # Fetched or found elsewhere since, or pushed again with a higher score
+            if entry is None or self._base(entry) > -negative_base:
+                heapq.heappop(heap)
+                continue
+            return -negative_base, property_id
+        if heap is not None:
+            del self._areas[area]
+        return None
+
+    def _push_area(self, area):
+        best = self._area_best(area)
+        if best is not None:
+            self._area_entries[area] = self._push(self._heap, best[0] / (1 + self.area_counts.get(area, 0)), area)
+
+    def discover(self, listing, depth=0):
+        """
+        Queue the unknown listings linked from a fetched detail page.
+
+        Args:
+            listing (dict): The fetched property, with its detail fields
+            depth (int): Hops from a search result to this listing (0 for a search result)
+
+        Returns:
+            int: Number of listings newly queued
+        """
+        referrer = str(listing.get('property_id') or listing.get('url') or '')
+        new = 0
+        with self._lock:
+            for kind, property_id, url, hint in discovered_links(listing):
+                if property_id in self.known:
+                    self.duplicates += 1
+                    continue
+                entry = self.pending.get(property_id)
+                if entry is None:
+                    if depth + 1 > self.max_depth:
+                        continue
+                    if len(self.pending) >= self.max_pending:
+                        self.dropped += 1
+                        continue
+                    entry = self.pending[property_id] = {
+                        'url': url, 'depth': depth + 1, 'kind': kind, 'weight': 0.0, 'referrers': [],
+                        'area': listing_area(hint) or listing_area(listing), 'hint': hint,
+                    }
+                    self.discovered += 1
+                    new += 1
+                else:
+                    self.duplicates += 1
+                    if referrer in entry['referrers']:
+                        continue
+                    # Reached in fewer hops this time
+                    entry['depth'] = min(entry['depth'], depth + 1)
+                    if kind == 'similar':
+                        entry['kind'] = kind
+                        entry['hint'] = dict(hint, **entry['hint'])
+                entry['referrers'].append(referrer)
+                entry['weight'] += LINK_WEIGHTS[kind]
+                self._push(self._areas.setdefault(entry['area'], []), self._base(entry), property_id)
+                self._push_area(entry['area'])
+        return new
+
+    def pop(self):
+        """
+        Take the best queued listing and mark it known.
+
+        Returns:
+            dict: {'property_id', 'url', 'depth', 'kind', 'score', 'hint'}, or None if the queue is empty
+        """
+        with self._lock:
+            while self._heap:
+                negative_score, sequence, area = heapq.heappop(self._heap)
+                if self._area_entries.get(area) != sequence:
+                    # Outdated: the area was pushed again since
+                    continue
+                del self._area_entries[area]
+                best = self._area_best(area)
+                if best is None:
+                    continue
+                base, property_id = best
+                score = base / (1 + self.area_counts.get(area, 0))
+                if self._heap and score < -self._heap[0][0]:
+                    # Its best listing was taken elsewhere, or the area filled up; requeue it at its current score
+                    self._area_entries[area] = self._push(self._heap, score, area)
+                    continue
+                entry = self.pending[property_id]
+                self._mark_known(property_id, area)
+                self._push_area(area)
+                self.popped += 1
+                return {
+                    'property_id': property_id, 'url': entry['url'], 'depth': entry['depth'],
+                    'kind': entry['kind'], 'score': score, 'hint': dict(entry['hint']),
+                }
+            return None
+
+    def stats(self):
+        """Return counts of queued, discovered, duplicate, dropped and fetched listings"""
+        with self._lock:
+            return {
+                'pending': len(self.pending),
+                'known': len(self.known),
+                'discovered': self.discovered,
+                'duplicate_links': self.duplicates,
+                'dropped': self.dropped,
+                'popped': self.popped,
+            }
+
+    def save(self, path):
+        """Persist the known ids, area counts and queued listings to a JSON file"""
+        tmp_path = f"{path}.tmp"
+        with self._lock:
+            data = {
+                'max_depth': self.max_depth,
+                'max_pending': self.max_pending,
+                'known': sorted(self.known),
+                'area_counts': self.area_counts,
+                'pending': self.pending,
+            }
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Load a frontier from a JSON file, or return an empty one if it doesn't exist"""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        frontier = cls(data['max_depth'], data['max_pending'])
+        frontier.known = set(data['known'])
+        frontier.area_counts = data['area_counts']
+        frontier.pending = data['pending']
+        for property_id, entry in frontier.pending.items():
+            frontier._push(frontier._areas.setdefault(entry['area'], []), frontier._base(entry), property_id)
+        for area in list(frontier._areas):
+            frontier._push_area(area)
+        return frontier
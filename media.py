@@ -0,0 +1,301 @@
+"""
+Content-addressed media store for listing images and floor plans.
+
+scrape_property_details only records image URLs. MediaStore downloads them
+on a bounded thread pool and stores each file once under its SHA-256:
+
+    media/
+      media.db                      url -> sha256, listing -> urls
+      objects/ab/abcdef....jpg      one file per distinct image
+      thumbs/320/abcdef....jpg      thumbnails, made on first request
+
+A URL already in media.db (with its file present) is never fetched again, and
+an image served under several URLs (agents reuse photos across listings) is
+stored once. Files are written to a temporary name and renamed into place
+before their row is committed, so an interrupted run resumes by fetching only
+the URLs that have no row yet.
+
+Thumbnails are resized locally when Pillow is installed. Without it they are
+fetched as the portal's own smaller rendition (the _max_WxH URL suffix).
+"""
+import hashlib
+import json
+import mimetypes
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import patterns
+from ratelimit import throttle
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS media (
+    url TEXT PRIMARY KEY,
+    sha256 TEXT,
+    ext TEXT,
+    bytes INTEGER,
+    error TEXT,
+    fetched_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_media_sha256 ON media (sha256);
+
+CREATE TABLE IF NOT EXISTS listing_media (
+    source TEXT NOT NULL,
+    property_id TEXT NOT NULL,
+    url TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (source, property_id, url)
+);
+"""
+
+# Listing field -> media kind
+MEDIA_FIELDS = {
+    'property_images': 'image',
+    'floor_plans': 'floor_plan',
+}
+
+_EXTENSIONS = {'image/jpeg': '.jpg', 'image/png': '.png', 'image/gif': '.gif', 'image/webp': '.webp'}
+
+
+def _normalize_url(url):
+    url = url.strip()
+    return 'https:' + url if url.startswith('//') else url
+
+
+def listing_media_urls(listing):
+    """
+    Collect the media URLs of a scraped listing.
+
+    Returns:
+        list: (url, kind) tuples in listing order, without duplicates
+    """
+    found = []
+    for field, kind in MEDIA_FIELDS.items():
+        value = listing.get(field)
+        if isinstance(value, str):
+            # CSV round trips leave the lists JSON-encoded
+            try:
+                value = json.loads(value)
+            except ValueError:
+                value = [value]
+        for url in value or ():
+            if isinstance(url, dict):
+                url = url.get('url') or url.get('src')
+            if url:
+                found.append((_normalize_url(url), kind))
+    return list(dict.fromkeys(found))
+
+
+class MediaStore:
+    """
+    Downloads listing media into a content-addressed directory.
+
+    Args:
+        root (str): Store directory
+        session (requests.Session): Session used for downloads; its rate limiter is honoured
+        max_workers (int): Size of the download pool
+        timeout (float): Per-request timeout in seconds
+    """
+
+    def __init__(self, root="media", session=None, max_workers=8, timeout=20):
+        self.root = root
+        os.makedirs(os.path.join(root, 'objects'), exist_ok=True)
+        if session is None:
+            import requests
+            session = requests.Session()
+        self.session = session
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.conn = sqlite3.connect(os.path.join(root, 'media.db'), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        # Serialises database writes from the download threads
+        self._lock = threading.Lock()
+        # URLs being downloaded right now, so concurrent listings don't fetch them twice
+        self._in_flight = {}
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def object_path(self, sha256, ext='.jpg'):
+        return os.path.join(self.root, 'objects', sha256[:2], sha256 + ext)
+
+    def lookup(self, url):
+        """
+        Return the stored object for a URL.
+
+        Returns:
+            str: Path of the stored file, or None if the URL is not stored (or its file was deleted)
+        """
+        with self._lock:
+            return self._stored_path(url)
+
+    def _stored_path(self, url):
+        """lookup() for callers that hold the lock"""
+        row = self.conn.execute("SELECT sha256, ext FROM media WHERE url = ? AND sha256 IS NOT NULL",
+                                (url,)).fetchone()
+        if row:
+            path = self.object_path(*row)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def _store(self, url, content, content_type):
+        sha256 = hashlib.sha256(content).hexdigest()
+        ext = _EXTENSIONS.get((content_type or '').split(';')[0].strip()) \
+            or os.path.splitext(url.split('?')[0])[1].lower() or mimetypes.guess_extension(content_type or '') or '.bin'
+        path = self.object_path(sha256, ext)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        with self._lock:
+            self.conn.execute(
+                "INSERT INTO media (url, sha256, ext, bytes, error, fetched_at) VALUES (?, ?, ?, ?, NULL, ?) "
+                "ON CONFLICT (url) DO UPDATE SET sha256 = excluded.sha256, ext = excluded.ext, "
+                "bytes = excluded.bytes, error = NULL, fetched_at = excluded.fetched_at",
+                (url, sha256, ext, len(content), time.time())
+            )
+            self.conn.commit()
+        return path
+
+    def fetch(self, url):
+        """
+        Download one URL unless it is already stored.
+
+        Returns:
+            tuple: (path or None, True if a request was made)
+        """
+        # Checked together with the in-flight URLs, so a URL another thread has
+        # just finished storing is not downloaded again
+        with self._lock:
+            path = self._stored_path(url)
+            if path:
+                return path, False
+            event = self._in_flight.get(url)
+            if event is None:
+                self._in_flight[url] = threading.Event()
+        if event is not None:
+            # Another thread is fetching this URL
+            event.wait()
+            return self.lookup(url), False
+
+        try:
+            throttle(self.session, url)
+            response = self.session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            return self._store(url, response.content, response.headers.get('Content-Type')), True
+        except Exception as e:
+            print(f"Error downloading {url}: {e}")
+            with self._lock:
+                self.conn.execute(
+                    "INSERT INTO media (url, error, fetched_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT (url) DO UPDATE SET error = excluded.error, fetched_at = excluded.fetched_at",
+                    (url, str(e), time.time())
+                )
+                self.conn.commit()
+            return None, True
+        finally:
+            with self._lock:
+                self._in_flight.pop(url).set()
+
+    def download_listings(self, source, listings):
+        """
+        Download the images and floor plans of a batch of listings.
+
+        Args:
+            source (str): Portal name
+            listings (list): Scraped listings with property_images / floor_plans
+
+        Returns:
+            dict: Counts of 'urls', 'downloaded', 'cached' and 'failed'
+        """
+        links = []
+        for listing in listings:
+            property_id = listing.get('property_id')
+            if not property_id:
+                continue
+            for position, (url, kind) in enumerate(listing_media_urls(listing)):
+                links.append((source, str(property_id), url, kind, position))
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO listing_media (source, property_id, url, kind, position) VALUES (?, ?, ?, ?, ?)",
+                links
+            )
+            self.conn.commit()
+
+        urls = list(dict.fromkeys(link[2] for link in links))
+        stats = {'urls': len(urls), 'downloaded': 0, 'cached': 0, 'failed': 0}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for path, requested in executor.map(self.fetch, urls):
+                if path is None:
+                    stats['failed'] += 1
+                elif requested:
+                    stats['downloaded'] += 1
+                else:
+                    stats['cached'] += 1
+        print(f"Media: {stats['downloaded']} downloaded, {stats['cached']} already stored, "
+              f"{stats['failed']} failed ({stats['urls']} URLs)")
+        return stats
+
+    def listing_files(self, source, property_id, kind=None):
+        """
+        Return the stored files of one listing in listing order.
+
+        Returns:
+            list: (kind, path) tuples for the media that has been downloaded
+        """
+        sql = ("SELECT l.kind, m.sha256, m.ext FROM listing_media l JOIN media m ON m.url = l.url "
+               "WHERE l.source = ? AND l.property_id = ? AND m.sha256 IS NOT NULL")
+        params = [source, str(property_id)]
+        if kind:
+            sql += " AND l.kind = ?"
+            params.append(kind)
+        with self._lock:
+            rows = self.conn.execute(sql + " ORDER BY l.kind, l.position", params).fetchall()
+        return [(row[0], self.object_path(row[1], row[2])) for row in rows]
+
+    def thumbnail(self, url, size=320):
+        """
+        Return a thumbnail of a stored image, making it on first request.
+
+        Args:
+            url (str): Original media URL
+            size (int): Maximum width and height in pixels
+
+        Returns:
+            str: Path of the thumbnail, or None if the image is unavailable
+        """
+        try:
+            from PIL import Image
+        except ImportError:
+            # No Pillow: fetch the portal's own smaller rendition instead
+            if not patterns.IMAGE_SIZE.search(url):
+                raise RuntimeError("Thumbnails of this URL need Pillow (pip install pillow)")
+            return self.fetch(patterns.IMAGE_SIZE.sub(f'_max_{size}x{size}', url))[0]
+
+        original = self.lookup(url) or self.fetch(url)[0]
+        if original is None:
+            return None
+        sha256 = os.path.splitext(os.path.basename(original))[0]
+        path = os.path.join(self.root, 'thumbs', str(size), sha256 + '.jpg')
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with Image.open(original) as image:
+                image.thumbnail((size, size))
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                image.convert('RGB').save(tmp_path, 'JPEG', quality=85)
+            os.replace(tmp_path, path)
+        return path
@@ -0,0 +1,254 @@
+"""
+Rightmove detail pages from the embedded page-model JSON.
+
+Every Rightmove detail page carries the data it renders as one JSON object:
+
+    <script>window.PAGE_MODEL = {"propertyData": {...}, "metadata": {...}}</script>
+
+extract_page_model finds the assignment with str.find and decodes just that
+object with json.JSONDecoder.raw_decode, which stops at the object's closing
+brace. No tree is built and no regex runs over the page. details_from_page_model
+maps propertyData onto the same detail dict the DOM extractor produces (and
+the fields transform_batch reads for UKProperty), with exact values:
+coordinates, tenure, council tax band, floor area and key features come from
+typed fields rather than from text searches.
+
+The model has no similar listings, recent sales nearby, schools, breadcrumbs
+or UPRN. scrape_property_details parses just those sections of the page (with
+a strainer) and adds them; the stations below come first from the model and
+are appended after the page's schools in points_ofInterest. It falls back to
+the full DOM extractor when a page has no page model (layout changes,
+non-standard listings).
+
+Search results pages carry a similar object, window.jsonModel, with one entry
+per card. Cards themselves show no coordinates, so search_coordinates reads
+them from there for listings whose detail page is never fetched.
+"""
+import html
+import json
+
+import patterns
+
+_MARKER = 'window.PAGE_MODEL'
+_SEARCH_MARKER = 'window.jsonModel'
+_decoder = json.JSONDecoder()
+
+BASE_URL = 'https://www.rightmove.co.uk'
+
+# listingUpdateReason verb -> listing_history event_type
+_HISTORY_EVENTS = {
+    'added': 'First listed',
+    'reduced': 'Reduced',
+    'increased': 'Increased',
+}
+
+
+def extract_page_model(page_text, marker=_MARKER):
+    """
+    Pull the PAGE_MODEL object out of a detail page.
+
+    Args:
+        page_text (str): Page markup
+        marker (str): Name the object is assigned to
+
+    Returns:
+        dict: The decoded page model, or None if the page doesn't have one
+    """
+    start = page_text.find(marker)
+    if start < 0:
+        return None
+    start = page_text.find('{', start + len(marker))
+    if start < 0:
+        return None
+    try:
+        model, _ = _decoder.raw_decode(page_text, start)
+    except ValueError:
+        return None
+    return model if isinstance(model, dict) else None
+
+
+def search_coordinates(page_text):
+    """
+    Read card coordinates from a search results page's jsonModel.
+
+    Args:
+        page_text (str): Search results page markup
+
+    Returns:
+        dict: property_id -> (latitude, longitude); empty if the page has no model
+    """
+    model = extract_page_model(page_text, _SEARCH_MARKER)
+    coordinates = {}
+    for listing in (model or {}).get('properties') or []:
+        if not isinstance(listing, dict):
+            continue
+        location = listing.get('location') or {}
+        latitude, longitude = location.get('latitude'), location.get('longitude')
+        if listing.get('id') is None or latitude is None or longitude is None:
+            continue
+        coordinates[str(listing['id'])] = (latitude, longitude)
+    return coordinates
+
+
+def _absolute(url):
+    if url.startswith('//'):
+        return 'https:' + url
+    if url.startswith('/'):
+        return BASE_URL + url
+    return url
+
+
+def _paragraphs(description_html):
+    """Split the model's HTML description into plain-text paragraphs"""
+    text = patterns.HTML_BREAK.sub('\n', description_html)
+    text = html.unescape(patterns.HTML_TAG.sub('', text))
+    return [line.strip() for line in text.split('\n') if line.strip()]
+
+
+def _money(amount):
+    return f"£{amount:,}" if isinstance(amount, int) else f"£{amount:,.2f}"
+
+
+def details_from_page_model(model):
+    """
+    Map a page model onto the detail dict of scrape_property_details.
+
+    Args:
+        model (dict): Page model from extract_page_model
+
+    Returns:
+        dict: Detail fields present in the model (missing fields are left out)
+    """
+    data = model.get('propertyData') or {}
+    details = {'currency': 'GBP'}
+
+    if data.get('id'):
+        details['property_id'] = str(data['id'])
+
+    text = data.get('text') or {}
+    if text.get('propertyPhrase'):
+        details['property_title'] = text['propertyPhrase']
+    if text.get('description'):
+        details['description'] = _paragraphs(text['description'])
+
+    address = data.get('address') or {}
+    if address.get('displayAddress'):
+        details['address'] = address['displayAddress'].strip()
+    if address.get('outcode') and address.get('incode'):
+        details['postcode'] = f"{address['outcode']} {address['incode']}"
+    details['country_code'] = address.get('countryCode') or 'GB'
+
+    price_match = patterns.POUND_AMOUNT.search((data.get('prices') or {}).get('primaryPrice') or '')
+    if price_match:
+        details['price'] = price_match.group(1).replace(',', '')
+    price_per_sqft = (data.get('prices') or {}).get('pricePerSqFt')
+    if price_per_sqft:
+        details['price_per_size'] = price_per_sqft
+
+    location = data.get('location') or {}
+    lat, lng = location.get('latitude'), location.get('longitude')
+    if lat is not None and lng is not None:
+        details['latitude'] = lat
+        details['longitude'] = lng
+        details['google_map_location'] = f"https://maps.googleapis.com/maps/api/staticmap?size=600x200&format=jpg&scale=1&center={lat},{lng}&maptype=roadmap&zoom=15&markers=scale:1%7C{lat},{lng}"
+        details['street_view'] = f"https://www.google.com/maps/@{lat},{lng},0a,73.7y,90t/data=!3m4!1e1!3m2!1s!2e0?source=apiv3"
+
+    # Rooms; beds/baths/type are the card fields transform_batch reads
+    if data.get('bedrooms') is not None:
+        details['bedrooms'] = details['beds'] = data['bedrooms']
+    if data.get('bathrooms') is not None:
+        details['bathrooms'] = details['baths'] = data['bathrooms']
+    if data.get('propertySubType'):
+        details['type'] = data['propertySubType']
+
+    features = [feature.strip() for feature in data.get('keyFeatures') or () if feature.strip()]
+    if features:
+        details['features'] = features
+        details['tags'] = list(features)
+
+    # The model has no receptions field; look for it in the text as the DOM extractor does
+    for line in features + details.get('description', []):
+        reception_match = patterns.RECEPTIONS.search(line)
+        if reception_match:
+            details['receptions'] = reception_match.group(1)
+            break
+
+    for sizing in data.get('sizings') or ():
+        if sizing.get('unit') == 'sqft' and sizing.get('minimumSize'):
+            details['property_size'] = f"{sizing['minimumSize']}sq. ft"
+            break
+
+    tenure = data.get('tenure') or {}
+    if tenure.get('tenureType'):
+        details['tenure'] = tenure['tenureType'].replace('_', ' ').capitalize()
+        years = tenure.get('yearsRemainingOnLease')
+        if years:
+            details['tenure'] = f"{details['tenure']} ({years} years)"
+            details['time_remaining_on_lease'] = f"{years} years"
+
+    living_costs = data.get('livingCosts') or {}
+    if living_costs.get('councilTaxBand'):
+        details['council_tax_band'] = living_costs['councilTaxBand']
+    if living_costs.get('annualServiceCharge'):
+        details['service_charge'] = f"{_money(living_costs['annualServiceCharge'])} per year"
+    if living_costs.get('annualGroundRent'):
+        details['ground_rent'] = f"{_money(living_costs['annualGroundRent'])} per year"
+
+    epc_graphs = data.get('epcGraphs') or ()
+    if epc_graphs and epc_graphs[0].get('url'):
+        details['energy_performance_certificate'] = _absolute(epc_graphs[0]['url'])
+
+    virtual_tours = data.get('virtualTours') or ()
+    details['virtual_tour'] = virtual_tours[0].get('url', '') if virtual_tours else ''
+
+    images = [_absolute(image['url']) for image in data.get('images') or () if image.get('url')]
+    if images:
+        details['property_images'] = images
+    floor_plans = [_absolute(plan['url']) for plan in data.get('floorplans') or () if plan.get('url')]
+    if floor_plans:
+        details['floor_plans'] = floor_plans
+    brochures = [_absolute(brochure['url']) for brochure in data.get('brochures') or () if brochure.get('url')]
+    if brochures:
+        details['additional_links'] = brochures
+
+    customer = data.get('customer') or {}
+    agent_details = {}
+    agent_name = customer.get('branchDisplayName') or customer.get('companyName')
+    if agent_name:
+        agent_details['agent_name'] = agent_name
+    phone = ((data.get('contactInfo') or {}).get('telephoneNumbers') or {}).get('localNumber')
+    if phone:
+        agent_details['agent_phone'] = phone
+    if customer.get('logoPath'):
+        agent_details['agent_logo'] = _absolute(customer['logoPath'])
+    if agent_details:
+        details['agent_details'] = agent_details
+
+    stations = []
+    for station in (data.get('nearestStations') or ())[:5]:
+        if station.get('name'):
+            distance = station.get('distance')
+            unit = (station.get('unit') or 'miles').lower()
+            stations.append({
+                "point": station['name'],
+                "distance": f"{distance:.1f} {unit}" if isinstance(distance, (int, float)) else "Unknown",
+            })
+    if stations:
+        details['points_ofInterest'] = stations
+
+    reason = (data.get('listingHistory') or {}).get('listingUpdateReason') or ''
+    history_match = patterns.LISTING_UPDATE.search(reason)
+    if history_match:
+        verb = history_match.group(1).lower()
+        details['listing_history'] = [{
+            "event_type": _HISTORY_EVENTS.get(verb, verb.capitalize()),
+            "date": history_match.group(2),
+            "price": details.get('price', 'Unknown'),
+            "currency": "£"
+        }]
+
+    let_available = (data.get('lettings') or {}).get('letAvailableDate')
+    if let_available:
+        details['availability'] = f"Available from {let_available}"
+
+    return details
@@ -0,0 +1,109 @@
+"""
+Memory-bounded HTML parsing for the scrapers.
+
+A full BeautifulSoup tree costs many times the size of the page, and it
+holds reference cycles (parent <-> child). A tree that is simply dropped
+therefore lingers until the cyclic garbage collector runs. Over thousands of
+pages those trees, not the extracted data, dominate RSS. This module keeps
+the trees small and short-lived:
+
+- Search pages are parsed with a SoupStrainer, so only the listing cards and
+  the result count are built into a tree; headers, footers, scripts and ad
+  slots are skipped by the tree builder.
+- Detail pages need most of the page, so only the blocks never read by the
+  extractors (<style>, inline <svg> icons) are cut from the markup before
+  parsing.
+- parsed_html() decomposes the tree when the block exits, which breaks the
+  cycles so the memory is freed at once.
+
+Extractors must copy out plain strings (.text, attribute values), never Tag
+or NavigableString objects. Those keep the whole tree alive.
+"""
+import contextlib
+import re
+
+# Tree builder used by parse_html: lxml when it is installed; found on the first parse so
+# importing a scraper doesn't load bs4 or lxml
+PARSER = None
+
+# Blocks the detail extractors never read; inline SVG icons and stylesheets can be a large part of a page
+_UNUSED_BLOCKS = re.compile(r'<(style|svg)\b[^>]*>.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+
+
+def container_strainer(classes=(), attrs=None, ids=()):
+    """
+    Build a strainer keeping only elements that match one of the given markers.
+
+    Args:
+        classes (iterable): CSS class names, e.g. 'propertyCard'
+        attrs (dict): Attribute name -> accepted values, e.g. {'data-test': ['propertyCard']}
+        ids (iterable): Element ids
+
+    Returns:
+        callable: Predicate for parse_html(parse_only=...), which wraps it in a SoupStrainer;
+            descendants of a kept element are always kept, so CSS selectors inside a card still work
+    """
+    classes = set(classes)
+    ids = set(ids)
+    attrs = {name: set(values) for name, values in (attrs or {}).items()}
+
+    def keep(name, tag_attrs):
+        if not tag_attrs:
+            return False
+        if ids and tag_attrs.get('id') in ids:
+            return True
+        if classes:
+            tag_classes = tag_attrs.get('class') or ()
+            if isinstance(tag_classes, str):
+                tag_classes = tag_classes.split()
+            if classes.intersection(tag_classes):
+                return True
+        for attr, values in attrs.items():
+            if tag_attrs.get(attr) in values:
+                return True
+        return False
+
+    return keep
+
+
+def strip_unused_blocks(html):
+    """Remove <style> and <svg> blocks from page markup"""
+    if isinstance(html, bytes):
+        html = html.decode('utf-8', errors='replace')
+    return _UNUSED_BLOCKS.sub('', html)
+
+
+def _parser():
+    global PARSER
+    if PARSER is None:
+        try:
+            import lxml  # noqa: F401
+            PARSER = 'lxml'
+        except ImportError:
+            PARSER = 'html.parser'
+    return PARSER
+
+
+def parse_html(html, parse_only=None):
+    """Parse markup with the fastest available parser, optionally restricted by a strainer"""
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    if parse_only is not None and not isinstance(parse_only, SoupStrainer):
+        parse_only = SoupStrainer(parse_only)
+    return BeautifulSoup(html, _parser(), parse_only=parse_only)
+
+
+@contextlib.contextmanager
+def parsed_html(html, parse_only=None):
+    """
+    Parse markup for the duration of a with block, then decompose the tree.
+
+    Usage:
+        with parsed_html(response.content, SEARCH_STRAINER) as soup:
+            cards = [parse_card(card) for card in soup.select('div.propertyCard')]
+    """
+    soup = parse_html(html, parse_only)
+    try:
+        yield soup
+    finally:
+        soup.decompose()
@@ -0,0 +1,83 @@
+"""
+Precompiled regular expressions shared by the portal extractors.
+
+Every pattern used inside a per-listing or per-detail loop lives here so it is
+compiled exactly once at import time. The same compiled object can be passed to
+BeautifulSoup's ``find(string=...)`` and then reused for ``.search()`` on the
+matched string, instead of compiling the pattern twice per element.
+"""
+import re
+
+# Listing identifiers and URLs
+PROPERTY_ID = re.compile(r'/properties/(\d+)')
+ZOOPLA_LISTING_ID = re.compile(r'/details/(\d+)')
+ZILLOW_LISTING_ID = re.compile(r'/(\d+)_zpid')
+LOCATION_IDENTIFIER = re.compile(r'locationIdentifier=([^&]+)')
+IMAGE_SIZE = re.compile(r'_max_\d+x\d+')
+
+# Search result counts
+RIGHTMOVE_RESULT_COUNT = re.compile(r'"resultCount"\s*:\s*"?([\d,]+)')
+ZOOPLA_RESULT_COUNT = re.compile(r'"totalResults"\s*:\s*"?([\d,]+)')
+ZILLOW_RESULT_COUNT = re.compile(r'"totalResultCount"\s*:\s*(\d+)')
+RESULT_COUNT_TEXT = re.compile(r'([\d,]+)\s+(?:results|properties)', re.IGNORECASE)
+
+# Prices
+PRICE = re.compile(r'£?([\d,]+)')
+POUND_AMOUNT = re.compile(r'£([\d,]+)')
+POUND_AMOUNT_PER_PERIOD = re.compile(r'£([\d,.]+)(?:\s*per\s*(\w+))?', re.IGNORECASE)
+
+# Rooms
+BEDS = re.compile(r'(\d+)\s*bed', re.IGNORECASE)
+BEDROOMS = re.compile(r'(\d+)\s*bedroom', re.IGNORECASE)
+BATHS = re.compile(r'(\d+)\s*bath', re.IGNORECASE)
+BATHROOMS = re.compile(r'(\d+)\s*bathroom', re.IGNORECASE)
+RECEPTIONS = re.compile(r'(\d+)\s*reception', re.IGNORECASE)
+PROPERTY_TYPE = re.compile(r'bedroom\s+([^for]+)', re.IGNORECASE)
+# Card titles without a bedroom count: 'Land for sale', 'Studio flat for sale', 'Garage to rent'
+TITLE_TYPE = re.compile(r'^\s*(.+?)\s+(?:for sale|to rent|for rent)\b', re.IGNORECASE)
+STUDIO = re.compile(r'\bstudio\b', re.IGNORECASE)
+# Property types / card text of plots rather than dwellings
+LAND_TYPE = re.compile(r'^\s*(?:land|plot|building plot)s?\b', re.IGNORECASE)
+# Zillow card details: '3 bds', '2 ba', '1,500 sqft', '- House for sale'
+ZILLOW_BEDS = re.compile(r'(\d+)\s*bds?\b', re.IGNORECASE)
+ZILLOW_BATHS = re.compile(r'(\d+(?:\.\d+)?)\s*ba\b', re.IGNORECASE)
+ZILLOW_SQFT = re.compile(r'([\d,]+)\s*sqft', re.IGNORECASE)
+ZILLOW_STATUS = re.compile(r'(?:^|\s)-\s*(\S.*?)\s+for sale', re.IGNORECASE)
+
+# Detail page fields
+LATITUDE = re.compile(r'latitude["\s:=]+([0-9.-]+)')
+LONGITUDE = re.compile(r'longitude["\s:=]+([0-9.-]+)')
+VIRTUAL_TOUR = re.compile('virtual tour', re.IGNORECASE)
+FLOOR_AREA = re.compile(r'([\d,.]+)\s*sq\s*ft|m²', re.IGNORECASE)
+COUNCIL_TAX = re.compile(r'Council Tax Band', re.IGNORECASE)
+COUNCIL_TAX_BAND = re.compile(r'Council Tax Band\s*([A-Z])', re.IGNORECASE)
+TENURE = re.compile(r'(Freehold|Leasehold)', re.IGNORECASE)
+YEARS = re.compile(r'(\d+)\s*years', re.IGNORECASE)
+SERVICE_CHARGE = re.compile(r'service charge', re.IGNORECASE)
+GROUND_RENT = re.compile(r'ground rent', re.IGNORECASE)
+COMMONHOLD = re.compile(r'commonhold', re.IGNORECASE)
+UPRN = re.compile(r'UPRN', re.IGNORECASE)
+UPRN_NUMBER = re.compile(r'UPRN\s*:?\s*(\d+)', re.IGNORECASE)
+
+# Embedded page-model JSON (page_model.py)
+HTML_BREAK = re.compile(r'<br\s*/?>|</p\s*>', re.IGNORECASE)
+HTML_TAG = re.compile(r'<[^>]+>')
+LISTING_UPDATE = re.compile(r'(\w+) on (\d{1,2}/\d{1,2}/\d{4})', re.IGNORECASE)
+
+# Dates and listing history
+ADDED_ON = re.compile(r'Added on|Listed on', re.IGNORECASE)
+ADDED_ON_DATE = re.compile(r'(?:Added|Listed) on\s*(\d{1,2})/(\d{1,2})/(\d{4})', re.IGNORECASE)
+ADDED_RELATIVE = re.compile(r'(?:Added|Listed)\s+(today|yesterday)', re.IGNORECASE)
+FULL_DATE = re.compile(r'(\d{1,2}(?:st|nd|rd|th)?\s+\w+\s+\d{4})', re.IGNORECASE)
+SOLD = re.compile(r'sold for|sold in', re.IGNORECASE)
+SOLD_DATE = re.compile(r'(\d{1,2}(?:st|nd|rd|th)?\s+\w+\s+\d{4}|\w+\s+\d{4})', re.IGNORECASE)
+AVAILABLE_FROM = re.compile(r'available from', re.IGNORECASE)
+AVAILABLE_FROM_DATE = re.compile(r'available from\s*(\d{1,2}(?:st|nd|rd|th)?\s+\w+\s+\d{4}|\w+\s+\d{4})', re.IGNORECASE)
+
+# Addresses
+POSTCODE = re.compile(r'\b([A-Z]{1,2}\d[A-Z\d]?)(?:\s*(\d[A-Z]{2}))?\b', re.IGNORECASE)
+NON_ALPHANUMERIC = re.compile(r'[^a-z0-9 ]+')
+WHITESPACE = re.compile(r'\s+')
+
+# Full-text search tokens (text is lower-cased first)
+WORD = re.compile(r'[a-z0-9]+')
@@ -0,0 +1,196 @@
+"""
+Points-of-interest enrichment from a local dataset.
+
+Rather than scraping the #schools and #stations sections of each detail page
+(at most five of each, and only for listings whose details were fetched),
+listings are matched against a local POI file loaded once:
+
+    name,category,latitude,longitude
+    St Mary's CE Primary School,school,53.9602,-1.0873
+    York,station,53.9580,-1.0930
+
+Schools can be exported from Get Information about Schools and stations from
+NaPTAN. Any other category works too. PoiIndex builds one tree per category
+and enrich() writes the nearest POIs of each category into the listing's
+points_ofInterest, in the same shape the detail scraper produced.
+
+With numpy and scipy installed, each category is a cKDTree over 3-D unit
+vectors and a whole batch of listings is queried in one vectorised call. Without
+them, the grid SpatialIndex answers the same queries one listing at a time.
+"""
+import csv
+import math
+
+from spatial import EARTH_RADIUS_KM, SpatialIndex
+
+KM_PER_MILE = 1.609344
+
+_COLUMNS = {
+    'name': ('name', 'poi_name', 'establishmentname', 'commonname'),
+    'category': ('category', 'type', 'poi_type'),
+    'latitude': ('latitude', 'lat'),
+    'longitude': ('longitude', 'lng', 'lon', 'long'),
+}
+
+
+def _column(fieldnames, field):
+    lookup = {name.strip().lower(): name for name in fieldnames}
+    for candidate in _COLUMNS[field]:
+        if candidate in lookup:
+            return lookup[candidate]
+    raise ValueError(f"POI file has no {field} column (expected one of {', '.join(_COLUMNS[field])})")
+
+
+def load_pois(path, category=None):
+    """
+    Load POIs from a CSV file.
+
+    Args:
+        path (str): CSV with name, category, latitude and longitude columns
+        category (str): Category for every row, for files without a category column
+
+    Returns:
+        list: (name, category, lat, lng) tuples; rows without coordinates are skipped
+    """
+    pois = []
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.DictReader(f)
+        name_col = _column(reader.fieldnames, 'name')
+        lat_col = _column(reader.fieldnames, 'latitude')
+        lng_col = _column(reader.fieldnames, 'longitude')
+        category_col = None if category else _column(reader.fieldnames, 'category')
+        for row in reader:
+            try:
+                lat, lng = float(row[lat_col]), float(row[lng_col])
+            except (ValueError, TypeError):
+                continue
+            pois.append((row[name_col].strip(), category or row[category_col].strip().lower(), lat, lng))
+    print(f"Loaded {len(pois)} POIs from {path}")
+    return pois
+
+
+def _unit_vectors(np, lats, lngs):
+    lat = np.radians(lats)
+    lng = np.radians(lngs)
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lng), cos_lat * np.sin(lng), np.sin(lat)))
+
+
+class PoiIndex:
+    """
+    Nearest-POI lookups per category.
+
+    Args:
+        pois (list): (name, category, lat, lng) tuples, e.g. from load_pois
+        per_category (int): POIs of each category attached to a listing
+        max_km (float): POIs farther than this are ignored
+    """
+
+    def __init__(self, pois, per_category=5, max_km=5.0):
+        self.per_category = per_category
+        self.max_km = max_km
+        self.names = {}
+        by_category = {}
+        for name, category, lat, lng in pois:
+            by_category.setdefault(category, []).append((name, lat, lng))
+
+        try:
+            import numpy as np
+            from scipy.spatial import cKDTree
+        except ImportError:
+            np = None
+        self._np = np
+        self.trees = {}
+        for category, points in by_category.items():
+            self.names[category] = [name for name, _, _ in points]
+            if np is not None:
+                vectors = _unit_vectors(np, np.array([p[1] for p in points]), np.array([p[2] for p in points]))
+                self.trees[category] = cKDTree(vectors)
+            else:
+                grid = SpatialIndex(cell_degrees=0.05)
+                for position, (_, lat, lng) in enumerate(points):
+                    grid.add(position, lat, lng)
+                self.trees[category] = grid
+        self.backend = 'cKDTree' if np is not None else 'grid'
+
+    @classmethod
+    def from_csv(cls, path, **kwargs):
+        return cls(load_pois(path), **kwargs)
+
+    @property
+    def categories(self):
+        return sorted(self.trees)
+
+    def _query_batch(self, category, coordinates):
+        """Yield, per coordinate pair, a list of (km, tenths of a mile, name) nearest first"""
+        names = self.names[category]
+        k = min(self.per_category, len(names))
+        if self._np is None:
+            grid = self.trees[category]
+            for lat, lng in coordinates:
+                yield [(round(km, 3), int(km / KM_PER_MILE * 10 + 0.5), names[position])
+                       for km, position in grid.nearest(lat, lng, k, self.max_km)]
+            return
+
+        np = self._np
+        coords = np.array(coordinates, dtype=float)
+        vectors = _unit_vectors(np, coords[:, 0], coords[:, 1])
+        # Chord length on the unit sphere that corresponds to max_km along the surface
+        max_chord = 2 * math.sin(self.max_km / (2 * EARTH_RADIUS_KM))
+        chords, positions = self.trees[category].query(vectors, k=k, distance_upper_bound=max_chord)
+        if k == 1:
+            chords, positions = chords[:, None], positions[:, None]
+        # Misses come back as infinite chords at position len(names); map them to None
+        kms = 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(chords / 2, 1.0))
+        tenths = np.rint(np.where(np.isfinite(kms), kms, 0) / KM_PER_MILE * 10).astype(np.int64)
+        labels = np.array(names + [None], dtype=object)[positions]
+        for row in zip(np.round(kms, 3).tolist(), tenths.tolist(), labels.tolist()):
+            yield [point for point in zip(*row) if point[2] is not None]
+
+    def nearest(self, lat, lng, category):
+        """
+        Return the nearest POIs of one category to a point.
+
+        Returns:
+            list: (distance_km, name) tuples, nearest first
+        """
+        if category not in self.trees:
+            return []
+        return [(km, name) for km, _, name in next(self._query_batch(category, [(lat, lng)]))]
+
+    def enrich(self, listings):
+        """
+        Replace points_ofInterest on every listing that has coordinates.
+
+        Args:
+            listings (list): Scraped listing dicts with latitude/longitude
+
+        Returns:
+            int: Number of listings enriched
+        """
+        located = []
+        coordinates = []
+        for listing in listings:
+            try:
+                lat, lng = float(listing['latitude']), float(listing['longitude'])
+            except (KeyError, ValueError, TypeError):
+                continue
+            if math.isfinite(lat) and math.isfinite(lng):
+                located.append(listing)
+                coordinates.append((lat, lng))
+        if not located:
+            return 0
+
+        # Distance labels have one decimal place, so there are few distinct ones
+        labels = {}
+        points = [[] for _ in located]
+        for category in self.categories:
+            for found, nearby in zip(points, self._query_batch(category, coordinates)):
+                for km, tenths, name in nearby:
+                    label = labels.get(tenths)
+                    if label is None:
+                        label = labels[tenths] = f"{tenths / 10:.1f} miles"
+                    found.append({"point": name, "type": category, "distance": label, "distance_km": km})
+        for listing, found in zip(located, points):
+            listing['points_ofInterest'] = found
+        return len(located)
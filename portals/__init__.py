@@ -0,0 +1,44 @@
+"""
+Portal scrapers, one module per site.
+
+    from portals import rightmove
+    properties = rightmove.scrape_rightmove("York", num_pages=2)
+
+    import portals
+    module = portals.load("zoopla")
+
+Importing the package imports no portal. A portal module is imported on first
+access, and it imports requests, BeautifulSoup (and, for Zillow's DataFrame
+export, pandas) only inside the functions that use them. A worker that parses
+stored Rightmove pages therefore never loads the HTTP stack, and nothing loads
+pandas unless a DataFrame is asked for.
+
+The old entry points, `python Rightmove_Web_Scraper.py` and
+`python Zoopla_Web_Scraper.py`, still work as thin wrappers over these modules.
+"""
+import importlib
+
+PORTALS = ('rightmove', 'zoopla', 'zillow')
+
+
+def load(name):
+    """
+    Import a portal module by name.
+
+    Raises:
+        ValueError: If there is no such portal
+    """
+    if name not in PORTALS:
+        raise ValueError(f"Unknown portal {name!r}; expected one of {', '.join(PORTALS)}")
+    return importlib.import_module(f'{__name__}.{name}')
+
+
+def __getattr__(name):
+    # portals.rightmove after a plain `import portals`
+    if name in PORTALS:
+        return load(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(PORTALS))
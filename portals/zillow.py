@@ -0,0 +1,292 @@
+"""
+Zillow scraper: for-sale search result pages.
+
+Moved out of the Zillow_Web_Scraper notebook. Cards are parsed into Property
+records, like the Rightmove and Zoopla results, instead of cleaning the card
+HTML with string replaces in a DataFrame. pandas is only needed by
+to_dataframe(), and requests and BeautifulSoup are imported by the functions
+that use them.
+
+Usage:
+    python -m portals.zillow
+"""
+import csv
+import random
+import time
+
+import patterns
+import urls
+from blocking import BlockedError, check_response
+from cascades import cascade
+from parsing import container_strainer, parsed_html
+from profiles import apply_profile
+from ratelimit import throttle
+from records import Property
+
+def create_session(proxy=None):
+    """
+    Create a session with a fixed browser header profile and optional proxy
+
+    Args:
+        proxy (str): Optional proxy URL
+    """
+    import requests
+
+    session = requests.Session()
+    if proxy:
+        session.proxies = {'http': proxy, 'https': proxy}
+    apply_profile(session, f'{urls.ZILLOW_BASE}/', key=proxy)
+    return session
+
+# Selectors that might match property cards on a search results page
+LISTING_SELECTORS = [
+    'article[data-test="property-card"]',
+    'article.list-card',
+]
+
+# Parse only the property cards on search pages
+SEARCH_STRAINER = container_strainer(
+    classes=('list-card',),
+    attrs={'data-test': ['property-card']},
+)
+
+# Field selectors; each alternative is compiled once and the one that matches most is tried first
+LISTING_CARDS = cascade('zillow.search.cards', LISTING_SELECTORS)
+CARD_PRICE = cascade('zillow.card.price', [
+    '[data-test="property-card-price"]',
+    '.list-card-price',
+])
+CARD_ADDRESS = cascade('zillow.card.address', [
+    'address[data-test="property-card-addr"]',
+    '.list-card-addr',
+    'address',
+])
+CARD_DETAILS = cascade('zillow.card.details', [
+    'ul[class*="HomeDetailsList"]',
+    'ul.list-card-details',
+])
+CARD_LINK = cascade('zillow.card.link', [
+    'a[data-test="property-card-link"]',
+    'a.list-card-link',
+])
+CARD_BROKERAGE = cascade('zillow.card.brokerage', [
+    '[class*="PropertyCardBrokerage"]',
+    '.list-card-brokerage',
+])
+
+def build_search_url(city, page):
+    """Build the search results URL for a one-based page number"""
+    return urls.zillow_search_url(city, page)
+
+def find_listings(soup):
+    """
+    Find the property cards on a search results page
+
+    Returns:
+        tuple: (list of card elements, selector that matched or None)
+    """
+    return LISTING_CARDS.select_matched(soup)
+
+def parse_listing(listing):
+    """
+    Extract the fields of a single property card
+
+    Args:
+        listing (bs4.element.Tag): Card element
+
+    Returns:
+        Property: Property data (empty if nothing was found)
+    """
+    property_data = Property()
+
+    price_elem = CARD_PRICE.select_one(listing)
+    if price_elem:
+        property_data['price'] = price_elem.text.strip()
+
+    address_elem = CARD_ADDRESS.select_one(listing)
+    if address_elem:
+        property_data['address'] = address_elem.text.strip()
+
+    # Beds, baths, floor area and '- House for sale' status
+    details_elem = CARD_DETAILS.select_one(listing)
+    if details_elem:
+        # The status is an <li> in the old layout and follows the list in the new one
+        details = details_elem.parent.get_text(' ', strip=True)
+        beds_match = patterns.ZILLOW_BEDS.search(details)
+        if beds_match:
+            property_data['beds'] = beds_match.group(1)
+        baths_match = patterns.ZILLOW_BATHS.search(details)
+        if baths_match:
+            property_data['baths'] = baths_match.group(1)
+        size_match = patterns.ZILLOW_SQFT.search(details)
+        if size_match:
+            property_data['property_size'] = f"{size_match.group(1)} sq. ft"
+        status_match = patterns.ZILLOW_STATUS.search(details)
+        if status_match:
+            property_data['type'] = status_match.group(1)
+
+    link_elem = CARD_LINK.select_one(listing)
+    if link_elem and 'href' in link_elem.attrs:
+        href = link_elem['href']
+        property_data['link'] = urls.ZILLOW_BASE + href if href.startswith('/') else href
+        id_match = patterns.ZILLOW_LISTING_ID.search(property_data['link'])
+        if id_match:
+            property_data['property_id'] = id_match.group(1)
+
+    brokerage_elem = CARD_BROKERAGE.select_one(listing)
+    if brokerage_elem:
+        property_data['agent'] = brokerage_elem.text.strip()
+
+    return property_data
+
+def clean_price(prop):
+    """Reduce a scraped price like '$1,250,000' to its digits, in place"""
+    if 'price' in prop:
+        price_match = patterns.PRICE.search(prop['price'])
+        if price_match:
+            prop['price'] = price_match.group(1).replace(',', '')
+    return prop
+
+def parse_search_page(html):
+    """
+    Parse every card on a search results page
+
+    Args:
+        html (str or bytes): Search results page HTML
+
+    Returns:
+        list: Property dicts (with cleaned prices), in page order; land plots are skipped
+    """
+    properties = []
+    with parsed_html(html, SEARCH_STRAINER) as soup:
+        listings, _ = find_listings(soup)
+        for listing in listings:
+            property_data = parse_listing(listing)
+            if property_data and property_data.get('type', '').lower() != 'land':
+                properties.append(clean_price(property_data))
+    return properties
+
+def fetch_search_page(session, city, page):
+    """
+    Fetch and parse one search results page
+
+    Args:
+        session (requests.Session): Active session
+        city (str): City name or slug, e.g. 'los-angeles'
+        page (int): One-based page number
+
+    Returns:
+        tuple: (list of property dicts, total result count or None)
+    """
+    # Add random delay between requests, unless a shared rate limiter paces them
+    if not throttle(session, f'{urls.ZILLOW_BASE}/'):
+        delay = random.uniform(3, 7)
+        print(f"Waiting {delay:.2f} seconds before fetching page {page}...")
+        time.sleep(delay)
+
+    url = build_search_url(city, page)
+    print(f"Fetching page {page} with URL: {url}")
+    response = session.get(url, timeout=15)
+    # Block pages are recognised here, before any parsing
+    check_response(response)
+    response.raise_for_status()
+
+    result_count = None
+    if page == 1:
+        match = patterns.ZILLOW_RESULT_COUNT.search(response.text)
+        result_count = int(match.group(1)) if match else None
+    return parse_search_page(response.content), result_count
+
+def scrape_zillow(city, num_pages=10, session=None):
+    """
+    Scrape for-sale listings from Zillow
+
+    Args:
+        city (str): City name or slug, e.g. 'los-angeles'
+        num_pages (int): Maximum number of pages to scrape; paging stops early at an empty page
+        session (requests.Session): Optional shared session; a new one is created if not given
+
+    Returns:
+        list: List of dictionaries containing property data
+    """
+    import requests
+
+    all_properties = []
+    seen_property_ids = set()
+    if session is None:
+        session = create_session()
+
+    for page in range(1, num_pages + 1):
+        try:
+            page_properties, result_count = fetch_search_page(session, city, page)
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching page {page}: {e}")
+            break
+        except BlockedError as e:
+            print(f"Blocked on page {page}: {e}")
+            break
+        if result_count is not None:
+            print(f"Zillow reports {result_count} results for {city}")
+        if not page_properties:
+            print(f"No listings found on page {page}, stopping")
+            break
+
+        new = 0
+        for prop in page_properties:
+            property_id = prop.get('property_id')
+            if property_id and property_id in seen_property_ids:
+                continue
+            seen_property_ids.add(property_id)
+            all_properties.append(prop)
+            new += 1
+        print(f"Found {new} new listings on page {page}")
+
+    return all_properties
+
+def save_to_csv(properties, filename):
+    """Save properties to a CSV file"""
+    if not properties:
+        print("No properties to save")
+        return
+
+    fieldnames = sorted({key for prop in properties for key in prop.keys()})
+    with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(properties)
+
+    print(f"Saved {len(properties)} properties to {filename}")
+
+def to_dataframe(properties):
+    """
+    Return properties as a pandas DataFrame, one row per listing (the notebook's output).
+
+    Raises:
+        RuntimeError: If pandas isn't installed
+    """
+    try:
+        import pandas as pd
+    except ImportError:
+        raise RuntimeError("to_dataframe needs pandas (pip install pandas); use save_to_csv instead") from None
+    return pd.DataFrame([dict(prop) for prop in properties])
+
+def main():
+    """Interactive scrape of one city (the script entry point)"""
+    city = input("Enter city to search (e.g., Los Angeles, Seattle, Austin): ").strip() or "Los Angeles"
+    try:
+        num_pages = int(input("Enter number of pages to scrape (default 10): ") or "10")
+    except ValueError:
+        num_pages = 10
+
+    print(f"Scraping Zillow for properties in {city}...")
+    properties = scrape_zillow(city, num_pages)
+    if not properties:
+        print("No properties found. Please check the city name or try again later.")
+        return
+
+    output_file = f"zillow_{urls.slugify(city).replace('-', '_')}_properties.csv"
+    save_to_csv(properties, output_file)
+
+
+if __name__ == "__main__":
+    main()
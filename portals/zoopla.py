@@ -0,0 +1,490 @@
+"""
+Zoopla scraper: search result pages.
+
+requests and BeautifulSoup are imported by the functions that use them, so
+importing this module doesn't pay for them.
+
+Usage:
+    python -m portals.zoopla
+"""
+import csv
+import contextlib
+import time
+import random
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+import patterns
+import records
+import urls
+from profiles import apply_profile
+from blocking import BlockedError, check_response
+from cascades import cascade
+from records import Property
+from parsing import container_strainer, parsed_html
+from ratelimit import throttle
+from dedup import DedupIndex
+
+def create_session(proxy=None):
+    """
+    Create a session with a fixed browser header profile and optional proxy
+    
+    Args:
+        proxy (str): Optional proxy URL
+    """
+    import requests
+
+    session = requests.Session()
+    if proxy:
+        session.proxies = {'http': proxy, 'https': proxy}
+    apply_profile(session, 'https://www.zoopla.co.uk/', key=proxy)
+    return session
+
+# Zoopla shows 25 results per page
+RESULTS_PER_PAGE = urls.ZOOPLA_PAGE_SIZE
+
+# Selectors that might match property listings on a search results page
+LISTING_SELECTORS = [
+    '[data-testid="search-result"]',
+    '.listing-results-wrapper',
+    '.srp clearfix',
+    'article.listing-results'
+]
+
+# Parse only the listings and the result count on search pages
+SEARCH_STRAINER = container_strainer(
+    classes=('listing-results-wrapper', 'srp', 'listing-results', 'listing-results-utils-count'),
+    attrs={'data-testid': ['search-result', 'total-results']},
+)
+
+# Field selectors; each alternative is compiled once and the one that matches most is tried first
+LISTING_CARDS = cascade('zoopla.search.listings', LISTING_SELECTORS)
+CARD_PRICE = cascade('zoopla.card.price', [
+    '[data-testid="listing-price"]',
+    '.listing-results-price',
+])
+CARD_ADDRESS = cascade('zoopla.card.address', [
+    '[data-testid="listing-address"]',
+    '.listing-results-address',
+])
+CARD_SPEC = cascade('zoopla.card.spec', [
+    '[data-testid="listing-spec"]',
+    '.listing-results-attributes',
+])
+CARD_TYPE = cascade('zoopla.card.type', [
+    '[data-testid="listing-type"]',
+    '.property-type',
+])
+CARD_LINK = cascade('zoopla.card.link', ['a[href*="/for-sale/details/"]'])
+CARD_AGENT = cascade('zoopla.card.agent', [
+    '[data-testid="listing-agent"]',
+    '.agent-results-link',
+])
+CARD_DESCRIPTION = cascade('zoopla.card.description', [
+    '[data-testid="listing-description"]',
+    '.listing-results-description',
+])
+RESULT_COUNT = cascade('zoopla.search.result_count', [
+    '[data-testid="total-results"]',
+    '.listing-results-utils-count',
+])
+
+def build_search_url(location, page, filters=None, newest_first=False):
+    """Build the search results URL for a one-based page number, with optional SearchFilters"""
+    params = filters.zoopla_params() if filters else {}
+    if newest_first:
+        params.update(urls.ZOOPLA_NEWEST_FIRST)
+    return urls.zoopla_search_url(location, page, params)
+
+def find_listings(soup):
+    """
+    Find the property listings on a search results page
+    
+    Returns:
+        tuple: (list of listing elements, selector that matched or None)
+    """
+    return LISTING_CARDS.select_matched(soup)
+
+def parse_listing(listing):
+    """
+    Extract the fields of a single search result
+    
+    Args:
+        listing (bs4.element.Tag): Listing element
+    
+    Returns:
+        Property: Property data (empty if nothing was found)
+    """
+    property_data = Property()
+    
+    # Extract price
+    price_elem = CARD_PRICE.select_one(listing)
+    if price_elem:
+        property_data['price'] = price_elem.text.strip()
+    
+    # Extract address
+    address_elem = CARD_ADDRESS.select_one(listing)
+    if address_elem:
+        property_data['address'] = address_elem.text.strip()
+    
+    # Extract property details (beds, baths, etc.)
+    details_elem = CARD_SPEC.select_one(listing)
+    if details_elem:
+        # Extract number of bedrooms
+        beds_elem = details_elem.find(string=patterns.BEDS)
+        if beds_elem:
+            beds_match = patterns.BEDS.search(beds_elem)
+            if beds_match:
+                property_data['beds'] = beds_match.group(1)
+        
+        # Extract number of bathrooms
+        baths_elem = details_elem.find(string=patterns.BATHS)
+        if baths_elem:
+            baths_match = patterns.BATHS.search(baths_elem)
+            if baths_match:
+                property_data['baths'] = baths_match.group(1)
+    
+    # Extract property type
+    type_elem = CARD_TYPE.select_one(listing)
+    if type_elem:
+        property_data['type'] = type_elem.text.strip()
+    
+    # Extract link
+    link_elem = CARD_LINK.select_one(listing)
+    if link_elem and 'href' in link_elem.attrs:
+        href = link_elem['href']
+        if href.startswith('/'):
+            property_data['link'] = 'https://www.zoopla.co.uk' + href
+        else:
+            property_data['link'] = href
+        
+        id_match = patterns.ZOOPLA_LISTING_ID.search(property_data['link'])
+        if id_match:
+            property_data['property_id'] = id_match.group(1)
+    
+    # Extract agent
+    agent_elem = CARD_AGENT.select_one(listing)
+    if agent_elem:
+        property_data['agent'] = agent_elem.text.strip()
+    
+    # Extract description
+    desc_elem = CARD_DESCRIPTION.select_one(listing)
+    if desc_elem:
+        property_data['description'] = desc_elem.text.strip()
+    
+    return property_data
+
+def clean_price(prop):
+    """Reduce a scraped price like '£250,000' to its digits, in place"""
+    if 'price' in prop:
+        price_match = patterns.PRICE.search(prop['price'])
+        if price_match:
+            prop['price'] = price_match.group(1).replace(',', '')
+    return prop
+
+def parse_search_page(html):
+    """
+    Parse every listing on a search results page
+    
+    Args:
+        html (str or bytes): Search results page HTML
+    
+    Returns:
+        list: Property dicts (with cleaned prices), in page order
+    """
+    properties = []
+    with parsed_html(html, SEARCH_STRAINER) as soup:
+        listings, _ = find_listings(soup)
+        for listing in listings:
+            property_data = parse_listing(listing)
+            if property_data:
+                properties.append(clean_price(property_data))
+    return properties
+
+def read_result_count(soup, html):
+    """
+    Read the total number of search results from a results page
+    
+    Returns:
+        int: Total result count, or None if it isn't on the page
+    """
+    match = patterns.ZOOPLA_RESULT_COUNT.search(html)
+    if not match:
+        count_elem = RESULT_COUNT.select_one(soup)
+        match = patterns.RESULT_COUNT_TEXT.search(count_elem.text) if count_elem else None
+    if match:
+        try:
+            return int(match.group(1).replace(',', ''))
+        except ValueError:
+            return None
+    return None
+
+def fetch_search_page(session, location, page, filters=None, newest_first=False):
+    """
+    Fetch and parse one search results page
+    
+    Args:
+        session (requests.Session): Active session
+        location (str): Location to search for properties
+        page (int): One-based page number
+        filters (SearchFilters): Optional filters applied by Zoopla
+        newest_first (bool): Sort by newest listed instead of the default order
+    
+    Returns:
+        tuple: (list of property dicts, total result count or None)
+    """
+    # Add random delay between requests, unless a shared rate limiter paces them
+    if not throttle(session, 'https://www.zoopla.co.uk/'):
+        delay = random.uniform(3, 7)
+        print(f"Waiting {delay:.2f} seconds before fetching page {page}...")
+        time.sleep(delay)
+    
+    # Construct the search URL for the current page
+    url = build_search_url(location, page, filters, newest_first)
+    
+    print(f"Fetching page {page} with URL: {url}")
+    response = session.get(url, timeout=15)
+    # Block pages are recognised here, before any parsing
+    check_response(response)
+    response.raise_for_status()
+    
+    # Save the HTML for debugging
+    with open(f"zoopla_page_{page}.html", "w", encoding="utf-8") as f:
+        f.write(response.text)
+    print(f"Saved HTML to zoopla_page_{page}.html for debugging")
+    
+    page_properties = []
+    with parsed_html(response.content, SEARCH_STRAINER) as soup:
+        result_count = read_result_count(soup, response.text) if page == 1 else None
+        
+        # Find all property listings - use multiple selectors to catch different HTML structures
+        listings, selector = find_listings(soup)
+        
+        if not listings:
+            print(f"No listings found on page {page}. The page structure might have changed.")
+            return [], result_count
+        
+        print(f"Found listings with selector: {selector}")
+        print(f"Found {len(listings)} listings on page {page}")
+        
+        # Process each listing
+        for listing in listings:
+            property_data = parse_listing(listing)
+            if property_data:
+                page_properties.append(property_data)
+    
+    print(f"Successfully processed {len(page_properties)} properties from page {page}")
+    return page_properties, result_count
+
+def scrape_zoopla(location, num_pages=5, dedup_index=None, session=None, page_concurrency=4, deduper=None,
+                  filters=None, high_water_marks=None):
+    """
+    Scrape property listings from Zoopla
+    
+    Args:
+        location (str): Location to search for properties
+        num_pages (int): Maximum number of pages to scrape; fewer are fetched when
+            the first page shows there are fewer results
+        dedup_index (DedupIndex): Optional cross-portal index to register listings in
+        session (requests.Session): Optional shared session; a new one is created if not given
+        page_concurrency (int): Number of result pages fetched at once after the first,
+            when the session has a rate limiter
+        deduper (urls.RequestDeduper): Optional shared set of URLs already requested
+        filters (SearchFilters): Optional price/beds/type/radius/recency filters, applied
+            by Zoopla so only matching listings are downloaded
+        high_water_marks (delta.HighWaterMarks): Enables delta mode: results are sorted
+            newest first and paging stops at listings seen by the previous run
+    
+    Returns:
+        list: List of dictionaries containing property data
+    """
+    import requests
+
+    all_properties = []
+    if deduper is None:
+        deduper = urls.RequestDeduper()
+    
+    # A shared session is left open for the caller
+    with (contextlib.nullcontext(session) if session is not None else create_session()) as s:
+        # First, visit the homepage to get cookies
+        if not s.cookies:
+            try:
+                print("Setting up session...")
+                s.get('https://www.zoopla.co.uk/', timeout=10)
+                time.sleep(random.uniform(2, 4))
+            except Exception as e:
+                print(f"Error visiting homepage: {e}")
+        
+        def fetch_page(page):
+            url = build_search_url(location, page, filters, newest_first)
+            if not deduper.claim(url):
+                print(f"Skipping page {page}: already requested")
+                return None, None
+            try:
+                page_properties, result_count = fetch_search_page(s, location, page, filters, newest_first)
+                if page_properties and filters:
+                    # Promoted listings can ignore the search filters
+                    page_properties = filters.apply(page_properties)
+                return page_properties, result_count
+            except requests.exceptions.RequestException as e:
+                print(f"Error fetching page {page}: {e}")
+            except BlockedError as e:
+                print(f"Blocked on page {page}: {e}")
+            except Exception as e:
+                print(f"Unexpected error on page {page}: {e}")
+                import traceback
+                traceback.print_exc()
+            # The page wasn't fetched; another job or a later run may request it
+            deduper.release(url)
+            return None, None
+        
+        newest_first = high_water_marks is not None
+        if newest_first:
+            # Delta mode: walk newest-first pages until reaching the last run's listings
+            tracker = high_water_marks.tracker('zoopla', location, filters)
+            total_results = float('inf')
+            exhausted = False
+            for page in range(1, num_pages + 1):
+                page_properties, result_count = fetch_page(page)
+                if page_properties is None:
+                    break
+                if result_count is not None:
+                    total_results = result_count
+                new_properties, reached = tracker.filter_page(page_properties)
+                all_properties.extend(new_properties)
+                if reached:
+                    print(f"Reached listings from the last run on page {page}. Stopping search.")
+                    break
+                if not page_properties or page * RESULTS_PER_PAGE >= total_results:
+                    exhausted = True
+                    break
+            tracker.finish(exhausted)
+        else:
+            # The first page tells us how many results there are
+            page_properties, result_count = fetch_page(1)
+            if page_properties:
+                all_properties.extend(page_properties)
+            
+            if result_count is not None:
+                # Fetch exactly the pages that hold results
+                last_page = min(num_pages, math.ceil(result_count / RESULTS_PER_PAGE))
+                print(f"{result_count} results for {location}; fetching {last_page} page(s)")
+                remaining_pages = list(range(2, last_page + 1))
+                if remaining_pages:
+                    # Without a rate limiter, concurrent fetches would multiply the request rate
+                    workers = max(1, page_concurrency) if getattr(s, 'rate_limiter', None) else 1
+                    with ThreadPoolExecutor(max_workers=workers) as executor:
+                        for page_properties, _ in executor.map(fetch_page, remaining_pages):
+                            if page_properties:
+                                all_properties.extend(page_properties)
+            elif page_properties is not None:
+                # No result count on the page; walk pages serially until one is empty
+                for page in range(2, num_pages + 1):
+                    page_properties, _ = fetch_page(page)
+                    if page_properties is None:
+                        continue
+                    all_properties.extend(page_properties)
+                    if not page_properties:
+                        print("No properties found on this page. Stopping search.")
+                        break
+    
+    # Clean up data
+    for prop in all_properties:
+        clean_price(prop)
+    
+    if dedup_index is not None:
+        matched = dedup_index.add_all('zoopla', all_properties)
+        print(f"Matched {matched} properties against listings from other portals")
+    
+    return all_properties
+
+def save_to_csv(properties, filename):
+    """Save properties to a CSV file"""
+    if not properties:
+        print("No properties to save")
+        return
+    
+    # Get all possible fields from all properties
+    fieldnames = set()
+    for prop in properties:
+        fieldnames.update(prop.keys())
+    
+    fieldnames = sorted(list(fieldnames))
+    
+    with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(properties)
+    
+    print(f"Saved {len(properties)} properties to {filename}")
+
+def display_properties(properties, num=5):
+    """Display the first few properties"""
+    if not properties:
+        print("No properties to display")
+        return
+    
+    print("\nFirst few properties:")
+    for i, prop in enumerate(properties[:num]):
+        print(f"\nProperty {i+1}:")
+        for key, value in prop.items():
+            print(f"  {key}: {value}")
+
+def print_alternative_options():
+    print("\n===== ALTERNATIVE OPTIONS =====")
+    print("Since direct scraping of Zoopla is blocked, consider these alternatives:")
+    print("1. Use Zoopla's official API if available (requires registration)")
+    print("2. Use a third-party real estate API like PropertyData or Rightmove")
+    print("3. Use a web scraping service with proxy rotation like ScraperAPI or Bright Data")
+    print("4. Consider using Rightmove or OnTheMarket which might be less restrictive")
+    print("5. For educational purposes only, you could try using a VPN or proxy service")
+    print("==============================\n")
+
+def main():
+    """Interactive scrape of one location (the script entry point)"""
+    from changes import detect_changes
+    from storage import ListingStore
+
+    # Example usage
+    location = input("Enter location to search (e.g., London, Manchester, Birmingham): ").strip()
+    if not location:
+        location = "London"
+    
+    try:
+        num_pages = int(input("Enter number of pages to scrape (default 5): ") or "5")
+    except ValueError:
+        num_pages = 5
+    
+    print(f"Scraping Zoopla for properties in {location}...")
+    # Cross-portal dedup index shared with the Rightmove scraper
+    dedup_index = DedupIndex.load("dedup_index.json")
+    properties = scrape_zoopla(location, num_pages, dedup_index=dedup_index)
+    dedup_index.save("dedup_index.json")
+    
+    if not properties:
+        print("No properties found. Please check the location name or try again later.")
+    else:
+        # Save to CSV
+        output_file = f"zoopla_{location.lower().replace(' ', '_')}_properties.csv"
+        save_to_csv(properties, output_file)
+        
+        # Upsert into the indexed listing store shared with the Rightmove scraper
+        with ListingStore("listings.db") as store:
+            stored = store.upsert_many('zoopla', properties, location)
+        print(f"Upserted {stored} properties into listings.db")
+        
+        # Emit new/removed/price-changed events against the previous run
+        detect_changes('zoopla', location, properties)
+        
+        # Display first few properties
+        display_properties(properties)
+        
+        # Also save as JSON for easier viewing
+        json_file = f"zoopla_{location.lower().replace(' ', '_')}_properties.json"
+        with open(json_file, 'w', encoding='utf-8') as f:
+            records.dump(properties, f)
+        print(f"\nData also saved to {json_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Browser header profiles bound to a session for its whole lifetime.
+
+Each profile is the full, internally consistent header set one real browser
+sends for a top-level page load. Only Chromium browsers send sec-ch-ua, the
+Chrome/Edge version in sec-ch-ua matches the User-Agent, and Firefox and
+Safari use their own Accept headers. Mixing a Firefox User-Agent with Chrome
+client hints, as a per-request random User-Agent did, is an easy bot signal.
+
+A profile is picked once when a session is created, from the proxy when
+there is one, so the same exit IP always presents the same browser. It is
+stored in session.headers, so requests need no per-call header dicts.
+"""
+import random
+import zlib
+
+_CHROMIUM_ACCEPT = ('text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,'
+                    'image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7')
+_FIREFOX_ACCEPT = 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8'
+_SAFARI_ACCEPT = 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8'
+
+_NAVIGATE = {
+    'Sec-Fetch-Site': 'same-origin',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-User': '?1',
+    'Sec-Fetch-Dest': 'document',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+
+def _chromium(user_agent, brand, version, platform):
+    return dict(_NAVIGATE, **{
+        'User-Agent': user_agent,
+        'Accept': _CHROMIUM_ACCEPT,
+        'Accept-Language': 'en-GB,en-US;q=0.9,en;q=0.8',
+        'Accept-Encoding': 'gzip, deflate, br',
+        'sec-ch-ua': f'"Not A(Brand";v="99", "{brand}";v="{version}", "Chromium";v="{version}"',
+        'sec-ch-ua-mobile': '?0',
+        'sec-ch-ua-platform': f'"{platform}"',
+    })
+
+
+PROFILES = {
+    'chrome-121-windows': _chromium(
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) '
+        'Chrome/121.0.0.0 Safari/537.36', 'Google Chrome', 121, 'Windows'),
+    'chrome-120-windows': _chromium(
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) '
+        'Chrome/120.0.0.0 Safari/537.36', 'Google Chrome', 120, 'Windows'),
+    'chrome-121-macos': _chromium(
+        'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) '
+        'Chrome/121.0.0.0 Safari/537.36', 'Google Chrome', 121, 'macOS'),
+    'edge-121-windows': _chromium(
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) '
+        'Chrome/121.0.0.0 Safari/537.36 Edg/121.0.0.0', 'Microsoft Edge', 121, 'Windows'),
+    'firefox-122-windows': dict(_NAVIGATE, **{
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:122.0) Gecko/20100101 Firefox/122.0',
+        'Accept': _FIREFOX_ACCEPT,
+        'Accept-Language': 'en-GB,en;q=0.5',
+        'Accept-Encoding': 'gzip, deflate, br',
+        'DNT': '1',
+    }),
+    'safari-17-macos': {
+        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 '
+                      '(KHTML, like Gecko) Version/17.2.1 Safari/605.1.15',
+        'Accept': _SAFARI_ACCEPT,
+        'Accept-Language': 'en-GB,en;q=0.9',
+        'Accept-Encoding': 'gzip, deflate, br',
+        'Sec-Fetch-Site': 'same-origin',
+        'Sec-Fetch-Mode': 'navigate',
+        'Sec-Fetch-Dest': 'document',
+    },
+}
+
+
+def choose_profile(key=None):
+    """
+    Pick a profile name.
+
+    Args:
+        key (str): Stable key such as the proxy URL; the same key always gets
+            the same profile. A random profile is picked when it's None.
+    """
+    names = sorted(PROFILES)
+    if key is None:
+        return random.choice(names)
+    return names[zlib.crc32(key.encode('utf-8')) % len(names)]
+
+
+def apply_profile(session, referer, key=None, name=None):
+    """
+    Bind a header profile to a session, replacing its default headers.
+
+    Args:
+        session (requests.Session): Session to configure
+        referer (str): Referer sent with every request, e.g. the portal homepage
+        key (str): Stable key for choose_profile, e.g. the proxy URL
+        name (str): Explicit profile name; overrides key
+
+    Returns:
+        str: Name of the profile applied
+    """
+    name = name or choose_profile(key)
+    session.headers.clear()
+    session.headers.update(PROFILES[name])
+    session.headers['Connection'] = 'keep-alive'
+    session.headers['Referer'] = referer
+    session.header_profile = name
+    return name
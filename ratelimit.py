@@ -0,0 +1,68 @@
+"""
+Per-host rate limiting shared across scraper threads.
+
+A RateLimiter is attached to a requests session as ``session.rate_limiter``.
+The scrapers call ``throttle(session, url)`` before each request. When a
+limiter is attached it replaces the fixed random sleeps, so several jobs
+sharing a session stay within one request budget per host.
+"""
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket per host.
+
+    Args:
+        rate (float): Requests per second allowed for each host
+        burst (int): Number of requests that may be made back to back
+        jitter (float): Maximum random extra delay in seconds, to avoid a fixed cadence
+    """
+
+    def __init__(self, rate, burst=1, jitter=0.0):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst
+        self.jitter = jitter
+        self._lock = threading.Lock()
+        # host -> (tokens, last_refill)
+        self._buckets = {}
+
+    def _reserve(self, host):
+        """Take a token for host and return how long the caller must wait for it"""
+        with self._lock:
+            now = time.monotonic()
+            tokens, last = self._buckets.get(host, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            tokens -= 1
+            self._buckets[host] = (tokens, now)
+            return 0.0 if tokens >= 0 else -tokens / self.rate
+
+    def wait(self, url):
+        """Block until a request to the host of url is allowed"""
+        host = urlparse(url).netloc
+        delay = self._reserve(host)
+        if self.jitter:
+            delay += random.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+def throttle(session, url):
+    """
+    Wait for the session's rate limiter, if it has one.
+
+    Returns:
+        bool: True if a rate limiter was applied, False if the caller should
+              fall back to its own delays
+    """
+    limiter = getattr(session, 'rate_limiter', None)
+    if limiter is None:
+        return False
+    limiter.wait(url)
+    return True
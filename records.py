@@ -0,0 +1,225 @@
+"""
+Compact listing records and their encoders.
+
+A scraped listing used to be a plain dict that grew to 60 keys once its
+details were merged in, and every listing repeated the same short strings
+(agent, property type, tenure, 'GBP', 'GB', 'Added on 12/03/2024').
+
+Property stores the known fields in __slots__, so it has no per-instance
+hash table. Rarely seen keys go in a small overflow dict that is only
+created when one is set. Categorical string fields are interned on
+assignment, so 100k listings share one copy of each agent name and
+property type. Property implements the mutable mapping interface
+(get, [], in, update, items, ...), so the scrapers, filters, dedup,
+transform and storage code reads and writes it exactly as it did a dict.
+
+Encoders:
+- dumps()/dump() write compact UTF-8 JSON in one C-accelerated pass
+  (Property objects are encoded as objects, key order: fields then extras).
+- pack()/unpack() write a binary batch: a field header plus one tuple per
+  listing, pickled. It is several times faster to write and read than JSON
+  and is meant for caches and hand-offs between our own processes.
+"""
+import json
+import pickle
+import sys
+from collections.abc import Mapping, MutableMapping
+
+FIELDS = (
+    # Search card fields
+    'property_id', 'link', 'url', 'price', 'address', 'postcode', 'beds', 'baths', 'type',
+    'description', 'agent', 'date_added',
+    # Detail page fields
+    'property_type', 'property_title', 'bedrooms', 'bathrooms', 'receptions', 'currency', 'country_code',
+    'latitude', 'longitude', 'google_map_location', 'street_view', 'virtual_tour', 'features', 'tags',
+    'property_size', 'price_per_size', 'tenure', 'time_remaining_on_lease', 'council_tax_band',
+    'service_charge', 'ground_rent', 'ecp_rating', 'energy_performance_certificate', 'agent_details',
+    'property_images', 'floor_plans', 'points_ofInterest', 'listing_history', 'similar_properties',
+    'breadcrumbs', 'additional_links', 'market_stats_last_12_months', 'market_stats_recent_sales_nearby',
+    'market_stats_renta_opportunities', 'availability', 'commonhold_details', 'uprn',
+)
+
+# Fields with few distinct values across listings; their strings are interned
+CATEGORICAL = frozenset((
+    'beds', 'baths', 'type', 'agent', 'date_added', 'property_type', 'bedrooms', 'bathrooms', 'receptions',
+    'currency', 'country_code', 'tenure', 'council_tax_band', 'ecp_rating', 'virtual_tour', 'availability',
+))
+
+_SLOTS = frozenset(FIELDS)
+_MISSING = object()
+_intern = sys.intern
+
+
+class Property(MutableMapping):
+    """
+    One scraped listing. Behaves like a dict of its fields.
+
+    Usage:
+        prop = Property(property_id='123', price='250000')
+        prop['agent'] = 'Acme Estates'
+        prop.get('beds')            # None
+        prop.update(details)
+    """
+
+    __slots__ = FIELDS + ('_extra',)
+
+    def __init__(self, data=None, **fields):
+        self._extra = None
+        if data:
+            self.update(data)
+        if fields:
+            self.update(fields)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Return data as a Property (Property instances are returned unchanged)"""
+        return data if isinstance(data, Property) else cls(data)
+
+    def __getitem__(self, key):
+        if key in _SLOTS:
+            value = getattr(self, key, _MISSING)
+            if value is not _MISSING:
+                return value
+        elif self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in _SLOTS:
+            if key in CATEGORICAL and type(value) is str:
+                value = _intern(value)
+            object.__setattr__(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        try:
+            if key in _SLOTS:
+                object.__delattr__(self, key)
+            else:
+                del self._extra[key]
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def __contains__(self, key):
+        if key in _SLOTS:
+            return getattr(self, key, _MISSING) is not _MISSING
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self):
+        for field in FIELDS:
+            if getattr(self, field, _MISSING) is not _MISSING:
+                yield field
+        if self._extra:
+            yield from list(self._extra)
+
+    def __len__(self):
+        count = sum(1 for field in FIELDS if getattr(self, field, _MISSING) is not _MISSING)
+        return count + (len(self._extra) if self._extra else 0)
+
+    def get(self, key, default=None):
+        if key in _SLOTS:
+            value = getattr(self, key, _MISSING)
+            return default if value is _MISSING else value
+        return self._extra.get(key, default) if self._extra is not None else default
+
+    def update(self, other=(), **fields):
+        items = other.items() if isinstance(other, Mapping) else other
+        for key, value in items:
+            self[key] = value
+        for key, value in fields.items():
+            self[key] = value
+
+    def to_dict(self):
+        """Return the listing as a plain dict"""
+        data = {}
+        for field in FIELDS:
+            value = getattr(self, field, _MISSING)
+            if value is not _MISSING:
+                data[field] = value
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+    def copy(self):
+        return Property(self)
+
+    def __eq__(self, other):
+        if isinstance(other, Mapping):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"Property({self.to_dict()!r})"
+
+    def __reduce__(self):
+        return (Property, (self.to_dict(),))
+
+
+def _default(obj):
+    if isinstance(obj, Property):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), default=_default)
+
+
+def dumps(obj):
+    """Encode listings (or anything containing them) as compact JSON"""
+    return _encoder.encode(obj)
+
+
+def dump(obj, f):
+    """Write compact JSON to a text file opened with encoding='utf-8'"""
+    f.write(_encoder.encode(obj))
+
+
+def pack(properties):
+    """
+    Encode a batch of listings as bytes.
+
+    Returns:
+        bytes: Field header plus one (slot values, extras) tuple per listing
+    """
+    rows = []
+    append = rows.append
+    for prop in properties:
+        if isinstance(prop, Property):
+            append((tuple([getattr(prop, field, Ellipsis) for field in FIELDS]), prop._extra))
+        else:
+            append((tuple([prop.get(field, Ellipsis) for field in FIELDS]),
+                    {key: value for key, value in prop.items() if key not in _SLOTS} or None))
+    return pickle.dumps((FIELDS, rows), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def unpack(data):
+    """
+    Decode bytes from pack().
+
+    Only unpack data written by pack() in our own pipeline: like any pickle,
+    it must not come from an untrusted source.
+
+    Returns:
+        list: Property objects
+    """
+    fields, rows = pickle.loads(data)
+    properties = []
+    append = properties.append
+    new = Property.__new__
+    set_field = object.__setattr__
+    for values, extra in rows:
+        prop = new(Property)
+        set_field(prop, '_extra', dict(extra) if extra else None)
+        for field, value in zip(fields, values):
+            if value is not Ellipsis:
+                if field in _SLOTS:
+                    if field in CATEGORICAL and type(value) is str:
+                        value = _intern(value)
+                    set_field(prop, field, value)
+                else:
+                    prop[field] = value
+        append(prop)
+    return properties
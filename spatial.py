@@ -0,0 +1,261 @@
+"""
+In-memory spatial index over listing coordinates.
+
+Listings are bucketed into a fixed grid of lat/lng cells (0.01 degrees by
+default, about 1.1 km north-south, roughly a geohash of precision 6). A query
+only visits the cells that overlap its search area, so its cost depends on
+the number of listings near the query point, not on the size of the index:
+
+- bbox(): listings inside a bounding box
+- radius(): listings within a distance of a point, nearest first
+- nearest(): the k nearest listings, visiting cells nearest first
+
+Each cell keeps its coordinates in two flat arrays (8 bytes per value) next to
+its list of keys, so millions of points fit comfortably in memory and a cell
+is scanned with one zip() over its arrays. Points can be added at any time,
+e.g. after each scrape batch, and re-adding a key moves it.
+
+Distances use the equirectangular approximation around the query point,
+which is within a few metres of the great-circle distance at city scale.
+"""
+import math
+from array import array
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance between two points in kilometres"""
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _coordinate(value):
+    try:
+        value = float(value)
+    except (ValueError, TypeError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+def _first(item):
+    return item[0]
+
+
+class SpatialIndex:
+    """
+    Grid index from keys (e.g. (source, property_id)) to coordinates.
+
+    Args:
+        cell_degrees (float): Grid cell size in degrees of latitude and longitude
+    """
+
+    def __init__(self, cell_degrees=0.01):
+        self.cell_degrees = cell_degrees
+        # (row, col) -> (lats, lngs, keys) of the points in that cell
+        self.cells = {}
+        # key -> (row, col)
+        self.points = {}
+
+    def __len__(self):
+        return len(self.points)
+
+    def __contains__(self, key):
+        return key in self.points
+
+    def _cell(self, lat, lng):
+        return int(math.floor(lat / self.cell_degrees)), int(math.floor(lng / self.cell_degrees))
+
+    def add(self, key, lat, lng):
+        """
+        Add a point, or move it if the key is already indexed.
+
+        Returns:
+            bool: False if the coordinates are missing or invalid
+        """
+        lat, lng = _coordinate(lat), _coordinate(lng)
+        if lat is None or lng is None or not (-90 <= lat <= 90 and -180 <= lng <= 180):
+            return False
+        if key in self.points:
+            self.remove(key)
+        cell = self._cell(lat, lng)
+        bucket = self.cells.get(cell)
+        if bucket is None:
+            bucket = self.cells[cell] = (array('d'), array('d'), [])
+        bucket[0].append(lat)
+        bucket[1].append(lng)
+        bucket[2].append(key)
+        self.points[key] = cell
+        return True
+
+    def remove(self, key):
+        """Remove a point; returns False if the key isn't indexed"""
+        cell = self.points.pop(key, None)
+        if cell is None:
+            return False
+        lats, lngs, keys = self.cells[cell]
+        position = keys.index(key)
+        del lats[position], lngs[position], keys[position]
+        if not keys:
+            del self.cells[cell]
+        return True
+
+    def get(self, key):
+        """Return the (lat, lng) of a key, or None"""
+        cell = self.points.get(key)
+        if cell is None:
+            return None
+        lats, lngs, keys = self.cells[cell]
+        position = keys.index(key)
+        return lats[position], lngs[position]
+
+    def add_listings(self, source, listings):
+        """
+        Index a batch of scraped listings by (source, property_id).
+
+        Returns:
+            int: Number of listings with usable coordinates
+        """
+        added = 0
+        for listing in listings:
+            property_id = listing.get('property_id')
+            if property_id and self.add((source, str(property_id)), listing.get('latitude'), listing.get('longitude')):
+                added += 1
+        return added
+
+    @classmethod
+    def from_store(cls, store, source=None, cell_degrees=0.01):
+        """Build an index over every listing with coordinates in a ListingStore"""
+        index = cls(cell_degrees)
+        for row_source, property_id, lat, lng in store.coordinates(source):
+            index.add((row_source, property_id), lat, lng)
+        return index
+
+    def _cells_in_range(self, min_lat, min_lng, max_lat, max_lng):
+        """
+        Yield (bucket, inner) for the populated cells overlapping a box.
+        inner is True for cells entirely inside the box.
+        """
+        min_row, min_col = self._cell(min_lat, min_lng)
+        max_row, max_col = self._cell(max_lat, max_lng)
+        cells = self.cells
+        if (max_row - min_row + 1) * (max_col - min_col + 1) > len(cells):
+            # Range larger than the populated area: walk the populated cells instead
+            candidates = [cell for cell in cells if min_row <= cell[0] <= max_row and min_col <= cell[1] <= max_col]
+        else:
+            candidates = [(row, col) for row in range(min_row, max_row + 1) for col in range(min_col, max_col + 1)]
+        for cell in candidates:
+            bucket = cells.get(cell)
+            if bucket is not None:
+                yield bucket, min_row < cell[0] < max_row and min_col < cell[1] < max_col
+
+    def bbox(self, min_lat, min_lng, max_lat, max_lng):
+        """
+        Return the keys of points inside a bounding box (edges included).
+
+        Returns:
+            list: Keys in no particular order
+        """
+        found = []
+        for (lats, lngs, keys), inner in self._cells_in_range(min_lat, min_lng, max_lat, max_lng):
+            if inner:
+                found.extend(keys)
+                continue
+            found.extend(key for lat, lng, key in zip(lats, lngs, keys)
+                         if min_lat <= lat <= max_lat and min_lng <= lng <= max_lng)
+        return found
+
+    def radius(self, lat, lng, km, limit=None):
+        """
+        Return points within km of (lat, lng), nearest first.
+
+        Returns:
+            list: (distance_km, key) tuples
+        """
+        kx = KM_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6)
+        ky = KM_PER_DEGREE
+        dlat, dlng = km / ky, km / kx
+        limit_sq = km * km
+        found = []
+        for (lats, lngs, keys), _ in self._cells_in_range(lat - dlat, lng - dlng, lat + dlat, lng + dlng):
+            for point_lat, point_lng, key in zip(lats, lngs, keys):
+                x = (point_lng - lng) * kx
+                y = (point_lat - lat) * ky
+                d_sq = x * x + y * y
+                if d_sq <= limit_sq:
+                    found.append((d_sq, key))
+        found.sort(key=_first)
+        if limit:
+            del found[limit:]
+        return [(math.sqrt(d_sq), key) for d_sq, key in found]
+
+    def nearest(self, lat, lng, k=10, max_km=None):
+        """
+        Return the k nearest points to (lat, lng).
+
+        Cells are searched outward ring by ring. Within a ring, a cell is
+        skipped when its nearest edge is farther than the k-th point found so
+        far, and the search stops once no later ring can hold a closer one.
+
+        Returns:
+            list: (distance_km, key) tuples, nearest first
+        """
+        if not self.points or k <= 0:
+            return []
+        cells = self.cells
+        size = self.cell_degrees
+        kx = KM_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6)
+        ky = KM_PER_DEGREE
+        center_row, center_col = self._cell(lat, lng)
+        # Distance covered by one more ring of cells, in the narrower (longitude) direction
+        ring_km = size * min(kx, ky)
+        bound_sq = max_km * max_km if max_km is not None else math.inf
+
+        def edge_distance_sq(cell):
+            row, col = cell
+            y = max(row * size - lat, 0, lat - (row + 1) * size) * ky
+            x = max(col * size - lng, 0, lng - (col + 1) * size) * kx
+            return x * x + y * y
+
+        found = []
+        ring = 0
+        while True:
+            # Sparse surroundings: the rest of the populated cells is cheaper than the next ring
+            last = ring > 0 and 8 * ring > len(cells)
+            if ring == 0:
+                ring_cells = [(center_row, center_col)]
+            elif last:
+                ring_cells = [cell for cell in cells
+                              if max(abs(cell[0] - center_row), abs(cell[1] - center_col)) >= ring]
+            else:
+                top, bottom = center_row + ring, center_row - ring
+                left, right = center_col - ring, center_col + ring
+                ring_cells = [(top, col) for col in range(left, right + 1)]
+                ring_cells += [(bottom, col) for col in range(left, right + 1)]
+                ring_cells += [(row, left) for row in range(bottom + 1, top)]
+                ring_cells += [(row, right) for row in range(bottom + 1, top)]
+
+            for edge_sq, cell in sorted((edge_distance_sq(cell), cell) for cell in ring_cells if cell in cells):
+                if edge_sq > bound_sq:
+                    break
+                lats, lngs, keys = cells[cell]
+                for point_lat, point_lng, key in zip(lats, lngs, keys):
+                    x = (point_lng - lng) * kx
+                    y = (point_lat - lat) * ky
+                    d_sq = x * x + y * y
+                    if d_sq <= bound_sq:
+                        found.append((d_sq, key))
+                if len(found) >= k:
+                    found.sort(key=_first)
+                    del found[k:]
+                    bound_sq = found[-1][0]
+
+            # Any point beyond this ring is at least ring * ring_km away
+            if last or (ring * ring_km) ** 2 >= bound_sq:
+                break
+            ring += 1
+
+        found.sort(key=_first)
+        return [(math.sqrt(d_sq), key) for d_sq, key in found[:k]]
@@ -0,0 +1,409 @@
+"""
+Embedded SQLite store for scraped listings.
+
+Listings are upserted keyed by (source, property_id) in batched transactions
+with the database in WAL mode, so incremental runs only touch changed rows and
+readers are never blocked by a running scraper. A listing's stored JSON is
+merged with each new scrape, so fields from an earlier detail fetch survive a
+later search-card-only run, and the stored UKProperty record is rebuilt from
+the merged JSON so it agrees with the indexed columns. Every price change is
+recorded in a price_history table by triggers, and the common filter columns
+(location, bedrooms, price, property type, outcode) are indexed so queries
+like "3-bed flats under £300k in York" don't need every JSON file in memory.
+"""
+import json
+import sqlite3
+from datetime import datetime, timezone
+
+import records
+from dedup import extract_postcode
+from transform import normalize_counts, normalize_prices, transform_batch
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS listings (
+    source TEXT NOT NULL,
+    property_id TEXT NOT NULL,
+    location TEXT,
+    address TEXT,
+    outcode TEXT,
+    price INTEGER,
+    bedrooms INTEGER,
+    bathrooms INTEGER,
+    property_type TEXT,
+    latitude REAL,
+    longitude REAL,
+    link TEXT,
+    date_added TEXT,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    data TEXT NOT NULL,
+    uk_property TEXT,
+    PRIMARY KEY (source, property_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_listings_location ON listings (location, bedrooms, price);
+CREATE INDEX IF NOT EXISTS idx_listings_outcode ON listings (outcode, bedrooms, price);
+-- Keyset order of uk_property_page: pages stop after LIMIT rows instead of sorting every match
+CREATE INDEX IF NOT EXISTS idx_listings_location_price ON listings (location, price, source, property_id);
+CREATE INDEX IF NOT EXISTS idx_listings_outcode_price ON listings (outcode, price, source, property_id);
+CREATE INDEX IF NOT EXISTS idx_listings_price_key ON listings (price, source, property_id);
+DROP INDEX IF EXISTS idx_listings_price;
+CREATE INDEX IF NOT EXISTS idx_listings_type ON listings (property_type);
+CREATE INDEX IF NOT EXISTS idx_listings_last_seen ON listings (last_seen);
+
+CREATE TABLE IF NOT EXISTS price_history (
+    source TEXT NOT NULL,
+    property_id TEXT NOT NULL,
+    price INTEGER,
+    observed_at TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_price_history_listing ON price_history (source, property_id, observed_at);
+
+CREATE TRIGGER IF NOT EXISTS trg_listings_price_insert
+AFTER INSERT ON listings
+BEGIN
+    INSERT INTO price_history (source, property_id, price, observed_at)
+    VALUES (new.source, new.property_id, new.price, new.last_seen);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_listings_price_update
+AFTER UPDATE OF price ON listings
+WHEN old.price IS NOT new.price
+BEGIN
+    INSERT INTO price_history (source, property_id, price, observed_at)
+    VALUES (new.source, new.property_id, new.price, new.last_seen);
+END;
+"""
+
+UPSERT = """
+INSERT INTO listings (
+    source, property_id, location, address, outcode, price, bedrooms, bathrooms,
+    property_type, latitude, longitude, link, date_added, first_seen, last_seen, data, uk_property
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (source, property_id) DO UPDATE SET
+    location = COALESCE(excluded.location, listings.location),
+    address = COALESCE(excluded.address, listings.address),
+    outcode = COALESCE(excluded.outcode, listings.outcode),
+    price = COALESCE(excluded.price, listings.price),
+    bedrooms = COALESCE(excluded.bedrooms, listings.bedrooms),
+    bathrooms = COALESCE(excluded.bathrooms, listings.bathrooms),
+    property_type = COALESCE(excluded.property_type, listings.property_type),
+    latitude = COALESCE(excluded.latitude, listings.latitude),
+    longitude = COALESCE(excluded.longitude, listings.longitude),
+    link = COALESCE(excluded.link, listings.link),
+    date_added = COALESCE(excluded.date_added, listings.date_added),
+    last_seen = excluded.last_seen,
+    -- Merge rather than replace, so a card-only re-scrape keeps the detail fields of an earlier run
+    data = json_patch(listings.data, excluded.data),
+    -- Rebuilt from the merged data by ListingStore._refresh_uk_properties in the same transaction
+    uk_property = NULL
+"""
+
+SELECT_DATA = """
+SELECT property_id, data FROM listings
+WHERE source = ? AND property_id IN (SELECT value FROM json_each(?))
+"""
+
+UPDATE_UK_PROPERTY = "UPDATE listings SET uk_property = ? WHERE source = ? AND property_id = ?"
+
+
+def _float_or_none(value):
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def _filter_clauses(location=None, outcode=None, source=None, min_price=None, max_price=None,
+                    bedrooms=None, min_bedrooms=None, max_bedrooms=None, property_type=None, price_order=False):
+    """
+    Build WHERE clauses and parameters for the indexed filter columns.
+
+    With price_order, the bedroom filters are written as +bedrooms so SQLite
+    walks a (location|outcode, price) index in order and stops at the LIMIT,
+    rather than using the bedrooms index and sorting every match.
+    """
+    clauses = []
+    params = []
+    beds = "+bedrooms" if price_order else "bedrooms"
+    if location:
+        clauses.append("location = ?")
+        params.append(location.lower().strip())
+    if outcode:
+        clauses.append("outcode = ?")
+        params.append(outcode.upper())
+    if source:
+        clauses.append("source = ?")
+        params.append(source)
+    if min_price is not None:
+        clauses.append("price >= ?")
+        params.append(min_price)
+    if max_price is not None:
+        clauses.append("price <= ?")
+        params.append(max_price)
+    if bedrooms is not None:
+        clauses.append(f"{beds} = ?")
+        params.append(bedrooms)
+    if min_bedrooms is not None:
+        clauses.append(f"{beds} >= ?")
+        params.append(min_bedrooms)
+    if max_bedrooms is not None:
+        clauses.append(f"{beds} <= ?")
+        params.append(max_bedrooms)
+    if property_type:
+        clauses.append("property_type LIKE ?")
+        params.append(f"%{property_type}%")
+    return clauses, params
+
+
+class ListingStore:
+    """
+    SQLite-backed listing store.
+
+    Args:
+        path (str): Database file path
+        batch_size (int): Number of rows written per transaction
+        area_stats (AreaStats): Per-outcode stats used for the stored UKProperty records
+        check_same_thread (bool): False to allow use from several threads (callers serialise access)
+    """
+
+    def __init__(self, path="listings.db", batch_size=1000, area_stats=None, check_same_thread=True):
+        self.path = path
+        self.batch_size = batch_size
+        self.area_stats = area_stats
+        self.conn = sqlite3.connect(path, check_same_thread=check_same_thread)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _rows(self, source, properties, location, seen_at):
+        """Build upsert parameter tuples for a batch of scraped properties (uk_property is filled in afterwards)"""
+        properties = [prop for prop in properties if prop.get('property_id')]
+        prices = normalize_prices([prop.get('price') for prop in properties])
+        beds = normalize_counts([prop.get('beds', prop.get('bedrooms')) for prop in properties])
+        baths = normalize_counts([prop.get('baths', prop.get('bathrooms')) for prop in properties])
+
+        rows = []
+        for prop, price, bedrooms, bathrooms in zip(properties, prices, beds, baths):
+            property_id = str(prop['property_id'])
+            outcode, _ = extract_postcode(prop.get('address'))
+            rows.append((
+                source,
+                property_id,
+                location,
+                prop.get('address'),
+                outcode,
+                price,
+                bedrooms,
+                bathrooms,
+                prop.get('type'),
+                _float_or_none(prop.get('latitude')),
+                _float_or_none(prop.get('longitude')),
+                prop.get('link'),
+                prop.get('date_added'),
+                seen_at,
+                seen_at,
+                # A null would delete the stored field in json_patch; missing values keep it, like the columns
+                records.dumps({field: value for field, value in prop.items() if value is not None}),
+                None,
+            ))
+        return rows
+
+    def _refresh_uk_properties(self, source, property_ids):
+        """
+        Rebuild the UKProperty records of upserted listings from their merged data.
+
+        A listing the transform rejects (no usable price) is left with no record
+        rather than an older one that disagrees with the price column.
+        """
+        stored = {row['property_id']: json.loads(row['data'])
+                  for row in self.conn.execute(SELECT_DATA, (source, json.dumps(property_ids)))}
+        uk_properties = {str(uk['id']): uk for uk in
+                         transform_batch(list(stored.values()), verbose=False, area_stats=self.area_stats)}
+        self.conn.executemany(UPDATE_UK_PROPERTY, [
+            (json.dumps(uk_properties[property_id]) if property_id in uk_properties else None, source, property_id)
+            for property_id in stored
+        ])
+
+    def upsert_many(self, source, properties, location=None):
+        """
+        Insert or update scraped properties in batched transactions.
+
+        Args:
+            source (str): Portal name, e.g. 'rightmove' or 'zoopla'
+            properties (list): Scraped property dicts with a property_id
+            location (str): Search location the properties were scraped for
+
+        Returns:
+            int: Number of rows written
+        """
+        seen_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        location = location.lower().strip() if location else None
+        written = 0
+        for start in range(0, len(properties), self.batch_size):
+            rows = self._rows(source, properties[start:start + self.batch_size], location, seen_at)
+            with self.conn:
+                self.conn.executemany(UPSERT, rows)
+                self._refresh_uk_properties(source, [row[1] for row in rows])
+            written += len(rows)
+        return written
+
+    def query(self, location=None, outcode=None, source=None, min_price=None, max_price=None,
+              bedrooms=None, min_bedrooms=None, property_type=None, limit=None):
+        """
+        Query stored listings using the indexed columns.
+
+        Args:
+            location (str): Search location, e.g. 'York'
+            outcode (str): Postcode outcode, e.g. 'YO1'
+            source (str): Portal name
+            min_price (int): Minimum price
+            max_price (int): Maximum price
+            bedrooms (int): Exact number of bedrooms
+            min_bedrooms (int): Minimum number of bedrooms
+            property_type (str): Substring of the property type, e.g. 'flat'
+            limit (int): Maximum number of rows
+
+        Returns:
+            list: Matching rows as dicts, with 'data' and 'uk_property' decoded
+        """
+        clauses, params = _filter_clauses(location, outcode, source, min_price, max_price,
+                                          bedrooms, min_bedrooms, None, property_type)
+        sql = "SELECT * FROM listings"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY price"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        results = []
+        for row in self.conn.execute(sql, params):
+            result = dict(row)
+            result['data'] = json.loads(result['data'])
+            if result['uk_property']:
+                result['uk_property'] = json.loads(result['uk_property'])
+            results.append(result)
+        return results
+
+    def coordinates(self, source=None):
+        """
+        Iterate over the stored listings that have coordinates.
+
+        Yields:
+            tuple: (source, property_id, latitude, longitude)
+        """
+        sql = "SELECT source, property_id, latitude, longitude FROM listings WHERE latitude IS NOT NULL AND longitude IS NOT NULL"
+        params = []
+        if source:
+            sql += " AND source = ?"
+            params.append(source)
+        yield from self.conn.execute(sql, params)
+
+    def known_listings(self, source):
+        """
+        Iterate over the ids and areas of a portal's stored listings, e.g. to seed a crawl frontier.
+
+        Yields:
+            dict: property_id, address and postcode (the outcode)
+        """
+        rows = self.conn.execute("SELECT property_id, address, outcode FROM listings WHERE source = ?", (source,))
+        for row in rows:
+            yield {'property_id': row['property_id'], 'address': row['address'], 'postcode': row['outcode']}
+
+    def uk_property(self, source, property_id):
+        """Return the stored UKProperty JSON text of one listing, or None"""
+        row = self.conn.execute("SELECT uk_property FROM listings WHERE source = ? AND property_id = ?",
+                                (source, str(property_id))).fetchone()
+        return row[0] if row else None
+
+    def uk_property_page(self, filters=None, after=None, limit=50, rowids=None):
+        """
+        Iterate over one page of stored UKProperty records, in keyset order.
+
+        Args:
+            filters (dict): Keyword arguments of the indexed filters (location, outcode, source,
+                            min_price, max_price, bedrooms, min_bedrooms, max_bedrooms, property_type)
+            after (tuple): (price, source, property_id) of the last row of the previous page
+            limit (int): Maximum number of rows
+            rowids (list): Only these rows, e.g. the result of a spatial query
+
+        Yields:
+            tuple: (price, source, property_id, uk_property JSON text), ordered by price
+        """
+        clauses, params = _filter_clauses(**(filters or {}), price_order=True)
+        clauses.append("uk_property IS NOT NULL AND price IS NOT NULL")
+        if rowids is not None:
+            clauses.append("rowid IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps(rowids))
+        if after:
+            clauses.append("(price, source, property_id) > (?, ?, ?)")
+            params.extend(after)
+        sql = ("SELECT price, source, property_id, uk_property FROM listings WHERE " + " AND ".join(clauses) +
+               " ORDER BY price, source, property_id LIMIT ?")
+        params.append(limit)
+        yield from self.conn.execute(sql, params)
+
+    def located_since(self, after_rowid=0, seen_after=None):
+        """
+        Iterate over listings with coordinates that were added or updated since an earlier call.
+
+        Args:
+            after_rowid (int): Include listings inserted after this rowid
+            seen_after (str): Include listings whose last_seen is later than this
+
+        Yields:
+            tuple: (rowid, latitude, longitude, last_seen)
+        """
+        sql = "SELECT rowid, latitude, longitude, last_seen FROM listings WHERE (rowid > ?"
+        params = [after_rowid]
+        if seen_after:
+            sql += " OR last_seen > ?"
+            params.append(seen_after)
+        sql += ") AND latitude IS NOT NULL AND longitude IS NOT NULL"
+        yield from self.conn.execute(sql, params)
+
+    def data_version(self):
+        """Return a counter that changes whenever another connection commits to the database"""
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def area_rows(self, source=None):
+        """
+        Iterate over the stored listings that have a price and an outcode.
+
+        Yields:
+            tuple: (source, listing dict with property_id, postcode (the outcode), price and property_size)
+        """
+        sql = ("SELECT source, property_id, outcode, price, json_extract(data, '$.property_size') AS property_size "
+               "FROM listings WHERE price IS NOT NULL AND outcode IS NOT NULL")
+        params = []
+        if source:
+            sql += " AND source = ?"
+            params.append(source)
+        for row in self.conn.execute(sql, params):
+            yield row['source'], {'property_id': row['property_id'], 'postcode': row['outcode'],
+                                  'price': row['price'], 'property_size': row['property_size']}
+
+    def price_history(self, source, property_id):
+        """
+        Return the recorded price changes for a listing, oldest first.
+
+        Returns:
+            list: Dicts with 'price' and 'observed_at'
+        """
+        rows = self.conn.execute(
+            "SELECT price, observed_at FROM price_history WHERE source = ? AND property_id = ? ORDER BY observed_at, rowid",
+            (source, str(property_id))
+        )
+        return [dict(row) for row in rows]
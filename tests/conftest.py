@@ -0,0 +1,41 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, url, text):
+        self.url = url
+        self.text = text
+        self.content = text.encode('utf-8')
+
+    def raise_for_status(self):
+        pass
+
+
+class NoWait:
+    def wait(self, url):
+        pass
+
+
+class FakeSession:
+    """Serves fixed page text for any URL, with a rate limiter that never waits"""
+    rate_limiter = NoWait()
+
+    def __init__(self, text):
+        self.text = text
+
+    def get(self, url, timeout=None):
+        return FakeResponse(url, self.text)
+
+
+@pytest.fixture
+def fake_session(tmp_path, monkeypatch):
+    """Return a factory for sessions serving a page; scrapers' debug dumps go to tmp_path"""
+    monkeypatch.chdir(tmp_path)
+    return FakeSession
@@ -0,0 +1,182 @@
+import threading
+
+import pytest
+
+from blocking import BLOCKED, CAPTCHA, OK, RATE_LIMITED, BlockedError, RotatingSession, classify_response
+from portals import rightmove
+
+
+class Response:
+    def __init__(self, status_code=200, body=b'<html>' + b'x' * 60000 + b'</html>', headers=None, url='https://x/'):
+        self.status_code = status_code
+        self.content = body
+        self.text = body.decode('utf-8')
+        self.headers = headers or {}
+        self.url = url
+
+    def raise_for_status(self):
+        pass
+
+
+class Session:
+    """Returns the queued responses in order; records whether it was closed"""
+
+    def __init__(self, responses, proxy=None):
+        self.responses = list(responses)
+        self.proxy = proxy
+        self.closed = False
+
+    def get(self, url, timeout=None):
+        return self.responses.pop(0)
+
+    def close(self):
+        self.closed = True
+
+
+def test_classify_response():
+    assert classify_response(Response()) == OK
+    # A short page is not a block page by itself
+    assert classify_response(Response(body=b'<html>No results</html>')) == OK
+    assert classify_response(Response(status_code=429)) == RATE_LIMITED
+    assert classify_response(Response(body=b'<div class="g-recaptcha">captcha</div>')) == CAPTCHA
+    assert classify_response(Response(status_code=403, body=b'Access denied')) == BLOCKED
+
+
+def test_rate_limited_response_backs_off_without_quarantine():
+    sessions = []
+
+    def factory(proxy):
+        sessions.append(Session([Response(429, b'slow down', headers={'Retry-After': '0'}), Response()], proxy))
+        return sessions[-1]
+
+    pool = RotatingSession(factory, ['p1', 'p2'])
+    assert pool.get('https://x/').status_code == 200
+    assert len(sessions) == 1
+    assert pool.quarantined == {}
+    assert pool.rate_limits == 1
+
+
+def test_blocked_response_rotates_and_closes_old_session():
+    sessions = []
+
+    def factory(proxy):
+        responses = [Response(403, b'Access denied')] if not sessions else [Response()]
+        sessions.append(Session(responses, proxy))
+        return sessions[-1]
+
+    pool = RotatingSession(factory, ['p1', 'p2'])
+    assert pool.get('https://x/').status_code == 200
+    assert [session.proxy for session in sessions] == ['p1', 'p2']
+    assert 'p1' in pool.quarantined
+    assert sessions[0].closed and not sessions[1].closed
+
+
+def test_replaced_session_stays_open_while_in_use():
+    started = threading.Event()
+    finish = threading.Event()
+
+    class SlowSession(Session):
+        def get(self, url, timeout=None):
+            if url.endswith('/slow'):
+                started.set()
+                finish.wait(5)
+                assert not self.closed
+                return Response()
+            return super().get(url, timeout)
+
+    sessions = []
+
+    def factory(proxy):
+        responses = [Response(403, b'Access denied')] if not sessions else [Response()]
+        sessions.append(SlowSession(responses, proxy))
+        return sessions[-1]
+
+    pool = RotatingSession(factory, ['p1', 'p2'])
+    slow = threading.Thread(target=pool.get, args=('https://x/slow',))
+    slow.start()
+    started.wait(5)
+    # Another thread is blocked on the same session and rotates it while the slow request is in flight
+    assert pool.get('https://x/').status_code == 200
+    assert not sessions[0].closed
+    finish.set()
+    slow.join(5)
+    assert sessions[0].closed
+
+
+def test_scrape_property_details_raises_when_blocked(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    class BlockedSession(Session):
+        rate_limiter = None
+
+    session = BlockedSession([Response(403, b'Access denied')])
+    monkeypatch.setattr(rightmove, 'throttle', lambda session, url: True)
+    with pytest.raises(BlockedError):
+        rightmove.scrape_property_details(session, 'https://www.rightmove.co.uk/properties/1')
+
+
+def test_blocked_detail_item_is_not_stored(tmp_path, monkeypatch):
+    from distributed import CrawlWorker
+    from storage import ListingStore
+    from work_queue import WorkQueue
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(rightmove, 'throttle', lambda session, url: True)
+    queue = WorkQueue(str(tmp_path / 'queue.db'))
+    store = ListingStore(str(tmp_path / 'listings.db'))
+    worker = CrawlWorker(queue, store, worker_id='test')
+    worker.sessions['rightmove'] = Session([Response(403, b'Access denied')])
+    queue.put('detail', 'rightmove', {
+        'location': 'York',
+        'property': {'property_id': '1', 'link': 'https://www.rightmove.co.uk/properties/1'},
+    }, 'rightmove:detail:1')
+
+    item = queue.lease('test')
+    # CrawlWorker.run nacks items whose processing raises, so the item is retried later
+    with pytest.raises(BlockedError):
+        worker.process(item)
+    assert store.uk_property('rightmove', '1') is None
+    store.close()
+    queue.close()
+
+
+def test_rotating_session_sees_blocks_through_the_real_adapter(monkeypatch):
+    import http.server
+
+    # Served in order: a 503 block page, a 429, then the listing page
+    replies = [(503, b'Access denied', {}), (429, b'slow down', {'Retry-After': '0'}),
+               (200, b'<html>' + b'x' * 60000 + b'</html>', {})]
+    hits = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            status, body, headers = replies[min(len(hits), len(replies) - 1)]
+            hits.append(self.path)
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    for name in ('HTTP_PROXY', 'HTTPS_PROXY', 'http_proxy', 'https_proxy', 'ALL_PROXY', 'all_proxy'):
+        monkeypatch.delenv(name, raising=False)
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        pool = RotatingSession(lambda proxy: rightmove.create_session(proxy))
+        response = pool.get(f'http://127.0.0.1:{server.server_port}/property-for-sale', timeout=5)
+        pool.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert response.status_code == 200
+    # The adapter hands each 503/429 to the pool instead of retrying it on the same session
+    assert len(hits) == 3
+    assert pool.blocks == 1
+    assert pool.rate_limits == 1
@@ -0,0 +1,24 @@
+import pytest
+
+from cascades import SelectorCascade, SelectorRegistry
+from parsing import parse_html
+
+
+def test_alternatives_with_commas_are_kept_whole():
+    cascade = SelectorCascade('test.price', [':is(.price, .amount) span', '[data-label="a, b"]'])
+    assert cascade.alternatives == [':is(.price, .amount) span', '[data-label="a, b"]']
+    soup = parse_html('<div class="amount"><span>£100</span></div>')
+    assert cascade.select_one(soup).text == '£100'
+
+
+def test_string_alternatives_are_rejected():
+    with pytest.raises(TypeError):
+        SelectorCascade('test.price', '.price, .amount')
+
+
+def test_conflicting_registration_raises():
+    registry = SelectorRegistry()
+    first = registry.register('test.price', ['.price'])
+    assert registry.register('test.price', ['.price']) is first
+    with pytest.raises(ValueError):
+        registry.register('test.price', ['.amount'])
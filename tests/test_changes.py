@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta, timezone
+
+from changes import detect_changes, latest_snapshot
+
+
+def listing(property_id, price):
+    return {'property_id': property_id, 'price': price, 'link': f'/properties/{property_id}'}
+
+
+def counts(events):
+    result = {}
+    for event in events:
+        result[event['event']] = result.get(event['event'], 0) + 1
+    return result
+
+
+def test_three_consecutive_runs_diff_against_previous_snapshot(tmp_path):
+    start = datetime(2026, 10, 1, 6, 0, tzinfo=timezone.utc)
+    run1 = [listing('1', '100000'), listing('2', '200000'), listing('3', '300000')]
+    run2 = [listing('1', '100000'), listing('2', '190000'), listing('4', '400000')]
+
+    events = detect_changes('rightmove', 'York', run1, str(tmp_path), run_at=start)
+    assert counts(events) == {'new': 3}
+
+    events = detect_changes('rightmove', 'York', run2, str(tmp_path), run_at=start + timedelta(days=1))
+    assert counts(events) == {'new': 1, 'removed': 1, 'price_changed': 1}
+
+    # Same listings as run 2: nothing changed, although the event log now exists next to the snapshots
+    events = detect_changes('rightmove', 'York', run2, str(tmp_path), run_at=start + timedelta(days=2))
+    assert events == []
+
+
+def test_latest_snapshot_ignores_change_log_and_other_locations(tmp_path):
+    start = datetime(2026, 10, 1, 6, 0, tzinfo=timezone.utc)
+    detect_changes('rightmove', 'York', [listing('1', '1')], str(tmp_path), run_at=start)
+    detect_changes('rightmove', 'York North', [listing('2', '1')], str(tmp_path), run_at=start + timedelta(days=1))
+
+    latest = latest_snapshot(str(tmp_path), 'rightmove', 'York')
+    assert latest.endswith('rightmove_york_20261001T060000.snapshot.jsonl')
+
+
+def test_delta_run_is_merged_into_previous_snapshot(tmp_path):
+    start = datetime(2026, 10, 1, 6, 0, tzinfo=timezone.utc)
+    full = [listing('1', '100000'), listing('2', '200000')]
+    detect_changes('rightmove', 'York', full, str(tmp_path), run_at=start)
+
+    # A delta run only returns the listing added since, plus one re-seen at a new price
+    delta = [listing('2', '195000'), listing('3', '300000')]
+    events = detect_changes('rightmove', 'York', delta, str(tmp_path), run_at=start + timedelta(days=1), partial=True)
+    assert counts(events) == {'new': 1, 'price_changed': 1}
+
+    # The merged snapshot still holds listing 1, so a following full run doesn't report it as new
+    full = [listing('1', '100000'), listing('2', '195000'), listing('3', '300000')]
+    events = detect_changes('rightmove', 'York', full, str(tmp_path), run_at=start + timedelta(days=2))
+    assert events == []
@@ -0,0 +1,38 @@
+from dedup import DedupIndex
+
+
+def test_postcode_on_one_portal_only_still_matches():
+    index = DedupIndex()
+    index.add('rightmove', {'property_id': '1', 'address': '10 High Street, York', 'beds': '3', 'price': '250000'})
+    matched = index.add_all('zoopla', [
+        {'property_id': '9', 'address': '10 High St, York YO1 7AB', 'beds': '3', 'price': '£252,000'},
+    ])
+    assert matched == 1
+
+
+def test_listings_without_a_price_do_not_match():
+    index = DedupIndex()
+    index.add('rightmove', {'property_id': '1', 'address': '10 High Street, York', 'beds': '3'})
+    assert index.find_matches({'address': '10 High Street, York', 'beds': '3', 'price': '250000'}) == []
+    assert index.find_matches({'address': '10 High Street, York', 'beds': '3'}) == []
+
+
+def test_relisted_property_is_enriched_elsewhere():
+    index = DedupIndex()
+    first = {'property_id': '1', 'address': '10 High Street, York', 'beds': '3', 'price': '250000'}
+    relisted = {'property_id': '2', 'address': '10 High Street, York, YO1 7AB', 'beds': '3', 'price': '245000'}
+    index.add_all('rightmove', [first, relisted])
+    assert index.enriched_elsewhere('rightmove', relisted) is None
+
+    index.mark_enriched('rightmove', first)
+    assert index.enriched_elsewhere('rightmove', relisted) == 'rightmove:1'
+    assert index.enriched_elsewhere('rightmove', first) is None
+
+
+def test_saved_index_round_trips(tmp_path):
+    index = DedupIndex()
+    index.add('rightmove', {'property_id': '1', 'address': '10 High Street, York', 'beds': '3', 'price': '250000'})
+    index.save(str(tmp_path / 'dedup_index.json'))
+
+    loaded = DedupIndex.load(str(tmp_path / 'dedup_index.json'))
+    assert loaded.find_matches({'address': '10 High Street, York YO1 7AB', 'beds': '3', 'price': '250000'}) == ['rightmove:1']
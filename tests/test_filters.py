@@ -0,0 +1,32 @@
+from filters import SearchFilters
+from portals import rightmove
+from parsing import parse_html
+
+
+def rightmove_card(title, description='', price='£150,000'):
+    html = (f'<div class="propertyCard"><h2 class="propertyCard-title">{title}</h2>'
+            f'<div class="propertyCard-priceValue">{price}</div>'
+            f'<span class="propertyCard-description">{description}</span></div>')
+    soup = parse_html(html)
+    return rightmove.parse_listing_card(soup.select_one('.propertyCard'), 'https://www.rightmove.co.uk/properties/1', '1')
+
+
+def test_rightmove_land_card_is_dropped_by_type_filter():
+    card = rightmove_card('Land for sale', 'Building plot with outline planning permission')
+    assert card['type'] == 'Land'
+    assert 'beds' not in card
+    assert not SearchFilters(property_types=['detached']).matches(card)
+    assert SearchFilters(property_types=['land']).matches(card)
+
+
+def test_zero_bed_studio_is_not_unknown():
+    card = rightmove_card('Studio flat for sale')
+    assert card['beds'] == '0'
+    assert not SearchFilters(min_beds=1).matches(card)
+    assert SearchFilters(max_beds=1).matches(card)
+
+
+def test_missing_beds_still_match():
+    assert SearchFilters(min_beds=2).matches({'price': '200000', 'type': 'Not specified'})
+    assert SearchFilters(min_beds=2).matches({'price': '200000', 'beds': '3'})
+    assert not SearchFilters(min_beds=2).matches({'price': '200000', 'beds': 1})
@@ -0,0 +1,64 @@
+import json
+
+from frontier import CrawlFrontier
+from portals import rightmove
+
+URL = 'https://www.rightmove.co.uk/properties/100#/'
+
+
+def page_model_page():
+    """A detail page with a PAGE_MODEL, a similar-properties section and a recently sold section"""
+    model = {'propertyData': {
+        'id': '100',
+        'text': {'propertyPhrase': '3 bedroom house for sale'},
+        'address': {'displayAddress': '1 High Street, York, YO1 7AB', 'outcode': 'YO1', 'incode': '7AB'},
+        'prices': {'primaryPrice': '£300,000'},
+    }}
+    similar = ''.join(
+        f'<div class="propertyCard"><a href="/properties/{property_id}#/">'
+        f'<address>{property_id} Mill Lane, York, YO10 3AA</address></a>'
+        f'<span class="propertyCard-priceValue">£250,000</span></div>'
+        for property_id in ('101', '102')
+    )
+    sold = (
+        '<div class="sold-property-item"><a href="/properties/201">'
+        '<span class="address">3 Low Street, Leeds, LS1 1AA</span></a>'
+        '<span class="price">£180,000</span><span class="date">Jan 2026</span></div>'
+    )
+    return (
+        f'<html><head><script>window.PAGE_MODEL = {json.dumps(model)}</script></head><body>'
+        f'<h1>3 bedroom house for sale</h1>'
+        f'<div id="similarProperties">{similar}</div>'
+        f'<div id="recentlySold">{sold}</div>'
+        f'</body></html>'
+    )
+
+
+def test_page_model_details_feed_the_frontier(fake_session):
+    details = rightmove.scrape_property_details(fake_session(page_model_page()), URL)
+
+    assert details['property_title'] == '3 bedroom house for sale'
+    assert [item['link'] for item in details['similar_properties']] == [
+        'https://www.rightmove.co.uk/properties/101#/',
+        'https://www.rightmove.co.uk/properties/102#/',
+    ]
+    assert details['market_stats_recent_sales_nearby'][0]['link'] == 'https://www.rightmove.co.uk/properties/201'
+
+    frontier = CrawlFrontier()
+    frontier.add_known([details])
+    assert frontier.discover(details) == 3
+    popped = [frontier.pop()['property_id'] for _ in range(3)]
+    # A similar link outranks a sold one; once 101 is fetched, YO10 is denser and 102 drops to the sold link's score
+    assert popped[0] == '101'
+    assert sorted(popped[1:]) == ['102', '201']
+    assert frontier.pop() is None
+
+
+def test_links_to_known_listings_are_not_queued(fake_session):
+    details = rightmove.scrape_property_details(fake_session(page_model_page()), URL)
+
+    frontier = CrawlFrontier()
+    frontier.add_known_ids(['101', '201'])
+    assert frontier.discover(details) == 1
+    assert frontier.pop()['property_id'] == '102'
+    assert frontier.pop() is None
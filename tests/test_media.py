@@ -0,0 +1,90 @@
+import threading
+
+from media import MediaStore
+
+URL = 'https://media.rightmove.co.uk/1/photo.jpg'
+
+
+class Response:
+    content = b'\xff\xd8 jpeg bytes'
+    headers = {'Content-Type': 'image/jpeg'}
+
+    def raise_for_status(self):
+        pass
+
+
+class CountingSession:
+    def __init__(self):
+        self.urls = []
+        self._lock = threading.Lock()
+
+    def get(self, url, timeout=None):
+        with self._lock:
+            self.urls.append(url)
+        return Response()
+
+
+def test_url_stored_by_another_thread_is_not_fetched_again(tmp_path):
+    session = CountingSession()
+    store = MediaStore(str(tmp_path / 'media'), session=session)
+    stored_path = store._stored_path
+    other = threading.Thread(target=store.fetch, args=(URL,))
+
+    def other_thread_fetches_after_the_check(url):
+        # Right after this thread's store check, another thread downloads the same URL.
+        # fetch holds the lock here, so the other thread can only finish once this one is in flight.
+        path = stored_path(url)
+        if other.ident is None:
+            other.start()
+            other.join(0.5)
+        return path
+
+    store._stored_path = other_thread_fetches_after_the_check
+    path, requested = store.fetch(URL)
+    other.join(5)
+
+    assert requested
+    assert session.urls == [URL]
+    assert store.lookup(URL) == path
+    store.close()
+
+
+def test_fetch_waits_for_a_download_in_flight(tmp_path):
+    started = threading.Event()
+    finish = threading.Event()
+
+    class SlowSession(CountingSession):
+        def get(self, url, timeout=None):
+            started.set()
+            finish.wait(5)
+            return super().get(url, timeout)
+
+    session = SlowSession()
+    store = MediaStore(str(tmp_path / 'media'), session=session)
+    first = threading.Thread(target=store.fetch, args=(URL,))
+    first.start()
+    started.wait(5)
+    results = []
+    second = threading.Thread(target=lambda: results.append(store.fetch(URL)))
+    second.start()
+    finish.set()
+    first.join(5)
+    second.join(5)
+
+    assert session.urls == [URL]
+    assert results[0][0] == store.lookup(URL)
+    assert results[0][1] is False
+    store.close()
+
+
+def test_concurrent_fetches_of_one_url_make_one_request(tmp_path):
+    session = CountingSession()
+    store = MediaStore(str(tmp_path / 'media'), session=session)
+    threads = [threading.Thread(target=store.fetch, args=(URL,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert session.urls == [URL]
+    store.close()
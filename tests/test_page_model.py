@@ -0,0 +1,55 @@
+import json
+
+from portals import rightmove
+
+URL = 'https://www.rightmove.co.uk/properties/100#/'
+
+SECTIONS = '''
+<h1 class="property-header-title">3 bedroom house for sale</h1>
+<ol class="breadcrumb"><li><a href="/property-for-sale.html">For sale</a></li><li><a href="/York.html">York</a></li></ol>
+<div id="similarProperties"><div class="propertyCard"><a href="/properties/101#/"><address>2 Mill Lane, York</address></a>
+<span class="propertyCard-priceValue">£250,000</span></div></div>
+<div id="schools"><div class="school-item"><span class="school-name">St Mary's Primary</span>
+<span class="school-distance">0.3 miles</span></div></div>
+<div id="stations"><div class="station-item"><span class="station-name">York</span>
+<span class="station-distance">0.5 miles</span></div></div>
+<div id="recentlySold"><div class="sold-property-item"><a href="/properties/201"><span class="address">3 Low Street</span></a>
+<span class="price">£180,000</span></div></div>
+<p>UPRN: 100050000001</p>
+'''
+
+
+def page(with_model):
+    model = {'propertyData': {
+        'id': '100',
+        'text': {'propertyPhrase': '3 bedroom house for sale'},
+        'nearestStations': [{'name': 'York Station', 'distance': 0.41, 'unit': 'MILES'}],
+    }}
+    script = f'<script>window.PAGE_MODEL = {json.dumps(model)}</script>' if with_model else ''
+    return f'<html><head>{script}</head><body>{SECTIONS}</body></html>'
+
+
+def test_page_model_path_keeps_the_page_only_fields(fake_session):
+    dom = rightmove.scrape_property_details(fake_session(page(False)), URL)
+    model = rightmove.scrape_property_details(fake_session(page(True)), URL)
+
+    for field in ('similar_properties', 'market_stats_recent_sales_nearby', 'breadcrumbs', 'uprn'):
+        assert field in dom
+        assert model[field] == dom[field], field
+    assert model['uprn'] == '100050000001'
+    assert [crumb['name'] for crumb in model['breadcrumbs']] == ['For sale', 'York', '3 bedroom house for sale']
+
+
+def test_page_model_points_of_interest_keep_schools(fake_session):
+    dom = rightmove.scrape_property_details(fake_session(page(False)), URL)
+    model = rightmove.scrape_property_details(fake_session(page(True)), URL)
+
+    assert dom['points_ofInterest'] == [
+        {'point': "St Mary's Primary", 'distance': '0.3 miles'},
+        {'point': 'York', 'distance': '0.5 miles'},
+    ]
+    # Schools from the page, stations from the model
+    assert model['points_ofInterest'] == [
+        {'point': "St Mary's Primary", 'distance': '0.3 miles'},
+        {'point': 'York Station', 'distance': '0.4 miles'},
+    ]
@@ -0,0 +1,34 @@
+import json
+
+from poi import PoiIndex
+from portals import rightmove
+
+
+def search_page():
+    """A results page with two cards; the jsonModel only has coordinates for the first"""
+    model = {'properties': [
+        {'id': 1, 'location': {'latitude': 53.9591, 'longitude': -1.0815}},
+        {'id': 2, 'location': {}},
+    ]}
+    cards = ''.join(
+        f'<div class="propertyCard"><a class="propertyCard-link" href="/properties/{property_id}#/">'
+        f'<address class="propertyCard-address">{property_id} High Street, York</address></a>'
+        f'<div class="propertyCard-priceValue">£200,000</div></div>'
+        for property_id in ('1', '2')
+    )
+    return f'<html><body>{cards}<script>window.jsonModel = {json.dumps(model)}</script></body></html>'
+
+
+def test_search_cards_take_coordinates_from_the_page_model():
+    first, second = rightmove.parse_search_page(search_page().encode('utf-8'))
+    assert (first['latitude'], first['longitude']) == (53.9591, -1.0815)
+    assert 'latitude' not in second
+
+
+def test_cards_without_details_are_enriched(fake_session):
+    properties, _ = rightmove.fetch_search_page(fake_session(search_page()), 'REGION^1', 0)
+    index = PoiIndex([("St Mary's Primary", 'school', 53.9602, -1.0873)])
+
+    assert index.enrich(properties) == 1
+    assert properties[0]['points_ofInterest'][0]['point'] == "St Mary's Primary"
+    assert 'points_ofInterest' not in properties[1]
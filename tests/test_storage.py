@@ -0,0 +1,65 @@
+from storage import ListingStore
+
+
+def test_card_only_rescrape_keeps_detail_fields(tmp_path):
+    store = ListingStore(str(tmp_path / 'listings.db'))
+    detailed = {
+        'property_id': '1', 'address': '1 High Street, York YO1 7AB', 'price': '300000',
+        'description': ['A lovely family home.'], 'latitude': 53.9591, 'longitude': -1.0815,
+        'features': ['Garage'],
+    }
+    store.upsert_many('rightmove', [detailed], 'York')
+
+    card = {'property_id': '1', 'address': '1 High Street, York YO1 7AB', 'price': '290000', 'beds': '3'}
+    store.upsert_many('rightmove', [card], 'York')
+
+    row = store.query(source='rightmove')[0]
+    assert row['price'] == 290000
+    assert row['data']['price'] == '290000'
+    assert row['data']['beds'] == '3'
+    assert row['data']['description'] == ['A lovely family home.']
+    assert row['data']['features'] == ['Garage']
+    assert (row['latitude'], row['longitude']) == (53.9591, -1.0815)
+    store.close()
+
+
+def test_uk_property_is_built_from_the_merged_listing(tmp_path):
+    store = ListingStore(str(tmp_path / 'listings.db'))
+    detailed = {
+        'property_id': '1', 'address': '1 High Street, York YO1 7AB', 'price': '300000',
+        'description': ['A lovely family home.'], 'latitude': 53.9591, 'longitude': -1.0815,
+    }
+    store.upsert_many('rightmove', [detailed], 'York')
+    store.upsert_many('rightmove', [{'property_id': '1', 'address': '1 High Street, York YO1 7AB', 'price': '290000'}], 'York')
+
+    row = store.query(source='rightmove')[0]
+    assert row['price'] == 290000
+    assert row['uk_property']['price'] == 290000
+    assert row['uk_property']['description'] == 'A lovely family home.'
+    assert (row['uk_property']['latitude'], row['uk_property']['longitude']) == (53.9591, -1.0815)
+    store.close()
+
+
+def test_rejected_listing_has_no_stale_uk_property(tmp_path):
+    store = ListingStore(str(tmp_path / 'listings.db'))
+    listing = {'property_id': '1', 'address': '1 High Street, York YO1 7AB', 'price': '290000'}
+    store.upsert_many('rightmove', [listing], 'York')
+    # An agent without a phone number makes the transform drop the listing
+    store.upsert_many('rightmove', [dict(listing, price='280000', agent='Acme Estates')], 'York')
+
+    row = store.query(source='rightmove')[0]
+    assert row['price'] == 280000
+    assert row['uk_property'] is None
+    store.close()
+
+
+def test_missing_value_keeps_the_stored_field(tmp_path):
+    store = ListingStore(str(tmp_path / 'listings.db'))
+    store.upsert_many('rightmove', [{'property_id': '1', 'address': '1 High Street, York', 'price': '290000'}], 'York')
+    store.upsert_many('rightmove', [{'property_id': '1', 'address': '1 High Street, York', 'price': None}], 'York')
+
+    row = store.query(source='rightmove')[0]
+    assert row['price'] == 290000
+    assert row['data']['price'] == '290000'
+    assert row['uk_property']['price'] == 290000
+    store.close()
@@ -0,0 +1,16 @@
+from textindex import TextIndex, parse_query
+
+
+def test_near_takes_the_next_word_only():
+    assert parse_query('near York garden') == ([['garden']], [], ['york'])
+    assert parse_query('garden near York garage') == ([['garden'], ['garage']], [], ['york'])
+    assert parse_query('garden near hebden-bridge') == ([['garden']], [], ['hebden', 'bridge'])
+
+
+def test_term_after_the_place_searches_the_text():
+    index = TextIndex()
+    index.add('rightmove', {'property_id': '1', 'address': '1 High Street, York', 'description': 'Large garden'})
+    index.add('rightmove', {'property_id': '2', 'address': '2 Mill Lane, York', 'description': 'Courtyard'})
+    index.add('rightmove', {'property_id': '3', 'address': '3 Low Street, Leeds', 'description': 'Large garden'})
+
+    assert [key for _, key in index.search('near York garden')] == [('rightmove', '1')]
@@ -0,0 +1,42 @@
+import pytest
+import requests
+
+from frontier import CrawlFrontier
+from portals import rightmove
+from urls import RequestDeduper
+
+URL = 'https://www.rightmove.co.uk/properties/101'
+
+
+class FailingSession:
+    rate_limiter = None
+
+    def get(self, url, timeout=None):
+        raise requests.exceptions.ConnectionError('connection reset')
+
+
+def test_released_url_can_be_claimed_again():
+    deduper = RequestDeduper()
+    assert deduper.claim(URL)
+    assert not deduper.claim(URL)
+    deduper.release(URL)
+    assert URL not in deduper
+    assert deduper.claim(URL)
+
+
+def test_failed_detail_fetch_raises(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(rightmove, 'throttle', lambda session, url: True)
+    with pytest.raises(requests.exceptions.RequestException):
+        rightmove.scrape_property_details(FailingSession(), URL)
+
+
+def test_failed_discovered_fetch_releases_its_claim(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(rightmove, 'throttle', lambda session, url: True)
+    frontier = CrawlFrontier()
+    frontier.discover({'property_id': '100', 'similar_properties': [{'link': URL, 'address': '1 Mill Lane, York'}]})
+    deduper = RequestDeduper()
+
+    assert rightmove.fetch_discovered(FailingSession(), frontier, 5, deduper) == []
+    assert len(deduper) == 0
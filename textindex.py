@@ -0,0 +1,352 @@
+"""
+Full-text search over listing descriptions, key features and addresses.
+
+An in-memory inverted index: each term maps to a postings dict of
+{document: weighted term frequency}. Queries intersect the postings of their
+terms, starting from the rarest, and rank the survivors with BM25. Only the
+listings that contain the terms are touched, so a query costs the size of its
+rarest term's postings rather than a scan over every listing.
+
+Query syntax:
+    garden garage               both terms (AND is implied; "AND" is accepted)
+    garden OR patio garage      (garden or patio) and garage
+    garden -leasehold           NOT / a leading '-' excludes a term
+    garden near York garage     "near" restricts to listings whose address has the next word
+    near hebden-bridge          join a multi-word place with hyphens
+
+Terms are lower-cased, stop words are dropped and plurals are folded
+('gardens' finds 'garden'). Listings can be added in batches at any time, and
+re-adding a listing replaces its previous text.
+"""
+import heapq
+import json
+import math
+import os
+
+import patterns
+
+# Text fields and the weight of one occurrence of a term in them
+FIELD_WEIGHTS = {
+    'title': 2.0,
+    'features': 2.0,
+    'address': 1.0,
+    'description': 1.0,
+}
+
+STOP_WORDS = frozenset((
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'have', 'in', 'into', 'is', 'it',
+    'its', 'of', 'on', 'or', 'the', 'this', 'to', 'which', 'with', 'within', 'our', 'we', 'you', 'your',
+))
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+_stems = {}
+
+
+def _stem(word):
+    """Fold plurals: gardens -> garden, properties -> property (memoised)"""
+    stem = _stems.get(word)
+    if stem is None:
+        stem = word
+        if len(word) > 4 and word.endswith('ies'):
+            stem = word[:-3] + 'y'
+        elif len(word) > 3 and word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+            stem = word[:-1]
+        _stems[word] = stem
+    return stem
+
+
+def tokenize(text):
+    """
+    Split text into index terms.
+
+    Returns:
+        list: Lower-cased, plural-folded terms without stop words
+    """
+    if not text:
+        return []
+    return [_stem(word) for word in patterns.WORD.findall(text.lower()) if word not in STOP_WORDS]
+
+
+def _text(value):
+    if not value:
+        return ''
+    if isinstance(value, (list, tuple)):
+        return ' '.join(str(item) for item in value if item)
+    return str(value)
+
+
+def listing_fields(listing):
+    """Return {field: text} for a scraped listing or a UKProperty record"""
+    details = listing.get('property_details') or {}
+    return {
+        'title': _text(listing.get('property_title')) + ' ' + _text(listing.get('type') or listing.get('property_type')),
+        'features': _text(listing.get('features') or details.get('property_features')),
+        'address': _text(listing.get('address')),
+        'description': _text(listing.get('description')),
+    }
+
+
+def parse_query(query):
+    """
+    Parse a query string.
+
+    Returns:
+        tuple: (clauses, excluded, place) where clauses is a list of OR-groups
+               of terms that must all match, excluded a list of terms that must
+               not, and place the terms the address must contain. "near"
+               applies to the one word after it.
+    """
+    clauses = []
+    excluded = []
+    place = []
+    negate = either = in_place = False
+    for word in query.split():
+        lower = word.lower()
+        if lower == 'and':
+            in_place = False
+            continue
+        if lower == 'or':
+            either, in_place = True, False
+            continue
+        if lower == 'not':
+            negate, in_place = True, False
+            continue
+        if lower == 'near':
+            in_place = True
+            continue
+        if word.startswith('-'):
+            negate, in_place = True, False
+        terms = tokenize(word)
+        if not terms:
+            continue
+        if in_place:
+            place.extend(terms)
+        elif negate:
+            excluded.extend(terms)
+        elif either and clauses:
+            clauses[-1].extend(terms)
+        else:
+            # A word that splits into several terms (en-suite) needs all of them
+            clauses.extend([term] for term in terms)
+        negate = either = in_place = False
+    return clauses, excluded, place
+
+
+class TextIndex:
+    """
+    Incrementally updated inverted index with BM25 ranking.
+
+    Documents are keyed by (source, property_id).
+    """
+
+    def __init__(self):
+        # term -> {doc: weighted term frequency}
+        self.postings = {}
+        # Address terms only, for "near" filters: term -> set of docs
+        self.address_postings = {}
+        self.doc_ids = {}
+        # Per doc: key, weighted length, terms, address terms (None once removed)
+        self.keys = []
+        self.lengths = []
+        self.doc_terms = []
+        self.doc_address_terms = []
+        self.total_length = 0.0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def _add_document(self, key, frequencies, address_terms):
+        length = sum(frequencies.values())
+        doc = self.doc_ids.get(key)
+        if doc is None:
+            doc = self.doc_ids[key] = len(self.keys)
+            self.keys.append(key)
+            self.lengths.append(length)
+            self.doc_terms.append(None)
+            self.doc_address_terms.append(None)
+        else:
+            # Re-indexed listing: reuse its slot
+            self._unindex(doc)
+            self.lengths[doc] = length
+        self.doc_terms[doc] = tuple(frequencies)
+        self.doc_address_terms[doc] = address_terms
+        self.total_length += length
+        self.count += 1
+        postings = self.postings
+        for term, frequency in frequencies.items():
+            posting = postings.get(term)
+            if posting is None:
+                posting = postings[term] = {}
+            posting[doc] = frequency
+        for term in address_terms:
+            docs = self.address_postings.get(term)
+            if docs is None:
+                docs = self.address_postings[term] = set()
+            docs.add(doc)
+
+    def _unindex(self, doc):
+        for term in self.doc_terms[doc]:
+            posting = self.postings[term]
+            del posting[doc]
+            if not posting:
+                del self.postings[term]
+        for term in self.doc_address_terms[doc]:
+            docs = self.address_postings[term]
+            docs.discard(doc)
+            if not docs:
+                del self.address_postings[term]
+        self.total_length -= self.lengths[doc]
+        self.count -= 1
+
+    def add(self, source, listing):
+        """
+        Index one listing, replacing any earlier version of it.
+
+        Returns:
+            bool: False if the listing has no id
+        """
+        property_id = listing.get('property_id') or listing.get('id')
+        if not property_id:
+            return False
+        frequencies = {}
+        address_terms = ()
+        for field, text in listing_fields(listing).items():
+            terms = tokenize(text)
+            weight = FIELD_WEIGHTS[field]
+            for term in terms:
+                frequencies[term] = frequencies.get(term, 0.0) + weight
+            if field == 'address':
+                address_terms = tuple(set(terms))
+        self._add_document((source, str(property_id)), frequencies, address_terms)
+        return True
+
+    def add_listings(self, source, listings):
+        """
+        Index a batch of listings (scraped dicts or UKProperty records).
+
+        Returns:
+            int: Number of listings indexed
+        """
+        return sum(1 for listing in listings if self.add(source, listing))
+
+    def remove(self, source, property_id):
+        """Remove a listing from the index; returns False if it isn't indexed"""
+        doc = self.doc_ids.pop((source, str(property_id)), None)
+        if doc is None:
+            return False
+        self._unindex(doc)
+        self.keys[doc] = self.doc_terms[doc] = self.doc_address_terms[doc] = None
+        return True
+
+    def _matches(self, clauses, excluded, place):
+        """Return the set of docs matching a parsed query, or None if nothing can match"""
+        groups = []
+        for clause in clauses:
+            # Key views, so set operations iterate the smaller side instead of the whole posting
+            postings = [self.postings[term].keys() for term in clause if term in self.postings]
+            if not postings:
+                return None
+            groups.append(postings)
+        for term in place:
+            docs = self.address_postings.get(term)
+            if not docs:
+                return None
+            groups.append([docs])
+
+        # Intersect from the rarest group so every later step only shrinks a small set
+        groups.sort(key=lambda postings: sum(len(posting) for posting in postings))
+        if groups:
+            candidates = set().union(*groups[0])
+            for postings in groups[1:]:
+                if len(postings) == 1:
+                    candidates = postings[0] & candidates
+                else:
+                    candidates = set().union(*postings) & candidates
+                if not candidates:
+                    return None
+        else:
+            candidates = {doc for doc, key in enumerate(self.keys) if key is not None}
+
+        for term in excluded:
+            posting = self.postings.get(term)
+            if posting:
+                candidates.difference_update(posting)
+        return candidates
+
+    def search(self, query, limit=20):
+        """
+        Run a query and rank the matches with BM25.
+
+        Args:
+            query (str): Query, e.g. 'garden AND garage near York'
+            limit (int): Maximum number of results
+
+        Returns:
+            list: (score, (source, property_id)) tuples, best first
+        """
+        clauses, excluded, place = parse_query(query)
+        if not clauses and not place:
+            return []
+        candidates = self._matches(clauses, excluded, place)
+        if not candidates:
+            return []
+
+        # BM25 length normalisation of each candidate, shared by all of its terms
+        scale = K1 * B * self.count / self.total_length
+        lengths = self.lengths
+        norms = {doc: K1 * (1 - B) + scale * lengths[doc] for doc in candidates}
+        scores = dict.fromkeys(candidates, 0.0)
+        for term in {term for clause in clauses for term in clause}:
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            df = len(posting)
+            idf = math.log(1 + (self.count - df + 0.5) / (df + 0.5)) * (K1 + 1)
+            # Walk whichever of the postings and the candidates is smaller
+            if df < len(scores):
+                hits = [(doc, tf) for doc, tf in posting.items() if doc in norms]
+            else:
+                hits = [(doc, posting[doc]) for doc in posting.keys() & norms.keys()]
+            for doc, tf in hits:
+                scores[doc] += idf * tf / (tf + norms[doc])
+
+        keys = self.keys
+        best = heapq.nlargest(limit, scores, key=scores.__getitem__)
+        return [(round(scores[doc], 4), keys[doc]) for doc in best]
+
+    def save(self, path):
+        """Persist the indexed documents to a JSON file"""
+        docs = []
+        for doc, key in enumerate(self.keys):
+            if key is None:
+                continue
+            frequencies = {term: self.postings[term][doc] for term in self.doc_terms[doc]}
+            docs.append([key[0], key[1], frequencies, list(self.doc_address_terms[doc])])
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'docs': docs}, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Load an index from a JSON file, or return an empty one if it doesn't exist"""
+        index = cls()
+        if not os.path.exists(path):
+            return index
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for source, property_id, frequencies, address_terms in data['docs']:
+            index._add_document((source, property_id), frequencies, tuple(address_terms))
+        return index
+
+    @classmethod
+    def from_store(cls, store, source=None):
+        """Build an index over the listings in a ListingStore"""
+        index = cls()
+        for row in store.query(source=source):
+            index.add(row['source'], row['data'])
+        return index
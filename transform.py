@@ -0,0 +1,312 @@
+"""
+Batch transform of scraped listings into the uniform UKProperty format.
+
+Nested fields (images, agent details, points of interest, market stats) are
+kept as native Python objects by the scrapers, so no json.dumps/json.loads
+round trip happens between scraping and transforming. Legacy JSON strings
+(e.g. from an old *_raw.json file) are still accepted and decoded.
+
+Scalar fields are normalised column by column: prices, beds, baths and square
+feet are pulled out of the batch into lists, converted in one pass each, and
+then zipped back into the output records.
+
+market_demand and area_growth come from an AreaStats of the ingested listings
+when one is passed; market stats scraped by older versions are used otherwise.
+"""
+import json
+
+import patterns
+
+
+def _decode(value):
+    """Return a nested field as a native object, decoding legacy JSON strings"""
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except (json.JSONDecodeError, TypeError):
+            return None
+    return value
+
+
+def normalize_prices(values):
+    """
+    Convert a column of raw prices to ints.
+
+    Args:
+        values (list): Prices as ints or strings like '250000' / '250,000'
+
+    Returns:
+        list: int price, or None where the value is missing or not positive
+    """
+    result = []
+    append = result.append
+    for value in values:
+        if type(value) is int:
+            append(value if value > 0 else None)
+            continue
+        try:
+            price = int(value.replace(',', ''))
+        except (ValueError, TypeError, AttributeError):
+            append(None)
+            continue
+        append(price if price > 0 else None)
+    return result
+
+
+def normalize_counts(values):
+    """
+    Convert a column of room counts ('3', 3, '', None) to ints.
+
+    Room counts have very few distinct values, so conversions are memoised
+    per batch.
+
+    Returns:
+        list: int count, or None where the value is missing or not numeric
+    """
+    cache = {}
+    result = []
+    append = result.append
+    for value in values:
+        if type(value) is int:
+            append(value)
+            continue
+        try:
+            append(cache[value])
+        except KeyError:
+            count = int(value) if isinstance(value, str) and value.isdigit() else None
+            cache[value] = count
+            append(count)
+        except TypeError:
+            append(None)
+    return result
+
+
+def normalize_square_feet(values):
+    """
+    Convert a column of property sizes ('1234sq. ft', 1234) to ints.
+
+    Returns:
+        list: int square feet, or None where the value is missing or invalid
+    """
+    cache = {}
+    result = []
+    append = result.append
+    for value in values:
+        if not value:
+            append(None)
+            continue
+        if type(value) in (int, float):
+            append(int(value))
+            continue
+        try:
+            append(cache[value])
+        except KeyError:
+            try:
+                sq_ft = int(float(value.replace('sq. ft', '').strip()))
+            except (ValueError, TypeError, AttributeError):
+                sq_ft = None
+            cache[value] = sq_ft
+            append(sq_ft)
+        except TypeError:
+            append(None)
+    return result
+
+
+def normalize_coordinates(latitudes, longitudes):
+    """
+    Convert latitude/longitude columns to float pairs.
+
+    Returns:
+        list: (lat, lng) tuples, or None where either value is missing or invalid
+    """
+    result = []
+    append = result.append
+    for lat, lng in zip(latitudes, longitudes):
+        if lat is None or lng is None:
+            append(None)
+            continue
+        try:
+            append((float(lat), float(lng)))
+        except (ValueError, TypeError):
+            append(None)
+    return result
+
+
+def _build_agent(prop):
+    """Return (agent_info, keep) for a property; keep is False for incomplete agents"""
+    agent_info = {}
+    if prop.get('agent'):
+        agent_info["name"] = prop['agent']
+
+    agent_details = _decode(prop.get('agent_details'))
+    if agent_details:
+        try:
+            if agent_details.get('agent_name'):
+                agent_info["name"] = agent_details['agent_name']
+            if agent_details.get('agent_phone'):
+                agent_info["phone"] = agent_details['agent_phone']
+        except AttributeError:
+            pass
+
+    if agent_info and "name" in agent_info:
+        if "phone" not in agent_info:
+            # Don't add incomplete agent information
+            return None, False
+        return agent_info, True
+    return None, True
+
+
+def _build_property_details(prop, price, area_stats=None):
+    """Build the optional property_details block from real data only"""
+    property_details = {}
+
+    tenure = prop.get('tenure')
+    if tenure:
+        property_details["tenure"] = tenure
+
+        # If it's leasehold, check for remaining years
+        tenure_lower = tenure.lower()
+        if 'leasehold' in tenure_lower and 'years' in tenure_lower:
+            years_match = patterns.YEARS.search(tenure)
+            if years_match:
+                property_details["time_remaining_on_lease"] = f"{years_match.group(1)} years"
+    elif prop.get('time_remaining_on_lease'):
+        property_details["time_remaining_on_lease"] = prop['time_remaining_on_lease']
+
+    if prop.get('ecp_rating'):
+        property_details["energy_rating"] = prop['ecp_rating']
+
+    if prop.get('council_tax_band'):
+        property_details["council_tax_band"] = prop['council_tax_band']
+
+    features = prop.get('features')
+    if features:
+        if isinstance(features, list):
+            property_details["property_features"] = features
+        elif isinstance(features, str):
+            property_details["property_features"] = [features]
+
+    poi = _decode(prop.get('points_ofInterest'))
+    if poi:
+        try:
+            school_count = sum(1 for point in poi
+                               if point.get('type') == 'school' or 'school' in point.get('point', '').lower())
+            if school_count > 0:
+                property_details["nearby_schools"] = school_count
+        except (TypeError, AttributeError):
+            pass
+
+    area_fields = area_stats.market_fields(prop, price) if area_stats is not None else None
+    if area_fields:
+        property_details.update(area_fields)
+        return property_details
+
+    market_stats = _decode(prop.get('market_stats_last_12_months'))
+    if market_stats:
+        try:
+            if market_stats.get('properties_sold'):
+                sold_count = int(market_stats['properties_sold'])
+                property_details["market_demand"] = f"High ({sold_count} properties sold)" if sold_count > 10 else f"Low ({sold_count} properties sold)"
+
+            if market_stats.get('average_estimated'):
+                avg_price_str = market_stats['average_estimated'].replace('£', '').replace(',', '')
+                try:
+                    avg_price = int(avg_price_str)
+                    if avg_price > 0 and price > 0:
+                        percentage = ((price - avg_price) / avg_price) * 100
+                        property_details["area_growth"] = f"{percentage:.1f}% {'above' if percentage > 0 else 'below'} average"
+                except (ValueError, TypeError):
+                    pass
+        except (TypeError, ValueError, AttributeError):
+            pass
+
+    return property_details
+
+
+def transform_batch(properties, verbose=True, area_stats=None):
+    """
+    Transform a batch of scraped properties to the uniform UKProperty format.
+    Only includes properties that have all the required fields.
+
+    Args:
+        properties (list): Scraped property dicts (nested fields as native objects)
+        verbose (bool): Print a summary line when done
+        area_stats (AreaStats): Per-outcode stats for market_demand and area_growth
+
+    Returns:
+        list: UKProperty dicts (see transform_to_uk_property_format for the schema)
+    """
+    # Rows missing a required field never make it into the columns
+    rows = [prop for prop in properties if 'property_id' in prop and 'address' in prop and 'price' in prop]
+    skipped_count = len(properties) - len(rows)
+
+    # Columnar normalisation of the scalar fields
+    prices = normalize_prices([prop['price'] for prop in rows])
+    beds = normalize_counts([prop.get('beds') for prop in rows])
+    baths = normalize_counts([prop.get('baths') for prop in rows])
+    square_feet = normalize_square_feet([prop.get('property_size') for prop in rows])
+    coordinates = normalize_coordinates(
+        [prop.get('latitude') if 'longitude' in prop else None for prop in rows],
+        [prop.get('longitude') if 'latitude' in prop else None for prop in rows]
+    )
+
+    transformed_properties = []
+    append = transformed_properties.append
+
+    for prop, price, bedrooms, bathrooms, sq_ft, coords in zip(rows, prices, beds, baths, square_feet, coordinates):
+        if price is None:
+            skipped_count += 1
+            continue
+
+        uk_property = {
+            "id": prop['property_id'],
+            "address": prop['address'],
+            "price": price,
+            "listing_type": "for-sale"
+        }
+
+        if bedrooms is not None:
+            uk_property["bedrooms"] = bedrooms
+        if bathrooms is not None:
+            uk_property["bathrooms"] = bathrooms
+
+        date_added = prop.get('date_added')
+        if date_added:
+            uk_property["created_at"] = date_added
+            uk_property["updated_at"] = date_added
+
+        if prop.get('type'):
+            uk_property["property_type"] = prop['type']
+
+        description = prop.get('description')
+        if description:
+            uk_property["description"] = ' '.join(description) if isinstance(description, list) else description
+
+        if coords is not None:
+            uk_property["latitude"], uk_property["longitude"] = coords
+
+        if sq_ft is not None:
+            uk_property["square_feet"] = sq_ft
+
+        images = _decode(prop.get('property_images'))
+        if images:
+            try:
+                uk_property["image_url"] = images[0]
+            except (TypeError, KeyError, IndexError):
+                pass
+
+        agent_info, keep = _build_agent(prop)
+        if not keep:
+            continue
+        if agent_info:
+            uk_property["agent"] = agent_info
+
+        property_details = _build_property_details(prop, price, area_stats)
+        if property_details:
+            uk_property["property_details"] = property_details
+
+        append(uk_property)
+
+    if verbose:
+        print(f"Transformed {len(transformed_properties)} properties. Skipped {skipped_count} properties due to incomplete data.")
+    return transformed_properties
@@ -0,0 +1,221 @@
+"""
+Deterministic URL builders for Rightmove, Zoopla and Zillow, with
+canonicalisation and request de-duplication.
+
+Every search and detail URL the scrapers fetch is built here, so a malformed
+URL (e.g. an unformatted method object in the path) is caught by
+validate_url before any request or rate-limit delay is spent on it.
+RequestDeduper keys requests on the canonical form of the URL, so the same
+page is never fetched twice in a crawl, even when it was built from different
+inputs ('Brighton' and 'Hove' resolve to the same Rightmove region).
+"""
+import re
+import threading
+from urllib.parse import parse_qsl, quote, urlencode, urlsplit, urlunsplit
+
+RIGHTMOVE_BASE = "https://www.rightmove.co.uk"
+ZOOPLA_BASE = "https://www.zoopla.co.uk"
+ZILLOW_BASE = "https://www.zillow.com"
+
+ALLOWED_HOSTS = {
+    'www.rightmove.co.uk',
+    'www.zoopla.co.uk',
+    'www.zillow.com',
+}
+
+# Characters allowed unescaped in a URL path (RFC 3986 pchar plus '/')
+_VALID_PATH = re.compile(r"^[A-Za-z0-9\-._~%!$&'()*+,;=:@/]*$")
+_SLUG_SEPARATORS = re.compile(r'[^a-z0-9]+')
+
+# Query parameters that never change the page content
+_IGNORED_PARAMS = {'search_source', 'utm_source', 'utm_medium', 'utm_campaign', 'utm_content', 'utm_term'}
+
+RIGHTMOVE_PAGE_SIZE = 24
+ZOOPLA_PAGE_SIZE = 25
+
+# Sort parameters for "newest listed first"
+RIGHTMOVE_NEWEST_FIRST = {'sortType': 6}
+ZOOPLA_NEWEST_FIRST = {'results_sort': 'newest_listings'}
+
+
+def slugify(location):
+    """Turn a location name into a portal path slug, e.g. 'Milton Keynes' -> 'milton-keynes'"""
+    return _SLUG_SEPARATORS.sub('-', location.lower().replace('&', 'and')).strip('-')
+
+
+def rightmove_search_url(location_id, page=0, params=None):
+    """
+    Build a Rightmove for-sale search results URL.
+
+    Args:
+        location_id (str): Location identifier, e.g. 'REGION%5E1240'
+        page (int): Zero-based page number
+        params (dict): Extra query parameters; an empty value leaves the filter unset
+
+    Returns:
+        str: Search URL
+    """
+    query = {
+        'index': page * RIGHTMOVE_PAGE_SIZE,
+        'propertyTypes': '',
+        'includeSSTC': 'false',
+        'mustHave': '',
+        'dontShow': '',
+        'furnishTypes': '',
+        'keywords': '',
+    }
+    if params:
+        query.update(params)
+    # The location identifier is already percent-encoded (REGION%5E1240)
+    return (f"{RIGHTMOVE_BASE}/property-for-sale/find.html?searchType=SALE&locationIdentifier={location_id}&"
+            + urlencode(query, safe=','))
+
+
+def rightmove_location_search_url(location, use_location_identifier=True):
+    """Build the Rightmove search URL used to resolve a location name to an identifier"""
+    clean_location = location.replace('&', 'and').replace(',', '').strip()
+    url = f"{RIGHTMOVE_BASE}/property-for-sale/search.html?searchLocation={quote(clean_location)}"
+    if use_location_identifier:
+        url += "&useLocationIdentifier=true"
+    return url
+
+
+def rightmove_property_url(property_id):
+    """Build a Rightmove property details URL"""
+    return f"{RIGHTMOVE_BASE}/properties/{property_id}"
+
+
+def zoopla_search_url(location, page=1, params=None):
+    """
+    Build a Zoopla for-sale search results URL.
+
+    Args:
+        location (str): Location name, e.g. 'Milton Keynes'
+        page (int): One-based page number
+        params (dict): Extra query parameters; list values are repeated
+
+    Returns:
+        str: Search URL
+    """
+    query = {'q': location, 'search_source': 'home'}
+    if params:
+        query.update(params)
+    if page > 1:
+        query['pn'] = page
+    return (f"{ZOOPLA_BASE}/for-sale/property/{quote(slugify(location))}/?"
+            + urlencode(query, doseq=True, quote_via=quote))
+
+
+def zoopla_property_url(listing_id):
+    """Build a Zoopla listing details URL"""
+    return f"{ZOOPLA_BASE}/for-sale/details/{listing_id}/"
+
+
+def zillow_search_url(city, page=1):
+    """
+    Build a Zillow for-sale search results URL.
+
+    Args:
+        city (str): City slug or name, e.g. 'los-angeles' or 'Los Angeles'
+        page (int): One-based page number
+    """
+    return f"{ZILLOW_BASE}/homes/for_sale/{quote(slugify(city))}/{page}_p/"
+
+
+def validate_url(url):
+    """
+    Check that a URL is a well-formed https URL on a supported portal.
+
+    Returns:
+        str: The canonical form of the URL
+
+    Raises:
+        ValueError: If the URL is malformed or points elsewhere
+    """
+    if not isinstance(url, str) or not url:
+        raise ValueError(f"URL must be a non-empty string, got {url!r}")
+    parts = urlsplit(url)
+    if parts.scheme != 'https':
+        raise ValueError(f"URL must use https: {url}")
+    if parts.hostname not in ALLOWED_HOSTS:
+        raise ValueError(f"Unsupported host in URL: {url}")
+    if not _VALID_PATH.match(parts.path):
+        raise ValueError(f"Malformed URL path: {url}")
+    for key, _ in parse_qsl(parts.query, keep_blank_values=True):
+        if not key:
+            raise ValueError(f"Malformed query string: {url}")
+    return canonicalize_url(url)
+
+
+def canonicalize_url(url):
+    """
+    Reduce a URL to a canonical form for de-duplication.
+
+    Lower-cases the scheme and host, drops the fragment, default port, empty
+    and tracking query parameters, and sorts the remaining parameters.
+    """
+    parts = urlsplit(url)
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != 443:
+        host = f"{host}:{parts.port}"
+    path = re.sub(r'/{2,}', '/', parts.path) or '/'
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if value != '' and key not in _IGNORED_PARAMS
+    )
+    return urlunsplit((parts.scheme.lower(), host, path, urlencode(query, safe='^,'), ''))
+
+
+class RequestDeduper:
+    """
+    Thread-safe set of canonical URLs already requested in a crawl.
+
+    claim(url) returns True only the first time a valid URL is seen, so
+    callers fetch only when it does. A caller whose fetch fails calls
+    release(url), so a later attempt can claim the URL again.
+    """
+
+    def __init__(self):
+        self._seen = set()
+        self._lock = threading.Lock()
+        self.duplicates = 0
+        self.invalid = 0
+
+    def claim(self, url):
+        """
+        Reserve a URL for fetching.
+
+        Returns:
+            bool: False if the URL is malformed or was already claimed
+        """
+        try:
+            canonical = validate_url(url)
+        except ValueError as e:
+            print(f"Skipping malformed URL: {e}")
+            with self._lock:
+                self.invalid += 1
+            return False
+        with self._lock:
+            if canonical in self._seen:
+                self.duplicates += 1
+                return False
+            self._seen.add(canonical)
+            return True
+
+    def release(self, url):
+        """Give up a claim after a failed fetch, so the URL can be claimed again"""
+        try:
+            canonical = canonicalize_url(url)
+        except ValueError:
+            return
+        with self._lock:
+            self._seen.discard(canonical)
+
+    def __contains__(self, url):
+        try:
+            return canonicalize_url(url) in self._seen
+        except ValueError:
+            return False
+
+    def __len__(self):
+        return len(self._seen)
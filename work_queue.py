@@ -0,0 +1,254 @@
+"""
+Lease-based work queue and global rate limiter for distributed crawls.
+
+Work items (location, page and detail fetches) are rows in a SQLite database.
+A worker leases an item for a fixed time, processes it, and acks it. If the
+worker dies, the lease expires and another worker picks the item up again.
+Items carry a unique dedup key, so the same page or detail URL is only queued
+once across all nodes.
+
+The same database holds the per-host rate-limit slots. Any node can reserve
+the next request slot for a host, so the limit holds across all workers, not
+per process.
+
+SQLite in WAL mode is fine for a single machine or for testing on a shared
+filesystem. Larger deployments can swap in another backend that has the same
+put/lease/ack/nack methods.
+"""
+import json
+import random
+import sqlite3
+import time
+from urllib.parse import urlparse
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS work_items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    source TEXT NOT NULL,
+    dedup_key TEXT NOT NULL UNIQUE,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    priority INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_work_items_ready ON work_items (status, priority, id);
+CREATE INDEX IF NOT EXISTS idx_work_items_lease ON work_items (status, lease_expires);
+
+CREATE TABLE IF NOT EXISTS host_slots (
+    host TEXT PRIMARY KEY,
+    next_allowed REAL NOT NULL
+);
+"""
+
+
+class WorkQueue:
+    """
+    SQLite-backed work queue shared by crawl workers.
+
+    Args:
+        path (str): Queue database path (on a filesystem every node can reach)
+        max_attempts (int): Attempts before an item is marked failed
+    """
+
+    def __init__(self, path="crawl_queue.db", max_attempts=3):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def put(self, kind, source, payload, dedup_key, priority=0):
+        """
+        Queue a work item unless one with the same dedup key already exists.
+
+        Args:
+            kind (str): 'location', 'page' or 'detail'
+            source (str): Portal name
+            payload (dict): JSON-serialisable item data
+            dedup_key (str): Unique key, e.g. 'rightmove:detail:1234'
+            priority (int): Lower values are leased first
+
+        Returns:
+            bool: True if the item was queued
+        """
+        now = time.time()
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO work_items (kind, source, dedup_key, payload, priority, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (kind, source, dedup_key, json.dumps(payload), priority, now, now)
+        )
+        return cursor.rowcount == 1
+
+    def put_many(self, items):
+        """
+        Queue several items in one transaction.
+
+        Args:
+            items (list): (kind, source, payload, dedup_key, priority) tuples
+
+        Returns:
+            int: Number of items newly queued
+        """
+        now = time.time()
+        rows = [(kind, source, dedup_key, json.dumps(payload), priority, now, now)
+                for kind, source, payload, dedup_key, priority in items]
+        before = self.conn.total_changes
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO work_items (kind, source, dedup_key, payload, priority, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return self.conn.total_changes - before
+
+    def lease(self, worker_id, lease_seconds=300, kinds=None):
+        """
+        Lease the next ready item: pending, or leased with an expired lease.
+
+        Args:
+            worker_id (str): Identifier of the leasing worker
+            lease_seconds (float): How long the item stays reserved
+            kinds (list): Optional item kinds to restrict to
+
+        Returns:
+            dict: The item ('id', 'kind', 'source', 'payload', 'attempts'), or None
+        """
+        now = time.time()
+        sql = ("SELECT * FROM work_items WHERE (status = 'pending' OR (status = 'leased' AND lease_expires < ?))")
+        params = [now]
+        if kinds:
+            sql += f" AND kind IN ({','.join('?' * len(kinds))})"
+            params.extend(kinds)
+        sql += " ORDER BY priority, id LIMIT 1"
+
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute(sql, params).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+            self.conn.execute(
+                "UPDATE work_items SET status = 'leased', lease_owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (worker_id, now + lease_seconds, now, row['id'])
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+        return {
+            'id': row['id'],
+            'kind': row['kind'],
+            'source': row['source'],
+            'payload': json.loads(row['payload']),
+            'attempts': row['attempts'] + 1,
+        }
+
+    def ack(self, item_id, worker_id):
+        """
+        Mark a leased item done.
+
+        Returns:
+            bool: False if the lease was lost to another worker
+        """
+        cursor = self.conn.execute(
+            "UPDATE work_items SET status = 'done', lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE id = ? AND lease_owner = ?",
+            (time.time(), item_id, worker_id)
+        )
+        return cursor.rowcount == 1
+
+    def nack(self, item_id, worker_id, error=None, delay=0):
+        """
+        Release a leased item after a failure.
+
+        It is retried after delay seconds, or marked failed once it has used
+        max_attempts.
+        """
+        now = time.time()
+        self.conn.execute(
+            "UPDATE work_items SET "
+            "status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'leased' END, "
+            "lease_owner = NULL, lease_expires = ?, last_error = ?, updated_at = ? "
+            "WHERE id = ? AND lease_owner = ?",
+            (self.max_attempts, now + delay, error, now, item_id, worker_id)
+        )
+
+    def stats(self):
+        """Return item counts by status and kind"""
+        counts = {}
+        for row in self.conn.execute("SELECT status, kind, COUNT(*) AS n FROM work_items GROUP BY status, kind"):
+            counts.setdefault(row['status'], {})[row['kind']] = row['n']
+        return counts
+
+    def pending_count(self):
+        """Number of items still to be processed (pending or leased)"""
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM work_items WHERE status IN ('pending', 'leased')"
+        ).fetchone()[0]
+
+
+class SharedRateLimiter:
+    """
+    Per-host rate limiter coordinated through the queue database.
+
+    Each call reserves the next free slot for the host in one transaction,
+    so the limit applies across every worker on every node. Drop-in
+    replacement for ratelimit.RateLimiter.
+
+    Args:
+        queue (WorkQueue): Queue whose database stores the host slots
+        rate (float): Requests per second allowed for each host, across all nodes
+        jitter (float): Maximum random extra delay in seconds
+    """
+
+    def __init__(self, queue, rate, jitter=0.0):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.conn = queue.conn
+        self.interval = 1.0 / rate
+        self.jitter = jitter
+
+    def _reserve(self, host):
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            row = self.conn.execute("SELECT next_allowed FROM host_slots WHERE host = ?", (host,)).fetchone()
+            slot = max(now, row[0]) if row else now
+            self.conn.execute(
+                "INSERT INTO host_slots (host, next_allowed) VALUES (?, ?) "
+                "ON CONFLICT (host) DO UPDATE SET next_allowed = excluded.next_allowed",
+                (host, slot + self.interval)
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return slot - now
+
+    def wait(self, url):
+        """Block until this node may send a request to the host of url"""
+        delay = self._reserve(urlparse(url).netloc)
+        if self.jitter:
+            delay += random.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        return delay